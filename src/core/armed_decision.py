@@ -0,0 +1,141 @@
+# وظایف:
+# ۱. اجرای شرط خ (ترید حداکثر ۱۵ میلی‌ثانیه بعد از بسته شدن کندل دوم) به‌صورت دومرحله‌ای
+# ۲. مرحله‌ی اول (on_close): strategy.arm(c1, c2) یک بار هنگام بسته شدن کندل دوم
+# ۳. مرحله‌ی دوم (on_tick): روی هر تیک کندل سوم فقط ArmedSignal.fire (یک مقایسه)
+# ۴. گزارش تأخیر تصمیم به‌صورت هیستوگرام
+
+"""
+ماژول ArmedDecider
+-------------------
+اتصال: CandleBuilder(on_close=decider.on_close) و بعد از هر add_price:
+    cmd = decider.on_tick(builder.get_current_open(), price, ts)
+مهلت شلیک از end_ts کندل دوم حساب می‌شود (نه از اولین تیک کندل سوم)؛ تیک با زمان بعد از
+end_ts + window یا صدور دیرتر از آن (close_lag > window) سیگنالی نمی‌دهد.
+"""
+
+import time
+
+from core.latency import LatencyHistogram
+from core.strategy_base import FIRE_ALWAYS
+
+FIRE_WINDOW = 0.015   # مهلت شرط خ (ثانیه)
+
+
+class ArmedDecider:
+    """
+    window: مهلت شرط خ بعد از end_ts کندل دوم؛ بعد از آن وضعیت مسلح باطل می‌شود
+        (کندل بدون end_ts → مهلت از اولین تیک کندل سوم)
+    on_signal(cmd, candle): کال‌بک اختیاری هنگام صدور سیگنال
+    clock: ساعت هم‌مبنا با end_ts کندل‌ها (پیش‌فرض time.time) برای اعمال close_lag
+
+    سیگنال بی‌شرط (قاعده‌ی شدو) همان لحظه‌ی on_close صادر می‌شود و منتظر تیک کندل سوم نمی‌ماند.
+
+    هیستوگرام‌ها:
+        arm: زمان محاسبه‌ی مرحله‌ی اول
+        decision: از تشخیص بسته شدن کندل دوم تا صدور سیگنال (پردازش داخلی)
+        close_lag: از end_ts کندل دوم تا صدور سیگنال (شامل تأخیر فید)
+    """
+
+    def __init__(self, strategy, window=FIRE_WINDOW, on_signal=None, clock=time.time):
+        self.strategy = strategy
+        self.window = window
+        self.on_signal = on_signal
+        self.clock = clock
+        self.armed = None
+        self._prev = None
+        self._c2 = None
+        self._armed_at = None
+        self._deadline = None
+
+        self.arm_latency = LatencyHistogram("arm")
+        self.decision_latency = LatencyHistogram("decision")
+        self.close_lag = LatencyHistogram("close_lag")
+
+        # شمارنده‌ها
+        self.armed_count = 0
+        self.fired = 0
+        self.expired = 0
+        self.late = 0           # رد شده چون close_lag از window بیشتر بود
+
+    def on_close(self, candle):
+        """
+        مرحله‌ی اول: هنگام بسته شدن هر کندل (کال‌بک on_close سازنده‌ی کندل).
+        خروجی ۰/۱ اگر سیگنال به کندل سوم وابسته نباشد، وگرنه None.
+        """
+        t0 = time.perf_counter()
+        prev, self._prev = self._prev, candle
+        if self.armed is not None:
+            # کندل سوم بدون شلیک بسته شد
+            self.expired += 1
+        self.armed = None
+        self._deadline = None
+        if prev is None:
+            return None
+        armed = self.strategy.arm(prev, candle)
+        t1 = time.perf_counter()
+        self.arm_latency.record(t1 - t0)
+        if armed is None:
+            return None
+        self.armed = armed
+        self._c2 = candle
+        self._armed_at = t1
+        self.armed_count += 1
+        if candle.end_ts is not None:
+            self._deadline = candle.end_ts + self.window
+        if armed.condition == FIRE_ALWAYS:
+            return self._fire(armed.direction)
+        return None
+
+    def on_tick(self, current_open, price, ts=None):
+        """
+        مرحله‌ی دوم: تیک کندل سوم. خروجی ۰/۱ فقط یک بار برای هر وضعیت مسلح، وگرنه None.
+        """
+        armed = self.armed
+        if armed is None:
+            return None
+        if ts is None:
+            ts = self.clock()
+        if self._deadline is None:
+            self._deadline = ts + self.window
+        elif ts > self._deadline:
+            self.armed = None
+            self.expired += 1
+            return None
+
+        cmd = armed.fire(current_open, price)
+        if cmd is None:
+            return None
+        return self._fire(cmd)
+
+    def _fire(self, cmd):
+        """صدور سیگنال، به شرط اینکه از end_ts کندل دوم بیش از window نگذشته باشد"""
+        self.armed = None
+        end_ts = self._c2.end_ts
+        if end_ts is not None:
+            lag = max(0.0, self.clock() - end_ts)
+            if lag > self.window:
+                self.late += 1
+                self.expired += 1
+                return None
+            self.close_lag.record(lag)
+        self.fired += 1
+        self.decision_latency.record(time.perf_counter() - self._armed_at)
+        if self.on_signal:
+            self.on_signal(cmd, self._c2)
+        return cmd
+
+    def metrics(self):
+        return {
+            "armed": self.armed_count,
+            "fired": self.fired,
+            "expired": self.expired,
+            "late": self.late,
+            "arm": self.arm_latency.snapshot(),
+            "decision": self.decision_latency.snapshot(),
+            "close_lag": self.close_lag.snapshot(),
+        }
+
+    def report(self):
+        """هیستوگرام‌های متنی برای کنسول"""
+        return "\n".join((self.arm_latency.format(), self.decision_latency.format(),
+                          self.close_lag.format()))
@@ -0,0 +1,200 @@
+# وظایف:
+# ۱. بازپخش تیک‌های تاریخی: CandleBuilder → StrategyFiveSec.decide_batch → MartingaleManager
+# ۲. تسویه‌ی هر معامله با قیمت واقعی در لحظه‌ی انقضا (trade_duration)
+# ۳. خروجی: منحنی سرمایه (equity curve) و لیست معاملات
+# ۴. قطعی (deterministic) و سریع: بدون random و با مسیر دسته‌ای add_prices
+
+"""
+ماژول Backtester
+-----------------
+بک‌تست رویدادمحور روی تیک‌های ضبط‌شده (TickRecorder / TickReplayer).
+"""
+
+import numpy as np
+
+from core.candle_builder import CandleBuilder
+from core.martingale_manager import MartingaleManager
+from core.strategy_five_sec import StrategyFiveSec
+from core.trade_stats import TradeStats
+
+
+class BacktestResult:
+    """
+    trades: لیست dict معاملات (زمان ورود/انقضا، جهت، مبلغ، قیمت ورود/خروج، نتیجه، pnl)
+    equity: آرایه‌ی سرمایه‌ی تجمعی بعد از هر معامله
+    equity_ts: زمان انقضای متناظر با هر نقطه‌ی equity
+    stats: خلاصه‌ی آمار (همان کلیدهای TradeLogger.stats)
+    """
+
+    def __init__(self, trades, equity, equity_ts, stats):
+        self.trades = trades
+        self.equity = equity
+        self.equity_ts = equity_ts
+        self.stats = stats
+
+    def __repr__(self):
+        s = self.stats
+        return (f"BacktestResult(trades={s['total']}, winrate={s['winrate']}%, "
+                f"pnl={s['pnl']}, max_loss_streak={s['max_loss_streak']})")
+
+
+class Backtester:
+    """
+    config: همان کلیدهای config.json
+        trade_duration، martingale_step، max_steps، reverse_trading، pause_between_trades
+    indicators: تابع سازنده‌ی IndicatorSet (مثلاً default_indicators) برای استراتژی‌هایی
+        که اندیکاتور می‌خوانند؛ در این حالت هر تصمیم مقادیر لحظه‌ی بسته شدن کندل دوم را می‌بیند
+    ورود: در اولین تیک کندل سوم (لحظه‌ی بسته شدن کندل دوم طبق شرط خ)
+    تسویه: آخرین تیک در زمان انقضا یا قبل از آن؛ قیمت برابر → draw (بدون سود و زیان)
+    """
+
+    def __init__(self, config, strategy=None, martingale=None, period_sec=5, payout=0.8,
+                 indicators=None):
+        self.config = config
+        self.strategy = strategy or StrategyFiveSec(config)
+        self.martingale = martingale or MartingaleManager(
+            base_amount=config.get("base_amount", 1.0),
+            factor=config.get("martingale_step", 2.0),
+            max_steps=config.get("max_steps", 5),
+        )
+        self.period = period_sec
+        self.payout = payout
+        self.duration = config.get("trade_duration", 5)
+        self.reverse = config.get("reverse_trading", False)
+        self.pause = config.get("pause_between_trades", 0)
+        self.indicators = indicators
+        self._snapshots = None
+
+    def build_candles(self, timestamps, prices):
+        """ساخت کندل‌ها با مسیر دسته‌ای CandleBuilder (همان منطق حالت زنده)"""
+        candles = []
+        if self.indicators is None:
+            builder = CandleBuilder(self.period, max_keep=2, on_close=candles.append)
+            builder.add_prices(prices, timestamps)
+            return candles
+
+        # همان IndicatorSet حالت زنده؛ بعد از هر کندل یک عکس فقط‌خواندنی با همان رابط
+        # (get(name).value، [name]، in، len، values()) برای تصمیم‌های بعدی نگه داشته می‌شود
+        indicators = self.indicators()
+        snapshots = self._snapshots = []
+
+        def on_close(candle):
+            candles.append(candle)
+            snapshots.append(indicators.snapshot())
+
+        builder = CandleBuilder(self.period, max_keep=2, on_close=on_close, indicators=indicators)
+        builder.add_prices(prices, timestamps)
+        return candles
+
+    def signals(self, candles):
+        """
+        سیگنال هر کندل به‌عنوان کندل سوم: (اندیس، جهت ۰/۱)
+        ارزیابی برداری با StrategyFiveSec.decide_batch (نتیجه برابر decide_trade)
+        """
+        n = len(candles)
+        if n < 3:
+            return []
+        if self._snapshots is not None or not hasattr(self.strategy, "decide_batch"):
+            return self._signals_scalar(candles)
+        o = np.fromiter((c.open for c in candles), dtype=np.float64, count=n)
+        h = np.fromiter((c.high for c in candles), dtype=np.float64, count=n)
+        l = np.fromiter((c.low for c in candles), dtype=np.float64, count=n)
+        cl = np.fromiter((c.close for c in candles), dtype=np.float64, count=n)
+        synthetic = np.fromiter((c.synthetic for c in candles), dtype=bool, count=n)
+        gap = np.fromiter((c.spans_gap for c in candles), dtype=bool, count=n)
+        start = np.fromiter((c.start_ts for c in candles), dtype=np.float64, count=n)
+        end = np.fromiter((c.end_ts for c in candles), dtype=np.float64, count=n)
+
+        # کندل سوم بعد از c2=j همان کندل j+1 است؛ ورود با قیمت باز آن
+        current = np.empty(n, dtype=np.float64)
+        current[:-1] = o[1:]
+        current[-1] = np.nan
+        sig = self.strategy.decide_batch(o, h, l, cl, current, current, gap)
+
+        idx = np.flatnonzero(sig[1:-1] >= 0) + 2
+        # کندل سوم ساختگی → بدون ترید (c1/c2 هم‌پوش با قطعی را خود decide_batch حذف کرده)
+        idx = idx[~synthetic[idx]]
+        # سه کندل باید پشت سر هم باشند (فاصله‌ی رد‌شده بیش از max_gap_fill کندل پرکننده ندارد)
+        idx = idx[(end[idx - 1] == start[idx]) & (end[idx - 2] == start[idx - 1])]
+        return list(zip(idx.tolist(), sig[idx - 1].tolist()))
+
+    def _signals_scalar(self, candles):
+        """
+        مسیر تکی (استراتژی بدون decide_batch یا با اندیکاتور):
+        قبل از هر تصمیم، مقادیر اندیکاتور تا کندل دوم به استراتژی داده می‌شود
+        """
+        decide = self.strategy.decide_trade
+        snapshots = self._snapshots
+        out = []
+        for i in range(2, len(candles)):
+            c1, c2, c3 = candles[i - 2], candles[i - 1], candles[i]
+            if c3.synthetic:
+                continue
+            # فقط سه کندل پشت سر هم (بدون فاصله‌ی رد‌شده بین آن‌ها)
+            if c2.end_ts != c3.start_ts or c1.end_ts != c2.start_ts:
+                continue
+            if snapshots is not None:
+                self.strategy.bind_indicators(snapshots[i - 1])
+            cmd = decide(c1, c2, c3.open, c3.open)
+            if cmd is not None:
+                out.append((i, cmd))
+        return out
+
+    def run(self, timestamps, prices, candles=None):
+        """
+        اجرای بک‌تست روی آرایه‌های زمان و قیمت (مرتب بر اساس زمان).
+        candles: کندل‌های از پیش ساخته‌شده‌ی همین تیک‌ها (مثلاً در ParameterSweep که
+        کندل‌ها به پارامترهای استراتژی وابسته نیستند و یک بار ساخته می‌شوند)
+        """
+        ts = np.asarray(timestamps, dtype=np.float64)
+        px = np.asarray(prices, dtype=np.float64)
+        if candles is None:
+            candles = self.build_candles(ts, px)
+        signals = self.signals(candles)
+
+        mm = self.martingale
+        mm.reset()
+        stats = TradeStats(window_trades=50, window_seconds=3600, payout=self.payout)
+        trades, equity, equity_ts = [], [], []
+        balance = 0.0
+        free_at = -np.inf
+
+        # ورود و خروج همه‌ی سیگنال‌ها با یک searchsorted برداری
+        starts = np.array([candles[i].start_ts for i, _ in signals], dtype=np.float64)
+        entry_pos = np.searchsorted(ts, starts, side="left")   # اولین تیک کندل سوم
+        entry_ts = ts[np.minimum(entry_pos, ts.size - 1)] if ts.size else starts
+        expiry_ts = entry_ts + self.duration
+        exit_pos = np.searchsorted(ts, expiry_ts, side="right") - 1
+        exit_px = px[np.maximum(exit_pos, 0)]
+
+        for n, (i, cmd) in enumerate(signals):
+            if entry_ts[n] < free_at or expiry_ts[n] > ts[-1]:
+                continue
+            if self.reverse:
+                cmd = 1 - cmd
+            entry = candles[i].open
+            exit_ = float(exit_px[n])
+            amount = mm.current_amount()
+            if exit_ == entry:
+                result, pnl = "draw", 0.0
+            elif (exit_ > entry) == (cmd == 0):
+                result, pnl = "win", amount * self.payout
+                mm.on_win()
+            else:
+                result, pnl = "loss", -amount
+                mm.on_loss()
+
+            balance += pnl
+            rec = {
+                "entry_ts": float(entry_ts[n]), "expiry_ts": float(expiry_ts[n]),
+                "direction": "buy" if cmd == 0 else "sell", "amount": amount,
+                "entry": entry, "exit": exit_, "result": result, "pnl": pnl,
+            }
+            trades.append(rec)
+            stats.update(rec, ts=rec["expiry_ts"])
+            equity.append(balance)
+            equity_ts.append(rec["expiry_ts"])
+            free_at = expiry_ts[n] + self.pause
+
+        now = float(ts[-1]) if ts.size else None
+        return BacktestResult(trades, np.asarray(equity), np.asarray(equity_ts), stats.snapshot(now))
@@ -0,0 +1,87 @@
+# وظایف:
+# ۱. BlockingPoller: خواندن‌های مسدودکننده (CDP/DOM) روی ترد جدا، تحویل نتیجه روی چرخ
+# ۲. رد کردن موعدهای عقب‌افتاده (overruns) به‌جای اجرای پشت سر هم
+# ۳. شمارنده‌ها و هیستوگرام زمان خواندن
+
+"""
+ماژول BlockingPoller
+---------------------
+همراه TimerWheel: ترد چرخ هرگز منتظر I/O نمی‌ماند؛ poller روی ترد خودش می‌خواند و
+نتیجه را با wheel.call_later(0, ...) روی ترد چرخ تحویل می‌دهد.
+"""
+
+import threading
+import time
+
+from core.latency import LatencyHistogram
+
+
+class BlockingPoller:
+    """
+    read(): تابع مسدودکننده که هر interval ثانیه روی ترد poller صدا زده می‌شود
+    on_result(value): روی ترد چرخ اجرا می‌شود (نتیجه‌ی None تحویل داده نمی‌شود)
+    خواندن کندتر از interval موعدهای عقب‌افتاده را رد می‌کند (overruns)، نه اینکه پشت سر هم اجرا کند.
+    """
+
+    def __init__(self, wheel, interval, read, on_result, first=0.0, name="poller"):
+        if interval <= 0:
+            raise ValueError(f"بازه‌ی تکرار نامعتبر است: {interval}")
+        self.wheel = wheel
+        self.interval = interval
+        self.read = read
+        self.on_result = on_result
+        self.first = first
+        self.name = name
+        self._stop = threading.Event()
+        self._thread = None
+        self.read_latency = LatencyHistogram("poll_read")
+        self.reads = 0
+        self.delivered = 0
+        self.overruns = 0
+        self.errors = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self, timeout=2.0):
+        """توقف poller (هم‌نام Timer.cancel تا کنار زمان‌سنج‌ها لغو شود)"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        deadline = time.perf_counter() + max(0.0, self.first)
+        while not self._stop.wait(max(0.0, deadline - time.perf_counter())):
+            t0 = time.perf_counter()
+            try:
+                value = self.read()
+            except Exception as e:
+                self.errors += 1
+                value = None
+                print(f"⚠️ خطا در خواندن poller ({self.name}): {e}")
+            now = time.perf_counter()
+            self.reads += 1
+            self.read_latency.record(now - t0)
+            if value is not None and not self._stop.is_set():
+                self.delivered += 1
+                self.wheel.call_later(0, self.on_result, value)
+            deadline += self.interval
+            if deadline < now:
+                missed = int((now - deadline) // self.interval) + 1
+                self.overruns += missed
+                deadline += missed * self.interval
+
+    def metrics(self):
+        return {
+            "reads": self.reads,
+            "delivered": self.delivered,
+            "overruns": self.overruns,
+            "errors": self.errors,
+            "read_latency": self.read_latency.snapshot(),
+        }
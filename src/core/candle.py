@@ -0,0 +1,181 @@
+# وظایف:
+# ۱. تعریف یک نوع کندل واحد برای CandleEngine، CandleBuilder و StrategyFiveSec
+# ۲. استفاده از __slots__ (بدون __dict__ برای هر نمونه)
+# ۳. محاسبه‌ی یک‌باره‌ی ویژگی‌های مشتق (بدنه، رنج، شدوها، جهت) هنگام بسته شدن کندل
+# ۴. تغییرناپذیری کندل پس از بسته شدن
+# ۵. علامت spans_gap برای کندلی که با قطعی اتصال هم‌پوشانی دارد (استراتژی روی آن ترید نمی‌کند)
+
+"""
+ماژول Candle
+-------------
+FormingCandle: کندل در حال ساخت (قابل تغییر با هر تیک)
+Candle: کندل بسته‌شده (تغییرناپذیر، با ویژگی‌های از پیش محاسبه‌شده)
+"""
+
+# اگر اختلاف قیمت باز و بسته کمتر از این مقدار باشد، جهت کندل «دوجی» است
+DOJI_EPSILON = 0.0001
+
+
+class Candle:
+    """
+    کندل بسته‌شده (OHLC). همه‌ی ویژگی‌ها attribute ساده هستند، نه property،
+    تا استراتژی در هر بار خواندن چیزی را دوباره محاسبه نکند.
+    """
+    __slots__ = (
+        "start_ts", "end_ts", "open", "high", "low", "close",
+        "body", "range", "upper_shadow", "lower_shadow",
+        "is_bullish", "is_bearish", "direction", "synthetic", "spans_gap",
+    )
+
+    def __init__(self, open, high, low, close, start_ts=None, end_ts=None, synthetic=False,
+                 spans_gap=False):
+        _set = object.__setattr__
+        # synthetic: کندل تخت ساخته‌شده برای پر کردن فاصله‌ی بدون تیک
+        _set(self, "synthetic", synthetic)
+        # spans_gap: بازه‌ی کندل با قطعی اتصال/وب‌سوکت هم‌پوشانی دارد (داده‌ی ناقص)
+        _set(self, "spans_gap", spans_gap)
+        _set(self, "start_ts", start_ts)
+        _set(self, "end_ts", end_ts)
+        _set(self, "open", open)
+        _set(self, "high", high)
+        _set(self, "low", low)
+        _set(self, "close", close)
+
+        # ویژگی‌های مشتق: فقط یک بار، هنگام بسته شدن
+        if close >= open:
+            top, bottom = close, open
+        else:
+            top, bottom = open, close
+        _set(self, "body", top - bottom)
+        _set(self, "range", high - low)
+        _set(self, "upper_shadow", high - top)
+        _set(self, "lower_shadow", bottom - low)
+        _set(self, "is_bullish", close > open)
+        _set(self, "is_bearish", close < open)
+        if top - bottom < DOJI_EPSILON:
+            _set(self, "direction", "doji")
+        else:
+            _set(self, "direction", "bullish" if close > open else "bearish")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("کندل بسته‌شده قابل تغییر نیست")
+
+    def __delattr__(self, name):
+        raise AttributeError("کندل بسته‌شده قابل تغییر نیست")
+
+    def __repr__(self):
+        return (f"Candle(open={self.open}, high={self.high}, low={self.low}, "
+                f"close={self.close}, start_ts={self.start_ts})")
+
+    # سازگاری با نام‌های قدیمی
+    def upper_wick(self):
+        """alias برای سایهٔ بالایی"""
+        return self.upper_shadow
+
+    def lower_wick(self):
+        """alias برای سایهٔ پایینی"""
+        return self.lower_shadow
+
+    @property
+    def open_price(self):
+        return self.open
+
+    @property
+    def close_price(self):
+        return self.close
+
+
+class FormingCandle:
+    """
+    کندل در حال ساخت از روی تیک‌ها؛ با close_candle() به Candle تغییرناپذیر تبدیل می‌شود.
+    """
+    __slots__ = ("start_ts", "end_ts", "open", "high", "low", "close", "ticks",
+                 "first_ts", "last_ts", "spans_gap")
+
+    def __init__(self, start_ts, end_ts):
+        self.start_ts = start_ts   # زمان شروع کندل (epoch seconds)
+        self.end_ts = end_ts       # زمان پایان کندل
+        self.open = None           # قیمت باز شدن
+        self.close = None          # قیمت بسته شدن
+        self.high = float('-inf')  # بالاترین قیمت
+        self.low = float('inf')    # پایین‌ترین قیمت
+        self.ticks = 0             # تعداد تیک‌ها (یا زیرکندل‌های ادغام‌شده)
+        self.first_ts = None       # زمان صرافی اولین تیک (تعیین‌کننده‌ی open)
+        self.last_ts = None        # زمان صرافی آخرین تیک (تعیین‌کننده‌ی close)
+        self.spans_gap = False     # هم‌پوشانی با قطعی اتصال (هنگام بستن تعیین می‌شود)
+
+    def add_tick(self, price, ts=None):
+        """
+        افزودن یک تیک قیمت به کندل جاری.
+        اگر ts داده شود، open/close بر اساس زمان تیک تعیین می‌شود نه ترتیب رسیدن
+        (تیک خارج از ترتیب، open یا close را اشتباه بازنویسی نمی‌کند).
+        """
+        if self.open is None:
+            self.open = self.close = price
+            self.first_ts = self.last_ts = ts
+        elif ts is None or self.last_ts is None or ts >= self.last_ts:
+            self.close = price
+            self.last_ts = ts
+        elif ts < self.first_ts:
+            self.open = price
+            self.first_ts = ts
+        if price > self.high:
+            self.high = price
+        if price < self.low:
+            self.low = price
+        self.ticks += 1
+
+    def add_segment(self, open, high, low, close, first_ts, last_ts, ticks):
+        """
+        افزودن یک دسته تیک مرتب (خلاصه‌ی OHLC آن‌ها) که همه بعد از تیک‌های فعلی آمده‌اند
+        """
+        if self.open is None:
+            self.open = open
+            self.first_ts = first_ts
+        self.close = close
+        self.last_ts = last_ts
+        if high > self.high:
+            self.high = high
+        if low < self.low:
+            self.low = low
+        self.ticks += ticks
+
+    def merge(self, candle):
+        """
+        ادغام یک کندل بسته‌شده‌ی کوچک‌تر (برای ساخت تایم‌فریم بالاتر)
+        first_ts / last_ts اینجا start_ts اولین و آخرین زیرکندل ادغام‌شده‌اند (برای remerge)
+        """
+        if self.open is None:
+            self.open = candle.open
+            self.first_ts = candle.start_ts
+        self.last_ts = candle.start_ts
+        if candle.spans_gap:
+            self.spans_gap = True
+        self.close = candle.close
+        if candle.high > self.high:
+            self.high = candle.high
+        if candle.low < self.low:
+            self.low = candle.low
+        self.ticks += 1
+
+    def remerge(self, candle):
+        """
+        اعمال نسخه‌ی اصلاح‌شده‌ی زیرکندلی که قبلاً merge شده است.
+        اصلاح با تیک دیرهنگام high/low را فقط گسترش می‌دهد؛ open و close فقط اگر همین
+        زیرکندل اولین/آخرین زیرکندل باشد تغییر می‌کنند.
+        """
+        if candle.start_ts == self.first_ts:
+            self.open = candle.open
+        if candle.start_ts == self.last_ts:
+            self.close = candle.close
+        if candle.spans_gap:
+            self.spans_gap = True
+        if candle.high > self.high:
+            self.high = candle.high
+        if candle.low < self.low:
+            self.low = candle.low
+
+    def close_candle(self):
+        """بستن کندل و ساخت Candle تغییرناپذیر"""
+        return Candle(self.open, self.high, self.low, self.close, self.start_ts, self.end_ts,
+                      spans_gap=self.spans_gap)
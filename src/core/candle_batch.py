@@ -0,0 +1,93 @@
+# وظایف:
+# ۱. مسیر دسته‌ای CandleBuilder.add_prices برای بازپخش و بک‌تست (آرایه‌های NumPy)
+# ۲. بستن مستقیم کندل‌های قدیمی‌تر از افق اصلاح بدون ساخت FormingCandle
+# ۳. نتیجه‌ی دقیقاً برابر با add_price تک‌تیک (همان کندل‌ها، کال‌بک‌ها و فاصله‌ها)
+
+"""
+ماژول CandleBatch
+------------------
+mixin مسیر دسته‌ای CandleBuilder؛ از وضعیت سازنده (_open، _next_idx، _max_ts، watermark)
+و متدهای _emit، _store، _fill_gap، _advance و add_price آن استفاده می‌کند.
+"""
+
+import numpy as np
+
+from core.candle import Candle, FormingCandle
+from core.tick_bucketing import bucket_ohlc, is_sorted
+
+
+class CandleBatch:
+    """add_prices: OHLC هر بازه با NumPy؛ کار پایتونی فقط به ازای هر کندل"""
+
+    def add_prices(self, prices, timestamps):
+        """
+        مسیر دسته‌ای برای بازپخش و بک‌تست: آرایه‌های NumPy قیمت و زمان.
+        مرزهای کندل با floor(ts / period) به‌صورت برداری محاسبه و OHLC هر بازه
+        در یک گذر کاهش داده می‌شود؛ کار پایتونی فقط به ازای هر کندل است، نه هر تیک.
+        نتیجه دقیقاً برابر با فراخوانی add_price برای تک‌تک تیک‌هاست.
+        اگر زمان‌ها مرتب نباشند یا قبل از آخرین تیک دیده‌شده باشند، مسیر تک‌تیک استفاده می‌شود.
+        """
+        seg = bucket_ohlc(prices, timestamps, self.period)
+        idx = seg["idx"]
+        if idx.size == 0:
+            return
+        first_ts = seg["first_ts"]
+        last_ts = seg["last_ts"]
+        if self.gaps.open is not None:
+            self.gaps.close_by_tick(float(first_ts[0]))
+        if not is_sorted(timestamps) or (self._max_ts is not None and first_ts[0] < self._max_ts):
+            for price, ts in zip(list(prices), list(timestamps)):
+                self.add_price(float(price), float(ts))
+            return
+
+        p = self.period
+        max_ts = float(last_ts[-1])
+        wm = max_ts - self.allowed_lateness
+        if self._next_idx is None:
+            self._next_idx = int(idx[0])
+
+        # بازه‌های باز قبلی (همه ≤ idx[0]) اول بسته یا نگه داشته می‌شوند
+        carry = None
+        previous = sorted(self._open.items())
+        self._open = {}
+        for k, fc in previous:
+            if k == idx[0]:
+                carry = fc
+            else:
+                self._place(k, fc, wm)
+
+        # فقط چند کندل بسته‌ی آخر (افق اصلاح) به FormingCandle نیاز دارند؛
+        # بقیه مستقیماً به Candle تبدیل می‌شوند
+        keep_from = int(np.count_nonzero((idx + 1) * p <= wm)) - self.amend_horizon
+        rows = zip(idx.tolist(), seg["open"].tolist(), seg["high"].tolist(), seg["low"].tolist(),
+                   seg["close"].tolist(), first_ts.tolist(), last_ts.tolist(), seg["ticks"].tolist())
+        for j, (k, o, h, l, c, t0, t1, n) in enumerate(rows):
+            if carry is None and j < keep_from and (k + 1) * p <= wm:
+                while self._next_idx < k:
+                    self._fill_gap(self._next_idx, k)
+                self._store(Candle(o, h, l, c, k * p, (k + 1) * p,
+                                   spans_gap=self._spans_gap(k * p, (k + 1) * p)))
+                self._next_idx = k + 1
+                continue
+            if carry is not None:
+                fc, carry = carry, None
+            else:
+                fc = FormingCandle(k * p, (k + 1) * p)
+            fc.add_segment(o, h, l, c, t0, t1, n)
+            self._place(k, fc, wm)
+
+        self._max_ts = max_ts
+        self.watermark = wm
+        if (self._next_idx + 1) * p <= wm:
+            self._advance()
+
+    def _place(self, k, fc, wm):
+        """بستن بازه اگر به watermark رسیده، وگرنه نگه داشتن آن به‌عنوان بازه‌ی باز"""
+        if (k + 1) * self.period <= wm:
+            while self._next_idx < k:
+                self._fill_gap(self._next_idx, k)
+            self._emit(k, fc)
+            self._next_idx = k + 1
+        else:
+            self._open[k] = fc
+            self.current_candle = fc
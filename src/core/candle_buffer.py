@@ -0,0 +1,107 @@
+# وظایف:
+# ۱. نگهداری هزاران کندل با ظرفیت ثابت و هزینه‌ی ثابت برای هر کندل جدید
+# ۲. ذخیره‌ی open/high/low/close/start_ts در آرایه‌های NumPy از پیش تخصیص‌یافته (struct-of-arrays)
+# ۳. ارائه‌ی view بدون کپی از N کندل آخر برای اندیکاتورها
+# ۴. دسترسی سبک به کندل با اندیس برای استراتژی
+
+"""
+ماژول CandleRingBuffer
+-----------------------
+بافر حلقوی کندل‌ها. هر مقدار دو بار نوشته می‌شود (در i و i + capacity)،
+بنابراین N کندل آخر همیشه یک برش پیوسته است و view آن بدون کپی برگردانده می‌شود.
+"""
+
+import numpy as np
+
+FIELDS = ("open", "high", "low", "close", "start_ts")
+
+
+class CandleRingBuffer:
+    """
+    buf[-1] → آخرین کندل بسته‌شده (شیء Candle اصلی، بدون ساخت شیء جدید)
+    buf.window(n)["close"] → view فقط‌خواندنی از close های n کندل آخر
+    """
+
+    def __init__(self, capacity: int = 2000):
+        if capacity <= 0:
+            raise ValueError("ظرفیت بافر باید مثبت باشد")
+        self.capacity = capacity
+        self._arrays = {f: np.zeros(2 * capacity, dtype=np.float64) for f in FIELDS}
+        self._objs = [None] * capacity   # اشیای Candle متناظر (برای استراتژی)
+        self._head = 0                   # خانه‌ی بعدی برای نوشتن
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, candle):
+        """افزودن کندل جدید؛ O(1)، بدون تخصیص حافظه‌ی جدید"""
+        i = self._head
+        j = i + self.capacity
+        a = self._arrays
+        a["open"][i] = a["open"][j] = candle.open
+        a["high"][i] = a["high"][j] = candle.high
+        a["low"][i] = a["low"][j] = candle.low
+        a["close"][i] = a["close"][j] = candle.close
+        ts = candle.start_ts if candle.start_ts is not None else np.nan
+        a["start_ts"][i] = a["start_ts"][j] = ts
+        self._objs[i] = candle
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _slot(self, index):
+        """تبدیل اندیس منطقی (۰ = قدیمی‌ترین، ‎-1 = جدیدترین) به خانه‌ی فیزیکی"""
+        n = self._count
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("اندیس کندل خارج از محدوده است")
+        return (self._head - n + index) % self.capacity
+
+    def __getitem__(self, index):
+        return self._objs[self._slot(index)]
+
+    def replace(self, index, candle):
+        """جایگزینی یک کندل ذخیره‌شده (مثلاً کندل اصلاح‌شده پس از تیک دیرهنگام)"""
+        i = self._slot(index)
+        j = i + self.capacity
+        a = self._arrays
+        a["open"][i] = a["open"][j] = candle.open
+        a["high"][i] = a["high"][j] = candle.high
+        a["low"][i] = a["low"][j] = candle.low
+        a["close"][i] = a["close"][j] = candle.close
+        self._objs[i] = candle
+
+    def last(self, n):
+        """لیست n کندل آخر (قدیمی → جدید)؛ فقط n ارجاع کپی می‌شود، نه کل بافر"""
+        n = min(n, self._count)
+        return [self._objs[(self._head - n + k) % self.capacity] for k in range(n)]
+
+    def window(self, n=None):
+        """
+        view بدون کپی از n کندل آخر برای همه‌ی فیلدها.
+        خروجی: dict از نام فیلد به آرایه‌ی NumPy فقط‌خواندنی (قدیمی → جدید)
+        توجه: view تا append بعدی معتبر است؛ برای نگهداری طولانی‌تر .copy() بگیرید.
+        """
+        n = self._count if n is None else min(n, self._count)
+        end = self._head + self.capacity
+        out = {}
+        for f, arr in self._arrays.items():
+            v = arr[end - n:end]
+            v.flags.writeable = False
+            out[f] = v
+        return out
+
+    def field(self, name, n=None):
+        """view بدون کپی از یک فیلد (مثلاً close) برای n کندل آخر"""
+        n = self._count if n is None else min(n, self._count)
+        end = self._head + self.capacity
+        v = self._arrays[name][end - n:end]
+        v.flags.writeable = False
+        return v
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+        self._objs = [None] * self.capacity
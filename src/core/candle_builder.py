@@ -4,115 +4,183 @@
 # ۳. تشخیص بسته شدن کندل دوم
 # ۴. بازگرداندن اطلاعات برای strategy_five_sec.py
 # ۵. ذخیره‌ی چند کندل آخر در حافظه برای تحلیل الگو
+# ۶. مدیریت تیک‌های دیرهنگام/خارج از ترتیب با watermark و پر کردن فاصله‌ها با کندل تخت
+# ۷. به‌روزرسانی اندیکاتورهای افزایشی (IndicatorSet) با هر کندل بسته‌شده
+# ۸. علامت‌گذاری کندل‌هایی که با قطعی اتصال هم‌پوشانی دارند (begin_gap / spans_gap)
 
 """
 ماژول CandleBuilder
 --------------------
 هدف: ساخت کندل‌های ۵ ثانیه‌ای از داده‌های تیک قیمت (tick data)
+منطق جانبی در ماژول‌های جدا: فاصله و قطعی (candle_gaps)، تایم‌فریم‌ها و اصلاح
+(timeframes.MultiTimeframe) و مسیر دسته‌ای add_prices (candle_batch).
 """
 
+import math
 import time
-from collections import deque
-
-class Candle:
-    """
-    کلاس Candle نمایانگر یک کندل واحد (OHLC) است.
-    """
-    def __init__(self, start_ts, end_ts):
-        self.start_ts = start_ts   # زمان شروع کندل (epoch seconds)
-        self.end_ts = end_ts       # زمان پایان کندل
-        self.open = None           # قیمت باز شدن
-        self.close = None          # قیمت بسته شدن
-        self.high = float('-inf')  # بالاترین قیمت
-        self.low = float('inf')    # پایین‌ترین قیمت
-
-    def add_tick(self, price):
-        """
-        افزودن یک تیک قیمت به کندل جاری
-        """
-        if self.open is None:
-            self.open = price
-        self.close = price
-        if price > self.high:
-            self.high = price
-        if price < self.low:
-            self.low = price
-
-    # چند ویژگی مفید برای تحلیل:
-    @property
-    def is_bullish(self):
-        """آیا کندل صعودی است؟"""
-        return self.close > self.open
-
-    @property
-    def is_bearish(self):
-        """آیا کندل نزولی است؟"""
-        return self.close < self.open
-
-    @property
-    def body(self):
-        """طول بدنه کندل"""
-        return abs(self.close - self.open)
-
-    @property
-    def range(self):
-        """بازه‌ی کامل کندل"""
-        return self.high - self.low
-
-    def upper_wick(self):
-        """طول شدوی بالایی"""
-        return self.high - max(self.close, self.open)
-
-    def lower_wick(self):
-        """طول شدوی پایینی"""
-        return min(self.close, self.open) - self.low
-
-
-class CandleBuilder:
+from core.candle import FormingCandle
+from core.candle_batch import CandleBatch
+from core.candle_buffer import CandleRingBuffer
+from core.candle_gaps import CandleGaps
+from core.indicators import IndicatorSet
+from core.outage_gaps import OutageGaps
+from core.timeframes import MultiTimeframe
+
+class CandleBuilder(CandleGaps, MultiTimeframe, CandleBatch):
     """
     مدیریت ساخت و نگهداری کندل‌های ۵ ثانیه‌ای
+
+    زمان تیک‌ها (ts) زمان صرافی است و کندل‌ها بر اساس آن بسته می‌شوند، نه زمان رسیدن:
+        watermark = بیشترین ts دیده‌شده - allowed_lateness
+        هر کندل وقتی بسته می‌شود که watermark از end_ts آن عبور کند.
+    تیکی که بعد از بسته شدن کندلش برسد، اگر هنوز در افق اصلاح باشد کندل را اصلاح
+    می‌کند (on_amend و کندل تایم‌فریم‌های بالاتر)، وگرنه دور ریخته و شمرده می‌شود.
+    اندیکاتورها با اصلاح دوباره محاسبه نمی‌شوند و مقدار لحظه‌ی بسته شدن را نگه می‌دارند.
+
+    قطعی اتصال: begin_gap(ts) از زمان آخرین تیک سالم یک وقفه باز می‌کند و اولین تیک
+    بعد از آن زمان را می‌بندد؛ هر کندلی که با وقفه هم‌پوشانی داشته باشد spans_gap=True
+    می‌گیرد. begin_gap از ترد ناظر اتصال هم امن است (OutageGaps).
     """
 
-    def __init__(self, period_sec=5, max_keep=20):
+    def __init__(self, period_sec=5, max_keep=2000, on_close=None, timeframes=(),
+                 allowed_lateness=0.0, fill_gaps=True, max_gap_fill=720,
+                 on_amend=None, amend_horizon=None, indicators=None, clock=None):
         self.period = period_sec
         self.max_keep = max_keep
-        self.candles = deque(maxlen=max_keep)
-        self.current_candle = None
+        self.candles = CandleRingBuffer(max_keep)   # کندل‌های بسته‌شده (Candle تغییرناپذیر)
+        self.current_candle = None              # FormingCandle در حال ساخت (جدیدترین)
+        self.on_close = on_close                # کال‌بک بسته شدن کندل پایه
+        self.on_amend = on_amend                # کال‌بک کندل اصلاح‌شده پس از تیک دیرهنگام
+        self.clock = clock                      # ServerClock: مرز کندل‌ها بر اساس زمان سرور
+        # اندیکاتورهای افزایشی؛ قبل از on_close به‌روز می‌شوند تا کال‌بک مقدار تازه را ببیند
+        self.indicators = indicators if indicators is not None else IndicatorSet()
+
+        # watermark و تیک‌های دیرهنگام
+        self.allowed_lateness = allowed_lateness
+        self.fill_gaps = fill_gaps              # ساخت کندل تخت برای بازه‌های بدون تیک
+        self.max_gap_fill = max_gap_fill        # بیشترین تعداد کندل تخت پشت سر هم
+        if amend_horizon is None:
+            amend_horizon = math.ceil(allowed_lateness / period_sec) + 1
+        self.amend_horizon = amend_horizon      # تعداد کندل‌های بسته‌شده‌ی قابل اصلاح
+        # تایم‌فریم‌های بالاتر که از کندل‌های پایه ساخته می‌شوند (مثلاً 15, 30, 60, 300)
+        self.timeframes = {}
+        for tf in timeframes:
+            self.add_timeframe(tf)
+
+        self.watermark = None
+        self._max_ts = None
+        self._open = {}                         # اندیس بازه → FormingCandle هنوز بسته‌نشده
+        self._next_idx = None                   # اندیس بازه‌ی بعدی برای بستن
+        self._recent = {}                       # اندیس بازه → (FormingCandle, شماره‌ی ترتیب)
+        self._emitted = 0
+        self._last_close = None
+        self.gaps = OutageGaps()                # وقفه‌های اتصال (امن بین ترد ناظر و ترد تیک)
+
+        # شمارنده‌ها
+        self.late_ticks = 0
+        self.amended = 0
+        self.late_dropped = 0
+        self.gap_candles = 0
+        self.gaps_skipped = 0
+        self.gap_flagged = 0
 
-    def _align_to_period(self, ts):
+    def add_price(self, price, ts=None):
         """
-        تراز کردن زمان روی مضرب‌های ۵ ثانیه
-        (مثلاً 12:00:00 → 12:00:05 → 12:00:10 ...)
+        افزودن یک قیمت جدید و بررسی بستن کندل‌ها. هزینه‌ی هر تیک O(1) است.
+        ts: زمان صرافی (epoch seconds)؛ فقط اگر None باشد زمان فعلی سرور (clock) یا
+        زمان محلی استفاده می‌شود (ts=0 معتبر است و دیگر «نبود زمان» تلقی نمی‌شود).
         """
-        start = ts - (ts % self.period)
-        end = start + self.period
-        return start, end
-
-    def add_price(self, price, ts=None):
+        if ts is None:
+            ts = self.clock.now() if self.clock is not None else time.time()
+        if self.gaps.open is not None:
+            # اولین تیک بعد از قطعی (تیک‌های قدیمی‌تر مانده در صف وقفه را نمی‌بندند)
+            self.gaps.close_by_tick(ts)
+        k = int(ts // self.period)
+        if self._next_idx is None:
+            self._next_idx = k
+
+        if k >= self._next_idx:
+            fc = self._open.get(k)
+            if fc is None:
+                start = k * self.period
+                fc = self._open[k] = FormingCandle(start, start + self.period)
+                cur = self.current_candle
+                if cur is None or start > cur.start_ts:
+                    self.current_candle = fc
+            fc.add_tick(price, ts)
+        else:
+            self._amend(k, price, ts)
+
+        # پیشروی watermark و بستن کندل‌هایی که دیگر تیکی برایشان انتظار نمی‌رود
+        if self._max_ts is None or ts > self._max_ts:
+            self._max_ts = ts
+            self.watermark = ts - self.allowed_lateness
+            if (self._next_idx + 1) * self.period <= self.watermark:
+                self._advance()
+
+    def _advance(self):
+        """بستن همه‌ی بازه‌هایی که end_ts آن‌ها به watermark رسیده، به ترتیب زمان"""
+        p = self.period
+        wm = self.watermark
+        while (self._next_idx + 1) * p <= wm:
+            k = self._next_idx
+            fc = self._open.pop(k, None)
+            if fc is not None:
+                self._emit(k, fc)
+                self._next_idx = k + 1
+            else:
+                self._fill_gap(k, min(self._open) if self._open else int(wm // p))
+
+    def _emit(self, k, fc):
+        """بستن یک FormingCandle و نگه داشتن آن برای اصلاح احتمالی"""
+        recent = self._recent
+        recent[k] = (fc, self._emitted)
+        # کلیدها به ترتیب صعودی درج می‌شوند؛ قدیمی‌ترها از ابتدای dict حذف می‌شوند
+        while len(recent) > self.amend_horizon:
+            del recent[next(iter(recent))]
+        if self.current_candle is fc:
+            self.current_candle = None
+        if self.gaps:
+            fc.spans_gap = self._spans_gap(fc.start_ts, fc.end_ts)
+        self._store(fc.close_candle())
+
+    def _store(self, candle):
         """
-        افزودن یک قیمت جدید و بررسی بستن کندل
+        ذخیره، به‌روزرسانی اندیکاتورها، اطلاع به کال‌بک و ادغام در تایم‌فریم‌های بالاتر
+        (اصلاح بعدی کندل با تیک دیرهنگام به تایم‌فریم‌ها می‌رسد ولی نه به اندیکاتورها)
         """
-        now = ts or time.time()
-
-        # اگر کندل فعلی وجود ندارد، ایجادش کن
-        if self.current_candle is None:
-            start, end = self._align_to_period(now)
-            self.current_candle = Candle(start, end)
-
-        # اگر زمان از پایان کندل فعلی گذشته، کندل را ببند و جدید بساز
-        if now >= self.current_candle.end_ts:
-            self.candles.append(self.current_candle)
-            start, end = self._align_to_period(now)
-            self.current_candle = Candle(start, end)
-
-        # افزودن تیک به کندل فعلی
-        self.current_candle.add_tick(price)
-
-    def get_last_n(self, n):
+        self._emitted += 1
+        self._last_close = candle.close
+        if candle.spans_gap:
+            self.gap_flagged += 1
+        self.candles.append(candle)
+        if self.indicators:
+            self.indicators.update(candle)
+        if self.on_close:
+            self.on_close(candle)
+        if self.timeframes:
+            for agg in self.timeframes.values():
+                agg.add_candle(candle)
+        return candle
+
+    def metrics(self):
+        """شمارنده‌های تیک دیرهنگام و فاصله‌ها"""
+        return {
+            "watermark": self.watermark,
+            "late_ticks": self.late_ticks,
+            "amended": self.amended,
+            "late_dropped": self.late_dropped,
+            "gap_candles": self.gap_candles,
+            "gaps_skipped": self.gaps_skipped,
+            "outages": self.gaps.outages,
+            "gap_flagged": self.gap_flagged,
+        }
+
+    def window(self, n=None):
         """
-        برگرداندن آخرین n کندل بسته شده
+        view بدون کپی (NumPy) از open/high/low/close/start_ts برای n کندل آخر
         """
-        return list(self.candles)[-n:]
+        return self.candles.window(n)
 
     def get_current_open(self):
         """قیمت باز شدن کندل جاری"""
@@ -1,96 +1,39 @@
 import random
+import threading
 import time
-from dataclasses import dataclass
+from core.armed_decision import ArmedDecider
+from core.candle import Candle
+from core.candle_buffer import CandleRingBuffer
+from core.indicators import IndicatorSet
 from core.strategy_five_sec import StrategyFiveSec
-
-# ---------------------------------------------
-# 🧩 کلاس Candle - نمایش ساختار هر کندل ۵ ثانیه‌ای
-# ---------------------------------------------
-@dataclass
-class Candle:
-    open_price: float
-    close_price: float
-    high: float
-    low: float
-
-    @property
-    def open(self) -> float:
-        """معادل open_price برای سازگاری با استراتژی"""
-        return self.open_price
-
-    @property
-    def close(self) -> float:
-        """معادل close_price برای سازگاری با استراتژی"""
-        return self.close_price
-
-    @property
-    def direction(self) -> str:
-        """
-        تشخیص جهت کندل (صعودی / نزولی / دوجی)
-        اگر اختلاف قیمت باز و بسته کمتر از ۰.۰۰۰۱ باشد دوجی است.
-        """
-        if abs(self.close_price - self.open_price) < 0.0001:
-            return "doji"
-        return "bullish" if self.close_price > self.open_price else "bearish"
-
-    @property
-    def upper_shadow(self) -> float:
-        """
-        طول سایه بالایی کندل (فاصله بیشترین قیمت تا بدنه فوقانی)
-        """
-        return self.high - max(self.open_price, self.close_price)
-
-    @property
-    def lower_shadow(self) -> float:
-        """
-        طول سایه پایینی کندل (فاصله کمترین قیمت تا بدنه پایینی)
-        """
-        return min(self.open_price, self.close_price) - self.low
-
-    @property
-    def range(self) -> float:
-        """
-        محدوده‌ی کلی کندل (فاصله بین بیشترین و کمترین قیمت)
-        """
-        return self.high - self.low
-
-    @property
-    def body(self) -> float:
-        """طول بدنهٔ کندل (اختلاف قیمت باز و بسته)"""
-        return abs(self.close_price - self.open_price)
-
-    @property
-    def is_bullish(self) -> bool:
-        """صعودی بودن کندل"""
-        return self.close_price > self.open_price
-
-    @property
-    def is_bearish(self) -> bool:
-        """نزولی بودن کندل"""
-        return self.close_price < self.open_price
-
-    def upper_wick(self) -> float:
-        """alias برای سایهٔ بالایی (مطابق نام مورد انتظار در استراتژی)"""
-        return self.upper_shadow
-
-    def lower_wick(self) -> float:
-        """alias برای سایهٔ پایینی (مطابق نام مورد انتظار در استراتژی)"""
-        return self.lower_shadow
-
+from core.strategy_runner import StrategyRunner
+from core.blocking_poller import BlockingPoller
+from core.timer_wheel import default_wheel
 
 # ---------------------------------------------
 # ⚙️ کلاس CandleEngine - موتور اصلی کندل در حالت تستی
 # ---------------------------------------------
 class CandleEngine:
-    def __init__(self, mode="sim", live_reader=None):
+    def __init__(self, mode="sim", live_reader=None, max_keep=2000, strategy=None, shadows=(),
+                 indicators=None, wheel=None):
         # حالت اجرای موتور (شبیه‌سازی یا زنده)
         self.mode = mode
         # خواننده داده زنده (اگر در حالت زنده استفاده شود)
         self.live_reader = live_reader
-        # لیست آخرین کندل‌ها (حداکثر ۳ عدد)
-        self.candles = []
+        # بافر حلقوی آخرین کندل‌ها (برای اندیکاتورها هزاران کندل نگه داشته می‌شود)
+        self.candles = CandleRingBuffer(max_keep)
         self.running = False
-        self.strategy = StrategyFiveSec(config={})
+        # چرخ زمان‌سنج مشترک (بسته شدن کندل و polling روی یک ترد)
+        self.wheel = wheel or default_wheel()
+        self._done = threading.Event()
+        # استراتژی اصلی (سیگنالش اجرا می‌شود) و استراتژی‌های سایه (فقط ترید فرضی)
+        self.strategy = strategy or StrategyFiveSec(config={})
+        self.runner = StrategyRunner(self.strategy, shadows)
+        # تصمیم دومرحله‌ای حالت زنده: arm هنگام بسته شدن کندل دوم، fire روی تیک‌های کندل سوم
+        self.decider = ArmedDecider(self.strategy, on_signal=self._on_live_signal)
+        # اندیکاتورهای افزایشی که با هر کندل بسته‌شده به‌روز می‌شوند
+        self.indicators = indicators if indicators is not None else IndicatorSet()
+        self.strategy.bind_indicators(self.indicators)
 
     def generate_candle(self, last_close: float) -> Candle:
         """
@@ -104,15 +47,15 @@ class CandleEngine:
         close_price = last_close + change
         high = max(open_price, close_price) + random.uniform(0.05, 0.3)
         low = min(open_price, close_price) - random.uniform(0.05, 0.3)
-        return Candle(open_price, close_price, high, low)
+        return Candle(open_price, high, low, close_price)
 
     def add_candle(self, candle: Candle):
         """
-        افزودن کندل جدید و نگه‌داشتن فقط ۳ کندل آخر
+        افزودن کندل جدید؛ O(1) (بافر حلقوی قدیمی‌ترین کندل را بازنویسی می‌کند)
         """
         self.candles.append(candle)
-        if len(self.candles) > 3:
-            self.candles.pop(0)
+        if self.indicators:
+            self.indicators.update(candle)
 
     def analyze(self):
         """
@@ -121,12 +64,12 @@ class CandleEngine:
         if len(self.candles) < 3:
             return None
 
-        c1, c2, c3 = self.candles
-        current_open = c3.open_price
-        current_price = c3.close_price
+        c1, c2, c3 = self.candles.last(3)
+        current_open = c3.open
+        current_price = c3.close
 
-        # فراخوانی منطق تصمیم‌گیری از StrategyFiveSec
-        result = self.strategy.decide_trade(c1, c2, current_open, current_price)
+        # تصمیم استراتژی اصلی؛ سایه‌ها بعد از آن در ترد جداگانه ارزیابی می‌شوند
+        result = self.runner.on_candle(c1, c2, current_open, current_price)
 
         if result == 0:
             return "BUY"
@@ -135,106 +78,168 @@ class CandleEngine:
         else:
             return None
 
+    def _run_on_wheel(self, duration, timers):
+        """
+        اجرای کارهای زمان‌دار ثبت‌شده روی چرخ تا پایان duration یا stop().
+        ترد فراخواننده فقط منتظر رویداد پایان می‌ماند (بدون حلقه‌ی sleep).
+        """
+        timers.append(self.wheel.call_later(duration, self._done.set))
+        try:
+            self._done.wait()
+        finally:
+            for t in timers:
+                t.cancel()
+
+    def stop(self):
+        """توقف اجرای جاری (شبیه‌سازی یا زنده)"""
+        self.running = False
+        self._done.set()
+
     def run_simulation(self, duration: int = 30, fast: bool = False):
         self.running = True
-        last_close = 100.0  # قیمت شروع فرضی
-        start_time = time.time()
+        self._done.clear()
+        self._last_close = 100.0  # قیمت شروع فرضی
 
         try:
-            while time.time() - start_time < duration:
-                # تولید کندل جدید
-                candle = self.generate_candle(last_close)
-                self.add_candle(candle)
-                last_close = candle.close_price
-
-                # نمایش اطلاعات کندل جدید
-                print(f"\n🕔 کندل جدید:")
-                print(f"Open={candle.open_price:.2f}  Close={candle.close_price:.2f}  "
-                      f"High={candle.high:.2f}  Low={candle.low:.2f}  Dir={candle.direction}")
-
-                # تحلیل و بررسی صدور سیگنال معاملاتی
-                signal = self.analyze()
-                if signal:
-                    print(f"🚀 سیگنال معاملاتی: {signal}")
-
-                # اگر fast برابر False باشد، ۵ ثانیه صبر کن، در غیر این صورت بدون تأخیر ادامه بده
-                if not fast:
-                    time.sleep(5)  # فاصله ۵ ثانیه‌ای بین کندل‌ها (شبیه‌سازی)
+            if fast:
+                # بدون تأخیر: تا پایان duration پشت سر هم کندل ساخته می‌شود
+                start_time = time.time()
+                while self.running and time.time() - start_time < duration:
+                    self._simulate_candle()
+            else:
+                # هر ۵ ثانیه یک کندل روی چرخ زمان‌سنج مشترک
+                self._run_on_wheel(duration, [self.wheel.call_every(5, self._simulate_candle, first=0)])
 
         except KeyboardInterrupt:
             print("\n⏹ شبیه‌سازی به‌صورت دستی متوقف شد.")
         finally:
             self.running = False
+            self.print_shadow_report()
             print("\n✅ شبیه‌سازی به پایان رسید.")
 
+    def _simulate_candle(self):
+        # تولید کندل جدید
+        candle = self.generate_candle(self._last_close)
+        self.add_candle(candle)
+        self._last_close = candle.close
+
+        # نمایش اطلاعات کندل جدید
+        print(f"\n🕔 کندل جدید:")
+        print(f"Open={candle.open:.2f}  Close={candle.close:.2f}  "
+              f"High={candle.high:.2f}  Low={candle.low:.2f}  Dir={candle.direction}")
+
+        # تحلیل و بررسی صدور سیگنال معاملاتی
+        signal = self.analyze()
+        if signal:
+            print(f"🚀 سیگنال معاملاتی: {signal}")
+
     def run_live(self, duration: int = 60):
         """
         اجرای خواندن داده زنده از live_reader و ساخت کندل ۵ ثانیه‌ای
-        هر ۵ ثانیه یک کندل ساخته شده و تحلیل می‌شود.
+        هر ثانیه قیمت خوانده و هر ۵ ثانیه یک کندل ساخته و تحلیل می‌شود
+        (هر دو روی چرخ زمان‌سنج مشترک، بدون حلقه‌ی sleep).
+        اگر live_reader یک DomPriceFeed باشد، قیمت‌ها push می‌شوند و polling فقط پشتیبان است.
+        سیگنال اصلی با ArmedDecider صادر می‌شود (حداکثر window بعد از end_ts کندل دوم).
         """
         if self.live_reader is None:
             print("❌ live_reader تنظیم نشده است.")
             return
 
         self.running = True
-        open_price = None
-        high = None
-        low = None
-        close_price = None
-        start_time = time.time()
-
-        prices = []
-
-        while self.running and time.time() - start_time < duration:
-            # خواندن قیمت زنده از مرورگر از طریق LiveDataReader
-            price = self.live_reader.get_live_price()
-            current_time = time.time()
-
-            # بررسی اینکه قیمت None نباشد تا از خطا جلوگیری شود
-            # این بررسی برای جلوگیری از خطا هنگام خواندن قیمت از مرورگر است.
-            if price is None:
-                print("⚠️ قیمت هنوز بارگذاری نشده، عبور از این مرحله...")
-                time.sleep(1)
-                continue
-
-            if open_price is None:
-                open_price = price
-                high = price
-                low = price
-
-            # بروزرسانی high و low
-            if price > high:
-                high = price
-            if price < low:
-                low = price
-
-            close_price = price
-            prices.append(price)
-
-            # اگر ۵ ثانیه گذشته باشد، کندل ساخته و تحلیل شود
-            if current_time - start_time >= 5:
-                candle = Candle(open_price=open_price, close_price=close_price, high=high, low=low)
-                self.add_candle(candle)
-
-                # نمایش اطلاعات کندل جدید
-                print(f"\n🕔 کندل زنده جدید:")
-                print(f"Open={candle.open_price:.2f}  Close={candle.close_price:.2f}  "
-                      f"High={candle.high:.2f}  Low={candle.low:.2f}  Dir={candle.direction}")
-
-                # تحلیل و بررسی صدور سیگنال معاملاتی
-                signal = self.analyze()
-                if signal:
-                    print(f"🚀 سیگنال معاملاتی زنده: {signal}")
-
-                # آماده‌سازی برای کندل بعدی
-                open_price = None
-                high = None
-                low = None
-                close_price = None
-                prices = []
-                start_time = current_time
-
-            time.sleep(1)  # فاصله ۱ ثانیه‌ای خواندن داده زنده
+        self._done.clear()
+        self._live = None       # [open, high, low, close] کندل در حال ساخت
+        self._live_start = time.time()
+        self._live_lock = threading.Lock()
+
+        # فید push (DomPriceFeed): هر تغییر قیمت همان لحظه به کندل جاری اضافه می‌شود؛
+        # polling هر ثانیه فقط وقتی فید زنده نیست قیمت را مستقیم می‌خواند
+        subscribe = getattr(self.live_reader, "subscribe", None)
+        unsubscribe = getattr(self.live_reader, "unsubscribe", None)
+        if subscribe is not None:
+            subscribe(self._on_live_price)
 
-        self.running = False
-        print("\n✅ حالت زنده پایان یافت.")
\ No newline at end of file
+        try:
+            # خواندن DOM مسدودکننده است (رفت‌وبرگشت CDP و sleep در تلاش دوباره)؛
+            # روی ترد poller انجام می‌شود و فقط قیمت روی چرخ تحویل داده می‌شود
+            poller = BlockingPoller(self.wheel, 1, self._read_live_price, self._on_live_price,
+                                    name="live-poller").start()
+            self._run_on_wheel(duration, [
+                poller,                                                     # خواندن قیمت
+                self.wheel.call_every(5, self._close_live_candle),          # بستن کندل
+            ])
+        except KeyboardInterrupt:
+            print("\n⏹ حالت زنده به‌صورت دستی متوقف شد.")
+        finally:
+            self.running = False
+            # هر اجرای run_live فقط یک بار مشترک فید باشد
+            if subscribe is not None and unsubscribe is not None:
+                unsubscribe(self._on_live_price)
+            self.print_shadow_report()
+            print("\n✅ حالت زنده پایان یافت.")
+
+    def _read_live_price(self):
+        # روی ترد poller (نه ترد چرخ)
+        if getattr(self.live_reader, "fresh", False):
+            return None         # قیمت‌ها با فید push می‌رسند
+        # خواندن قیمت زنده از مرورگر از طریق LiveDataReader
+        price = self.live_reader.get_live_price()
+
+        # بررسی اینکه قیمت None نباشد تا از خطا جلوگیری شود
+        # این بررسی برای جلوگیری از خطا هنگام خواندن قیمت از مرورگر است.
+        if price is None:
+            print("⚠️ قیمت هنوز بارگذاری نشده، عبور از این مرحله...")
+        return price
+
+    def _on_live_price(self, price, ts=None):
+        # از ترد چرخ (polling) یا ترد رویداد pychrome (فید push)
+        if not self.running:
+            return
+        if ts is None:
+            ts = time.time()
+        with self._live_lock:
+            live = self._live
+            if live is None:
+                live = self._live = [price, price, price, price]
+            else:
+                # بروزرسانی high و low و close
+                if price > live[1]:
+                    live[1] = price
+                if price < live[2]:
+                    live[2] = price
+                live[3] = price
+            # شرط پ و خ: هر تیک کندل سوم فقط یک مقایسه روی وضعیت مسلح
+            self.decider.on_tick(live[0], price, ts)
+
+    def _close_live_candle(self):
+        with self._live_lock:
+            live, self._live = self._live, None
+            start, self._live_start = self._live_start, time.time()
+            if live is None:
+                return
+            candle = Candle(*live, start_ts=start, end_ts=self._live_start)
+            # مرحله‌ی اول شرط خ همان لحظه‌ی بسته شدن (سیگنال شدو بدون انتظار برای تیک)
+            self.decider.on_close(candle)
+        self.add_candle(candle)
+
+        # نمایش اطلاعات کندل جدید
+        print(f"\n🕔 کندل زنده جدید:")
+        print(f"Open={candle.open:.2f}  Close={candle.close:.2f}  "
+              f"High={candle.high:.2f}  Low={candle.low:.2f}  Dir={candle.direction}")
+
+        # سایه‌ها روی سه کندل آخر (سیگنال اصلی را ArmedDecider صادر می‌کند)
+        if len(self.candles) >= 3:
+            c1, c2, c3 = self.candles.last(3)
+            self.runner.shadow(c1, c2, c3.open, c3.close)
+
+    def _on_live_signal(self, cmd, candle):
+        print(f"🚀 سیگنال معاملاتی زنده: {'BUY' if cmd == 0 else 'SELL'}")
+
+    def print_shadow_report(self):
+        """نمایش آمار ترید‌های فرضی استراتژی‌های سایه"""
+        if not self.runner.books:
+            return
+        self.runner.flush()
+        print("\n👥 نتایج استراتژی‌های سایه:")
+        for name, s in self.runner.report().items():
+            print(f"{name}: معاملات={s['total']} | برد={s['wins']} | باخت={s['losses']} | "
+                  f"درصد برد={s['winrate']}% | سود/زیان={s['pnl']}")
\ No newline at end of file
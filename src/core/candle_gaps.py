@@ -0,0 +1,60 @@
+# وظایف:
+# ۱. پر کردن بازه‌های بدون تیک با کندل تخت (یا پرش یک‌جا از روی فاصله‌های طولانی)
+# ۲. باز و بسته کردن وقفه‌ی اتصال (begin_gap / end_gap) روی OutageGaps سازنده
+# ۳. علامت‌گذاری کندل‌هایی که با قطعی اتصال هم‌پوشانی دارند (spans_gap)
+
+"""
+ماژول CandleGaps
+-----------------
+منطق فاصله و قطعی CandleBuilder (mixin). سازنده این ویژگی‌ها را نگه می‌دارد:
+    period، fill_gaps، max_gap_fill، gaps (OutageGaps)، _last_close، _next_idx، _max_ts
+و کندل تخت را با _store ذخیره می‌کند.
+"""
+
+from core.candle import Candle
+
+
+class CandleGaps:
+    """
+    بازه‌ی بدون تیک: با fill_gaps کندل تخت روی آخرین قیمت بسته ساخته می‌شود؛
+    فاصله‌ی بیش از max_gap_fill بازه (مثلاً تعطیلی بازار) یا fill_gaps=False یک‌جا رد می‌شود.
+    """
+
+    def _fill_gap(self, k, nxt):
+        """
+        بازه‌ی k تیکی نداشته است؛ nxt اولین بازه‌ی بعدی دارای تیک است.
+        بدون کندل تخت، _next_idx مستقیم به nxt می‌پرد (نه بازه‌به‌بازه).
+        """
+        if self._last_close is None or not self.fill_gaps:
+            self._next_idx = nxt
+            return
+        if nxt - k > self.max_gap_fill:
+            # فاصله‌ی خیلی طولانی: بدون کندل تخت رد می‌شویم
+            self.gaps_skipped += 1
+            self._next_idx = nxt
+            return
+        c = self._last_close
+        p = self.period
+        self._store(Candle(c, c, c, c, k * p, (k + 1) * p, synthetic=True,
+                           spans_gap=self._spans_gap(k * p, (k + 1) * p)))
+        self.gap_candles += 1
+        self._next_idx = k + 1
+
+    def begin_gap(self, ts=None):
+        """
+        شروع وقفه‌ی اتصال از ts (پیش‌فرض: زمان آخرین تیک دیده‌شده).
+        وقفه با اولین تیک بعد از ts یا end_gap بسته می‌شود.
+        """
+        if ts is None:
+            ts = self._max_ts
+            if ts is None:
+                return
+        self.gaps.begin(ts)
+
+    def end_gap(self, ts):
+        """پایان وقفه‌ی باز در زمان ts (زمان اولین تیک بعد از قطعی)"""
+        self.gaps.end(ts)
+
+    def _spans_gap(self, start, end):
+        """آیا بازه‌ی [start, end) کندل با یکی از وقفه‌ها هم‌پوشانی دارد"""
+        return bool(self.gaps) and self.gaps.spans(start, end)
@@ -0,0 +1,80 @@
+# وظایف:
+# ۱. تخمین پیوسته‌ی اختلاف ساعت محلی و ساعت سرور از زمان‌های داخل فریم‌ها
+# ۲. فیلتر مقاوم «کمترین تأخیر»: بیشترین (server_ts - local_ts) در پنجره‌ی غلتان
+# ۳. تبدیل زمان محلی به زمان سرور برای هم‌ترازی کندل‌ها
+# ۴. گزارش offset و jitter به‌عنوان متریک
+
+"""
+ماژول ServerClock
+------------------
+هر نمونه: offset ظاهری = server_ts - local_ts = offset واقعی - تأخیر انتقال.
+چون تأخیر هیچ‌وقت منفی نیست، نمونه‌ی با کمترین تأخیر بیشترین offset ظاهری را دارد؛
+پس بیشینه‌ی پنجره بهترین تخمین offset است (مشابه فیلتر minimum-delay در NTP).
+"""
+
+import time
+from collections import deque
+
+
+class ServerClock:
+    """
+    window: طول پنجره‌ی نمونه‌ها (ثانیه)؛ تغییر ناگهانی ساعت بعد از همین مدت جذب می‌شود
+    jitter: میانگین نمایی فاصله‌ی هر نمونه از تخمین (تأخیر اضافه بر کمترین تأخیر)
+    """
+
+    def __init__(self, window=60.0, jitter_alpha=0.05):
+        self.window = window
+        self.jitter_alpha = jitter_alpha
+        self._max = deque()         # (local_ts, offset) با offset نزولی → بیشینه‌ی پنجره در ابتدا
+        self.offset = None
+        self.jitter = 0.0
+        self.samples = 0
+        self.last_sample = None
+
+    def observe(self, server_ts, local_ts=None):
+        """ثبت یک نمونه (زمان سرور داخل فریم و زمان دریافت محلی)"""
+        if local_ts is None:
+            local_ts = time.time()
+        sample = server_ts - local_ts
+        q = self._max
+        while q and q[-1][1] <= sample:
+            q.pop()
+        q.append((local_ts, sample))
+        cutoff = local_ts - self.window
+        while q[0][0] < cutoff:
+            q.popleft()
+        self.offset = q[0][1]
+        self.jitter += self.jitter_alpha * ((self.offset - sample) - self.jitter)
+        self.samples += 1
+        self.last_sample = local_ts
+        return self.offset
+
+    @property
+    def synced(self):
+        return self.offset is not None
+
+    def to_server(self, local_ts):
+        """تبدیل زمان محلی به زمان تخمینی سرور"""
+        return local_ts + self.offset if self.offset is not None else local_ts
+
+    def now(self):
+        """زمان فعلی سرور (تخمینی)"""
+        return self.to_server(time.time())
+
+    def metrics(self):
+        return {
+            "offset_ms": round(self.offset * 1000, 3) if self.offset is not None else None,
+            "jitter_ms": round(self.jitter * 1000, 3),
+            "samples": self.samples,
+            "sample_age": round(time.time() - self.last_sample, 3) if self.last_sample else None,
+        }
+
+
+def normalize_epoch(value):
+    """زمان سرور به ثانیه (میلی‌ثانیه یا میکروثانیه تشخیص داده و تبدیل می‌شود)"""
+    ts = float(value)
+    if ts > 1e14:
+        return ts / 1e6
+    if ts > 1e11:
+        return ts / 1e3
+    return ts
@@ -0,0 +1,192 @@
+# وظایف:
+# ۱. تشخیص قطعی: بسته شدن نشست CDP تب یا سکوت تیک‌ها بیشتر از silence ثانیه
+# ۲. بازیابی پله‌ای: اول reattach لیسنرها (با مهلت silence ثانیه)، بعد ChromeConnector.connect() از نو
+# ۳. فاصله‌ی تلاش‌ها با backoff نمایی و jitter (بدون تلاش‌های پشت سر هم)
+# ۴. علامت‌گذاری وقفه در CandleBuilder / SymbolRegistry تا استراتژی روی کندل ناقص ترید نکند
+
+"""
+ماژول ConnectionSupervisor
+---------------------------
+ترد ناظر کنار WebSocketHandler (websocket_handler.start_ws_feed هر دو را می‌سازد):
+    supervisor = ConnectionSupervisor(connector, handler, gap_sinks=[builder])
+    supervisor.start()
+شروع وقفه زمان سرور آخرین تیک سالم است و پایان آن اولین تیک بعد از بازیابی
+(که خود CandleBuilder ثبت می‌کند).
+"""
+
+import random
+import threading
+import time
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0, jitter=0.5, rand=random.random):
+    """
+    تأخیر تلاش attempt ام (از ۱): min(cap, base * 2^(attempt-1)) با کاهش تصادفی تا jitter
+    (jitter=0.5 → بین ۵۰٪ و ۱۰۰٪ مقدار نمایی؛ چند کلاینت هم‌زمان پشت سر هم تلاش نمی‌کنند)
+    """
+    delay = min(cap, base * (2 ** (attempt - 1)))
+    return delay * (1.0 - jitter * rand())
+
+
+def tab_alive(tab):
+    """نشست CDP تب هنوز باز است؟ (pychrome با قطع وب‌سوکت DevTools، _stopped را set می‌کند)"""
+    if tab is None:
+        return False
+    stopped = getattr(tab, "_stopped", None)
+    if stopped is not None and stopped.is_set():
+        return False
+    return getattr(tab, "status", "started") != "stopped"
+
+
+class ConnectionSupervisor:
+    """
+    connector: ChromeConnector (برای connect دوباره)
+    handler: WebSocketHandler
+    gap_sinks: اشیای دارای begin_gap(ts) مثل CandleBuilder یا SymbolRegistry
+    silence: ثانیه‌های بدون تیک که قطعی حساب می‌شود
+    clock: ساعت محلی هم‌مبنا با handler.last_tick_local (پیش‌فرض time.time)
+    """
+
+    def __init__(self, connector, handler, gap_sinks=(), silence=10.0, check_interval=1.0,
+                 base_delay=1.0, max_delay=60.0, jitter=0.5, name="ws-supervisor", clock=time.time):
+        self.connector = connector
+        self.handler = handler
+        self.gap_sinks = list(gap_sinks)
+        self.silence = silence
+        self.check_interval = check_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.name = name
+        self.clock = clock
+        self._stop = threading.Event()
+        self._thread = None
+
+        # وضعیت قطعی جاری
+        self.in_outage = False
+        self.attempt = 0
+        self._outage_since = None
+        self._ticks_at_outage = 0
+        self._next_try = 0.0
+
+        # شمارنده‌ها
+        self.outages = 0
+        self.reattaches = 0
+        self.reconnects = 0
+        self.failures = 0
+        self.downtime = 0.0
+        self.last_reason = None
+
+    # ----------------- ترد ناظر ----------------- #
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"⚠️ خطا در ناظر اتصال: {e}")
+
+    def check(self, now=None):
+        """یک دور بررسی (از ترد ناظر؛ برای فراخوانی دستی هم قابل استفاده است)"""
+        if now is None:
+            now = self.clock()
+        h = self.handler
+        if self.in_outage:
+            if h.ticks > self._ticks_at_outage and tab_alive(h.tab):
+                self._recovered(now)
+                return
+        else:
+            alive = tab_alive(h.tab)
+            last = h.last_tick_local
+            silent = last is not None and now - last > self.silence
+            if alive and not silent:
+                return
+            self._begin_outage(now, "نشست CDP بسته شد" if not alive else "سکوت تیک‌ها")
+        if now >= self._next_try:
+            self._recover(now)
+
+    # ----------------- قطعی و بازیابی ----------------- #
+
+    def _begin_outage(self, now, reason):
+        self.in_outage = True
+        self.attempt = 0
+        self._outage_since = now
+        self._ticks_at_outage = self.handler.ticks
+        self._next_try = now
+        self.outages += 1
+        self.last_reason = reason
+        print(f"⚠️ قطعی اتصال ({reason})؛ شروع بازیابی ...")
+        ts = self.handler.last_tick_ts
+        if ts is not None:
+            for sink in self.gap_sinks:
+                sink.begin_gap(ts)
+
+    def _recover(self, now):
+        self.attempt += 1
+        h = self.handler
+        reattached = False
+        try:
+            if self.attempt == 1 and tab_alive(h.tab):
+                # نشست سالم است: فقط لیسنرها و Network دوباره فعال می‌شوند
+                self.reattaches += 1
+                h.reattach()
+                reattached = True
+            else:
+                self.reconnects += 1
+                self._reconnect()
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ تلاش بازیابی {self.attempt} ناموفق بود: {e}")
+        delay = backoff_delay(self.attempt, self.base_delay, self.max_delay, self.jitter)
+        if reattached:
+            # مهلت reattach: بازار ممکن است چند ثانیه تیکی نفرستد؛ قبل از گذشتن silence
+            # ثانیه سکوت، اتصال کامل دوباره انجام نمی‌شود
+            delay = max(delay, self.silence)
+        # فاصله از پایان همین تلاش (connect ممکن است چند ثانیه طول بکشد)
+        self._next_try = self.clock() + delay
+
+    def _reconnect(self):
+        """بستن نشست قبلی و اتصال دوباره با ChromeConnector.connect()"""
+        h = self.handler
+        old = self.connector.tab
+        if old is not None:
+            try:
+                old.stop()
+            except Exception:
+                pass
+        self.connector.tab = None
+        self.connector.connect()
+        h.reattach(self.connector.tab)
+
+    def _recovered(self, now):
+        self.downtime += now - self._outage_since
+        print(f"✅ اتصال بازیابی شد (بعد از {now - self._outage_since:.1f} ثانیه، "
+              f"{self.attempt} تلاش).")
+        self.in_outage = False
+        self.attempt = 0
+        self._outage_since = None
+
+    def metrics(self):
+        return {
+            "in_outage": self.in_outage,
+            "attempt": self.attempt,
+            "outages": self.outages,
+            "reattaches": self.reattaches,
+            "reconnects": self.reconnects,
+            "failures": self.failures,
+            "downtime": round(self.downtime, 3),
+            "last_reason": self.last_reason,
+        }
@@ -0,0 +1,240 @@
+# وظایف:
+# ۱. تزریق یک‌باره‌ی MutationObserver روی المنت قیمت صفحه‌ی Pocket Option
+# ۲. ارسال تغییرات قیمت با Runtime.addBinding (رویداد Runtime.bindingCalled) به‌جای polling
+# ۳. حفظ observer بعد از reload صفحه (Page.addScriptToEvaluateOnNewDocument)
+# ۴. بازگشت به LiveDataReader.get_current_price وقتی فید push زنده نیست
+
+"""
+ماژول DomPriceFeed
+-------------------
+DOM به یک فید push تبدیل می‌شود: هر تغییر متن المنت قیمت همان لحظه با زمان صفحه
+(performance.timeOrigin + performance.now()) به پایتون فرستاده می‌شود.
+اسکریپت هر HEARTBEAT_MS یک ضربان هم می‌فرستد تا بتوان زنده بودن فید را از
+بدون تغییر ماندن قیمت تشخیص داد.
+"""
+
+import json
+import time
+
+from core.latency import LatencyHistogram
+from core.live_data_reader import LiveDataReader
+
+BINDING_NAME = "__botTradePrice"
+PRICE_SELECTORS = (".price", ".price-value", ".chart__price", ".trade-price", ".current-price")
+HEARTBEAT_MS = 1000
+
+_OBSERVER_JS = """
+(function(binding, selectors, heartbeatMs) {
+    if (window.__botTradeFeed) { window.__botTradeFeed.disconnect(); }
+    let el = null, last = null, watcher = null, finder = null, beat = null;
+    const now = () => performance.timeOrigin + performance.now();
+    const send = (kind) => {
+        const text = el ? (el.innerText || el.textContent || "").trim() : "";
+        if (kind === "p") {
+            if (!text || text === last) return;
+            last = text;
+        }
+        try { window[binding](kind + "|" + now() + "|" + (text || "")); } catch (e) {}
+    };
+    const find = () => {
+        for (const s of selectors) {
+            const e = document.querySelector(s);
+            if (e && (e.innerText || e.textContent)) return e;
+        }
+        return null;
+    };
+    const attach = () => {
+        el = find();
+        if (!el) return false;
+        if (watcher) watcher.disconnect();
+        watcher = new MutationObserver(() => {
+            if (!el.isConnected) { el = null; watcher.disconnect(); watchDocument(); return; }
+            send("p");
+        });
+        watcher.observe(el, {characterData: true, childList: true, subtree: true});
+        send("p");
+        return true;
+    };
+    const watchDocument = () => {
+        // المنت هنوز ساخته نشده (یا با رندر دوباره حذف شده): منتظر ظاهر شدنش می‌مانیم
+        if (finder) finder.disconnect();
+        finder = new MutationObserver(() => { if (attach()) { finder.disconnect(); finder = null; } });
+        finder.observe(document.documentElement, {childList: true, subtree: true});
+    };
+    if (!attach()) watchDocument();
+    // ضربان فقط وقتی المنت قیمت زیر نظر است (وگرنه فید مرده حساب شود و polling برگردد)
+    beat = setInterval(() => { if (el) send("h"); }, heartbeatMs);
+    window.__botTradeFeed = {
+        disconnect() {
+            if (watcher) watcher.disconnect();
+            if (finder) finder.disconnect();
+            clearInterval(beat);
+        }
+    };
+})(%s, %s, %d);
+"""
+
+_DISCONNECT_JS = "window.__botTradeFeed && window.__botTradeFeed.disconnect();"
+
+
+def observer_script(binding=BINDING_NAME, selectors=PRICE_SELECTORS, heartbeat_ms=HEARTBEAT_MS):
+    """متن اسکریپت observer با نام binding و سلکتورهای داده‌شده"""
+    return _OBSERVER_JS % (json.dumps(binding), json.dumps(list(selectors)), heartbeat_ms)
+
+
+def parse_payload(payload):
+    """
+    "p|<epoch ms>|<متن قیمت>" → (kind, ts به ثانیه, price یا None)
+    kind: "p" تغییر قیمت، "h" ضربان
+    """
+    kind, ts_ms, text = payload.split("|", 2)
+    ts = float(ts_ms) / 1000.0
+    text = text.replace(",", "").strip()
+    price = float(text) if text else None
+    return kind, ts, price
+
+
+class DomPriceFeed:
+    """
+    tab: تب pychrome صفحه‌ی Pocket Option
+    fallback: LiveDataReader برای حالت غیرفعال بودن فید (پیش‌فرض: روی همان تب ساخته می‌شود)
+    stale_after: ثانیه‌های بدون پیام (قیمت یا ضربان) که فید مرده حساب می‌شود
+    clock: ServerClock اختیاری برای تبدیل زمان صفحه به زمان سرور
+    """
+
+    def __init__(self, tab, fallback=None, selectors=PRICE_SELECTORS, binding=BINDING_NAME,
+                 stale_after=3.0, clock=None):
+        self.tab = tab
+        self.fallback = fallback
+        self.selectors = tuple(selectors)
+        self.binding = binding
+        self.stale_after = stale_after
+        self.clock = clock
+        self.active = False
+        self._script_id = None
+        self._listeners = []
+        self.last_price = None
+        self.last_ts = None
+        self._last_message = None       # زمان محلی آخرین پیام (قیمت یا ضربان)
+
+        # شمارنده‌ها
+        self.updates = 0
+        self.heartbeats = 0
+        self.fallback_reads = 0
+        self.errors = 0
+        self.dispatch = LatencyHistogram("dom_dispatch")
+
+    def subscribe(self, callback):
+        """callback(price, ts) با هر تغییر قیمت (روی ترد رویداد pychrome)"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        """حذف کال‌بک ثبت‌شده با subscribe (اگر ثبت نشده باشد کاری نمی‌کند)"""
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    # ----------------- راه‌اندازی ----------------- #
+
+    def start(self):
+        """
+        ثبت binding و تزریق observer. اگر هر مرحله خطا بدهد، فید غیرفعال می‌ماند و
+        get_live_price از LiveDataReader استفاده می‌کند.
+        """
+        if self.active:
+            return True
+        script = observer_script(self.binding, self.selectors)
+        try:
+            self.tab.set_listener("Runtime.bindingCalled", self._on_binding)
+            self.tab.call_method("Runtime.enable")
+            self.tab.call_method("Runtime.addBinding", name=self.binding)
+            result = self.tab.call_method("Page.addScriptToEvaluateOnNewDocument", source=script)
+            self._script_id = (result or {}).get("identifier")
+            self.tab.call_method("Runtime.evaluate", expression=script)
+        except Exception as e:
+            print(f"⚠️ فید قیمت DOM فعال نشد، استفاده از polling: {e}")
+            self.active = False
+            return False
+        self.active = True
+        # فید تا رسیدن اولین پیام binding زنده حساب نمی‌شود (fresh=False → polling)
+        self._last_message = None
+        print("🟢 فید قیمت DOM (MutationObserver + addBinding) فعال شد.")
+        return True
+
+    def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        self._last_message = None
+        try:
+            self.tab.call_method("Runtime.evaluate", expression=_DISCONNECT_JS)
+            if self._script_id is not None:
+                self.tab.call_method("Page.removeScriptToEvaluateOnNewDocument",
+                                     identifier=self._script_id)
+            self.tab.call_method("Runtime.removeBinding", name=self.binding)
+            self.tab.set_listener("Runtime.bindingCalled", None)
+        except Exception as e:
+            print(f"⚠️ خطا در غیرفعال‌سازی فید قیمت DOM: {e}")
+        self._script_id = None
+
+    # ----------------- رویداد binding ----------------- #
+
+    def _on_binding(self, **kwargs):
+        if kwargs.get("name") != self.binding:
+            return
+        local_ts = time.time()
+        try:
+            kind, page_ts, price = parse_payload(kwargs.get("payload") or "")
+        except (ValueError, TypeError):
+            self.errors += 1
+            return
+        self._last_message = local_ts
+        self.dispatch.record(max(0.0, local_ts - page_ts))
+        if kind != "p" or price is None:
+            self.heartbeats += 1
+            return
+        ts = self.clock.to_server(page_ts) if self.clock is not None else page_ts
+        self.last_price = price
+        self.last_ts = ts
+        self.updates += 1
+        for cb in self._listeners:
+            try:
+                cb(price, ts)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ خطا در کال‌بک فید قیمت DOM: {e}")
+
+    # ----------------- سازگاری با LiveDataReader ----------------- #
+
+    @property
+    def fresh(self):
+        """فید push زنده است (پیامی در stale_after ثانیه‌ی اخیر رسیده)"""
+        return (self.active and self._last_message is not None
+                and time.time() - self._last_message <= self.stale_after)
+
+    def get_live_price(self):
+        """
+        همان رابط LiveDataReader برای CandleEngine: قیمت push اگر فید زنده باشد،
+        وگرنه خواندن مستقیم DOM با LiveDataReader.
+        """
+        if self.fresh and self.last_price is not None:
+            return self.last_price
+        if self.fallback is None:
+            self.fallback = LiveDataReader(tab=self.tab)
+        self.fallback_reads += 1
+        price = self.fallback.get_live_price()
+        if price is not None:
+            self.last_price = price
+        return price
+
+    def metrics(self):
+        return {
+            "active": self.active,
+            "fresh": self.fresh,
+            "updates": self.updates,
+            "heartbeats": self.heartbeats,
+            "fallback_reads": self.fallback_reads,
+            "errors": self.errors,
+            "dispatch": self.dispatch.snapshot(),
+        }
@@ -0,0 +1,201 @@
+# وظایف:
+# ۱. دسته‌بندی ارزان هر فریم وب‌سوکت با پیشوندش (بدون try/except روی هر فریم)
+# ۲. پشتیبانی از بسته‌های socket.io (‎42[...]‎، ‎451-[...]‎) و پیوست‌های باینری آن‌ها
+# ۳. دور ریختن ping/pong و رویدادهای نامرتبط قبل از هر parse
+# ۴. استفاده از orjson / ujson در صورت نصب بودن (وگرنه json استاندارد)
+
+"""
+ماژول FrameDecoder
+-------------------
+قالب engine.io / socket.io در فریم‌های متنی:
+    "2" / "3"                 → ping / pong (دور ریخته می‌شود)
+    "42[\"event\", ...]"       → رویداد socket.io
+    "42/ns,17[\"event\", ...]" → رویداد با namespace و شناسه‌ی ack
+    "451-[\"event\", {\"_placeholder\": true, \"num\": 0}]"
+                              → رویداد باینری؛ داده در فریم(های) باینری بعدی می‌آید
+فریم‌های باینری در DevTools به‌صورت Base64 (opcode=2) می‌رسند.
+"""
+
+import binascii
+import json
+
+try:
+    import orjson as _fast_json
+    JSON_BACKEND = "orjson"
+except ImportError:
+    try:
+        import ujson as _fast_json
+        JSON_BACKEND = "ujson"
+    except ImportError:
+        _fast_json = None
+        JSON_BACKEND = "json"
+
+json_loads = _fast_json.loads if _fast_json is not None else json.loads
+
+OPCODE_TEXT = 1
+OPCODE_BINARY = 2
+
+
+def _fill_placeholders(node, attachments):
+    """جایگزینی {"_placeholder": true, "num": n} با پیوست n ام"""
+    if isinstance(node, dict):
+        if node.get("_placeholder") is True and "num" in node:
+            return attachments[node["num"]]
+        return {k: _fill_placeholders(v, attachments) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_fill_placeholders(v, attachments) for v in node]
+    return node
+
+
+class FrameDecoder:
+    """
+    decode(payload, opcode) → (event, data) یا None
+        event: نام رویداد socket.io (برای JSON ساده None)
+        data: آرگومان رویداد (اگر چند آرگومان باشد لیست آن‌ها)
+    events: مجموعه‌ی نام رویدادهای مورد نیاز؛ None → همه
+    """
+
+    def __init__(self, events=None):
+        self.events = frozenset(events) if events is not None else None
+        self._pending = None        # [event, args, تعداد پیوست باقی‌مانده, پیوست‌ها]
+
+        # شمارنده‌ها
+        self.frames = 0
+        self.decoded = 0
+        self.control = 0            # ping/pong/connect/...
+        self.filtered = 0           # رویدادهای نامرتبط (بدون parse)
+        self.attachments = 0
+        self.ignored = 0
+        self.errors = 0
+
+    # ----------------- ورودی ----------------- #
+
+    def decode(self, payload, opcode=OPCODE_TEXT):
+        self.frames += 1
+        if not payload:
+            return None
+        try:
+            if opcode == OPCODE_BINARY:
+                return self._binary(binascii.a2b_base64(payload))
+            return self._text(payload)
+        except (ValueError, TypeError, IndexError, KeyError, binascii.Error):
+            self.errors += 1
+            return None
+
+    # ----------------- فریم متنی ----------------- #
+
+    def _text(self, s):
+        c = s[0]
+        if c == "4":
+            if len(s) > 1 and s[1] in "25":
+                return self._socketio(s)
+            self.control += 1       # connect / disconnect / ack
+            return None
+        if c == "{" or c == "[":
+            return self._done(None, json_loads(s))
+        if c in "0123456":
+            self.control += 1       # open / close / ping / pong / upgrade / noop
+            return None
+        # سازگاری قبلی: JSON کدشده با Base64 در فریم متنی («ey» → ‎{"‎ و «W» → ‎[‎)
+        if s.startswith("ey") or c == "W":
+            raw = binascii.a2b_base64(s).strip()
+            if raw[:1] in (b"{", b"["):
+                return self._done(None, json_loads(raw))
+        self.ignored += 1
+        return None
+
+    def _socketio(self, s):
+        """بسته‌ی EVENT (‎42‎) یا BINARY_EVENT (‎45‎)"""
+        i = 2
+        n = len(s)
+        binary = s[1] == "5"
+        count = 0
+        if binary:
+            j = s.index("-", i)
+            count = int(s[i:j])
+            i = j + 1
+        if i < n and s[i] == "/":
+            # namespace تا ویرگول
+            i = s.index(",", i) + 1
+        while i < n and s[i].isdigit():
+            # شناسه‌ی ack
+            i += 1
+        if i >= n or s[i] != "[":
+            self.ignored += 1
+            return None
+
+        # نام رویداد بدون parse کل پیام
+        event = None
+        if s.startswith('["', i):
+            end = s.index('"', i + 2)
+            event = s[i + 2:end]
+            if self.events is not None and event not in self.events:
+                self.filtered += 1
+                if binary and count:
+                    # پیوست‌های این رویداد هم باید بدون parse رد شوند
+                    self._pending = [None, None, count, None]
+                return None
+
+        args = json_loads(s[i:])
+        if args and isinstance(args[0], str):
+            event = args[0]
+            args = args[1:]
+        if binary and count:
+            self._pending = [event, args, count, []]
+            return None
+        return self._done(event, args[0] if len(args) == 1 else args)
+
+    # ----------------- فریم باینری ----------------- #
+
+    def _binary(self, raw):
+        if raw[:1] == b"\x04":
+            # پیشوند نوع پیام در engine.io v3
+            raw = raw[1:]
+        pending = self._pending
+        if pending is not None:
+            self.attachments += 1
+            pending[2] -= 1
+            if pending[3] is not None:
+                pending[3].append(self._attachment(raw))
+            if pending[2] > 0:
+                return None
+            self._pending = None
+            event, args, _, attachments = pending
+            if attachments is None:
+                return None
+            args = _fill_placeholders(args, attachments)
+            return self._done(event, args[0] if len(args) == 1 else args)
+
+        raw = raw.strip()
+        if raw[:1] in (b"{", b"["):
+            return self._done(None, json_loads(raw))
+        self.ignored += 1
+        return None
+
+    @staticmethod
+    def _attachment(raw):
+        """پیوست باینری: اگر متن JSON باشد parse می‌شود، وگرنه همان bytes"""
+        head = raw.lstrip()[:1]
+        if head in (b"{", b"["):
+            return json_loads(raw)
+        return raw
+
+    def reset(self):
+        """فراموش کردن پیوست‌های نیمه‌کاره (بعد از قطع و اتصال دوباره‌ی وب‌سوکت)"""
+        self._pending = None
+
+    def _done(self, event, data):
+        self.decoded += 1
+        return event, data
+
+    def metrics(self):
+        return {
+            "json_backend": JSON_BACKEND,
+            "frames": self.frames,
+            "decoded": self.decoded,
+            "control": self.control,
+            "filtered": self.filtered,
+            "attachments": self.attachments,
+            "ignored": self.ignored,
+            "errors": self.errors,
+        }
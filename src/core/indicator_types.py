@@ -0,0 +1,218 @@
+# وظایف:
+# ۱. اندیکاتورهای افزایشی با هزینه‌ی O(1) برای هر کندل بسته‌شده:
+#    EMA، SMA، RSI، ATR، پهنای بولینگر، نوسان غلتان (volatility)
+# ۲. میانگین/واریانس غلتان پایدار (Welford) برای بولینگر و نوسان
+
+"""
+ماژول indicator_types
+----------------------
+هر اندیکاتور فقط update(candle) دارد و مقدار فعلی در value نگه داشته می‌شود
+(تا زمانی که داده‌ی کافی نرسیده باشد value برابر None است).
+مجموعه‌ی نام‌دار و snapshot در core.indicators است (از همان‌جا import کنید).
+"""
+
+import math
+from collections import deque
+
+
+class Indicator:
+    """کلاس پایه: update(candle) و value"""
+
+    __slots__ = ("period", "value")
+
+    def __init__(self, period):
+        if period < 1:
+            raise ValueError(f"دوره‌ی اندیکاتور نامعتبر است: {period}")
+        self.period = period
+        self.value = None
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def update(self, candle):
+        raise NotImplementedError
+
+
+class _RollingMoments:
+    """
+    میانگین و واریانس یک پنجره‌ی غلتان با به‌روزرسانی افزودن/حذف (Welford)؛
+    پایدارتر از مجموع مربعات برای قیمت‌هایی با نوسان خیلی کوچک.
+    """
+
+    __slots__ = ("window", "mean", "m2")
+
+    def __init__(self, period):
+        self.window = deque(maxlen=period)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x):
+        w = self.window
+        if len(w) == w.maxlen:
+            y = w[0]
+            w.append(x)
+            n = len(w)
+            old_mean = self.mean
+            self.mean += (x - y) / n
+            self.m2 += (x - y) * (x - self.mean + y - old_mean)
+        else:
+            w.append(x)
+            n = len(w)
+            d = x - self.mean
+            self.mean += d / n
+            self.m2 += d * (x - self.mean)
+
+    @property
+    def full(self):
+        return len(self.window) == self.window.maxlen
+
+    def std(self):
+        n = len(self.window)
+        return math.sqrt(max(self.m2, 0.0) / n) if n else 0.0
+
+
+class SMA(Indicator):
+    """میانگین ساده‌ی close در period کندل آخر (مجموع غلتان)"""
+
+    __slots__ = ("_window", "_sum")
+
+    def __init__(self, period=20):
+        super().__init__(period)
+        self._window = deque(maxlen=period)
+        self._sum = 0.0
+
+    def update(self, candle):
+        w = self._window
+        if len(w) == w.maxlen:
+            self._sum -= w[0]
+        w.append(candle.close)
+        self._sum += candle.close
+        if len(w) == w.maxlen:
+            self.value = self._sum / len(w)
+
+
+class EMA(Indicator):
+    """میانگین نمایی close با alpha = 2 / (period + 1)؛ مقدار اولیه = SMA اولین period کندل"""
+
+    __slots__ = ("alpha", "_count", "_sum")
+
+    def __init__(self, period=20):
+        super().__init__(period)
+        self.alpha = 2.0 / (period + 1)
+        self._count = 0
+        self._sum = 0.0
+
+    def update(self, candle):
+        if self.value is not None:
+            self.value += self.alpha * (candle.close - self.value)
+            return
+        self._count += 1
+        self._sum += candle.close
+        if self._count == self.period:
+            self.value = self._sum / self.period
+
+
+class RSI(Indicator):
+    """RSI با هموارسازی Wilder"""
+
+    __slots__ = ("_prev", "_count", "_gain", "_loss")
+
+    def __init__(self, period=14):
+        super().__init__(period)
+        self._prev = None
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def update(self, candle):
+        close = candle.close
+        prev, self._prev = self._prev, close
+        if prev is None:
+            return
+        change = close - prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        n = self.period
+        if self._count < n:
+            # دوره‌ی اول: میانگین ساده
+            self._count += 1
+            self._gain += gain
+            self._loss += loss
+            if self._count < n:
+                return
+            self._gain /= n
+            self._loss /= n
+        else:
+            self._gain = (self._gain * (n - 1) + gain) / n
+            self._loss = (self._loss * (n - 1) + loss) / n
+        if self._loss == 0:
+            self.value = 100.0 if self._gain > 0 else 50.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+
+
+class ATR(Indicator):
+    """میانگین True Range با هموارسازی Wilder"""
+
+    __slots__ = ("_prev_close", "_count", "_sum")
+
+    def __init__(self, period=14):
+        super().__init__(period)
+        self._prev_close = None
+        self._count = 0
+        self._sum = 0.0
+
+    def update(self, candle):
+        pc = self._prev_close
+        self._prev_close = candle.close
+        if pc is None:
+            tr = candle.high - candle.low
+        else:
+            tr = max(candle.high, pc) - min(candle.low, pc)
+        n = self.period
+        if self.value is not None:
+            self.value = (self.value * (n - 1) + tr) / n
+            return
+        self._count += 1
+        self._sum += tr
+        if self._count == n:
+            self.value = self._sum / n
+
+
+class BollingerWidth(Indicator):
+    """پهنای نسبی باند بولینگر: (بالا - پایین) / میانه = 2·k·std / SMA"""
+
+    __slots__ = ("k", "_moments")
+
+    def __init__(self, period=20, k=2.0):
+        super().__init__(period)
+        self.k = k
+        self._moments = _RollingMoments(period)
+
+    def update(self, candle):
+        m = self._moments
+        m.push(candle.close)
+        if m.full and m.mean:
+            self.value = 2.0 * self.k * m.std() / m.mean
+
+
+class RollingVolatility(Indicator):
+    """انحراف معیار بازده لگاریتمی close در period کندل آخر"""
+
+    __slots__ = ("_prev", "_moments")
+
+    def __init__(self, period=20):
+        super().__init__(period)
+        self._prev = None
+        self._moments = _RollingMoments(period)
+
+    def update(self, candle):
+        close = candle.close
+        prev, self._prev = self._prev, close
+        if not prev or close <= 0:
+            return
+        m = self._moments
+        m.push(math.log(close / prev))
+        if m.full:
+            self.value = m.std()
@@ -0,0 +1,108 @@
+# وظایف:
+# ۱. مجموعه‌ی اندیکاتورها (IndicatorSet) که به CandleBuilder / CandleEngine وصل می‌شود
+# ۲. خواندن مقدار فعلی بدون محاسبه‌ی دوباره (هم در حالت زنده و هم در بک‌تست)
+# ۳. عکس فقط‌خواندنی از مجموعه (IndicatorSnapshot) با همان رابط IndicatorSet برای بک‌تست
+# ۴. مجموعه‌ی پیش‌فرض (default_indicators)
+
+"""
+ماژول Indicators
+-----------------
+خود اندیکاتورهای افزایشی (EMA، SMA، RSI، ATR، BollingerWidth، RollingVolatility)
+در core.indicator_types تعریف و از همین ماژول هم صادر می‌شوند.
+"""
+
+from core.indicator_types import ATR, EMA, RSI, SMA, BollingerWidth, RollingVolatility
+
+
+class IndicatorSet:
+    """
+    مجموعه‌ی نام‌دار اندیکاتورها؛ update(candle) یک بار برای هر کندل بسته‌شده.
+    indicators["rsi"] → مقدار فعلی (یا None)
+    """
+
+    def __init__(self, indicators=None):
+        self._items = {}
+        for name, ind in (indicators or {}).items():
+            self.add(name, ind)
+
+    def add(self, name, indicator):
+        self._items[name] = indicator
+        return indicator
+
+    def update(self, candle):
+        for ind in self._items.values():
+            ind.update(candle)
+
+    def get(self, name):
+        return self._items[name]
+
+    def __getitem__(self, name):
+        return self._items[name].value
+
+    def __contains__(self, name):
+        return name in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def values(self):
+        """مقدار فعلی همه‌ی اندیکاتورها: {نام: مقدار}"""
+        return {name: ind.value for name, ind in self._items.items()}
+
+    def snapshot(self):
+        """عکس فقط‌خواندنی از مقدار فعلی همه‌ی اندیکاتورها (IndicatorSnapshot)"""
+        return IndicatorSnapshot(
+            {name: IndicatorValue(ind.period, ind.value) for name, ind in self._items.items()})
+
+
+class IndicatorValue:
+    """مقدار ثابت‌شده‌ی یک اندیکاتور (value و ready مثل Indicator، بدون update)"""
+
+    __slots__ = ("period", "value")
+
+    def __init__(self, period, value):
+        object.__setattr__(self, "period", period)
+        object.__setattr__(self, "value", value)
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("مقدار اندیکاتور در snapshot قابل تغییر نیست")
+
+    def __repr__(self):
+        return f"IndicatorValue(period={self.period}, value={self.value})"
+
+
+class IndicatorSnapshot(IndicatorSet):
+    """
+    عکس فقط‌خواندنی IndicatorSet در لحظه‌ی بسته شدن یک کندل (برای بک‌تست):
+    get(name).value / .ready، snapshot["rsi"]، in، len و values() مثل حالت زنده؛
+    add و update مجاز نیستند.
+    """
+
+    def __init__(self, items):
+        self._items = items
+
+    def add(self, name, indicator):
+        raise TypeError("IndicatorSnapshot فقط‌خواندنی است")
+
+    def update(self, candle):
+        raise TypeError("IndicatorSnapshot فقط‌خواندنی است")
+
+    def snapshot(self):
+        return self
+
+
+def default_indicators():
+    """مجموعه‌ی پیش‌فرض اندیکاتورها برای استراتژی‌ها"""
+    return IndicatorSet({
+        "ema_fast": EMA(9),
+        "ema_slow": EMA(21),
+        "sma": SMA(20),
+        "rsi": RSI(14),
+        "atr": ATR(14),
+        "bb_width": BollingerWidth(20, 2.0),
+        "volatility": RollingVolatility(20),
+    })
@@ -0,0 +1,151 @@
+# وظایف:
+# ۱. صف محدود تک‌تولیدکننده/تک‌مصرف‌کننده بین کال‌بک CDP و پردازش تیک‌ها
+# ۲. ترد مصرف‌کننده‌ی اختصاصی؛ ترد رویداد pychrome هرگز منتظر پردازش نمی‌ماند
+# ۳. سیاست صف پر: دور ریختن قدیمی‌ترین (drop_oldest) یا نگه داشتن آخرین قیمت هر نماد (coalesce)
+# ۴. شمارنده‌های عمق صف، دور ریخته‌ها، ادغام‌شده‌ها و تأخیر ماندن در صف
+
+"""
+ماژول IngestQueue
+------------------
+push(price, ts, symbol) فقط یک append روی deque است (در CPython اتمیک، بدون قفل).
+در حالت coalesce، وقتی صف پر شود تیک‌ها در دیکشنری «آخرین قیمت هر نماد» ادغام می‌شوند
+تا مصرف‌کننده صف را خالی کند؛ ترتیب زمانی هر نماد حفظ می‌شود.
+"""
+
+import threading
+import time
+from collections import deque
+
+from core.latency import LatencyHistogram
+
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+POLICIES = (DROP_OLDEST, COALESCE)
+
+
+class IngestQueue:
+    """
+    consumer(price, ts, symbol): پردازش تیک در ترد مصرف‌کننده (مثلاً WebSocketHandler._dispatch)
+    maxsize: سقف عمق صف
+    policy: DROP_OLDEST یا COALESCE
+    """
+
+    def __init__(self, consumer, maxsize=4096, policy=DROP_OLDEST, name="ingest"):
+        if policy not in POLICIES:
+            raise ValueError(f"سیاست صف نامعتبر است: {policy} (مجاز: {', '.join(POLICIES)})")
+        if maxsize <= 0:
+            raise ValueError(f"اندازه‌ی صف نامعتبر است: {maxsize}")
+        self.consumer = consumer
+        self.maxsize = maxsize
+        self.policy = policy
+        self.name = name
+        self._q = deque()
+        self._latest = {}               # نماد → (price, ts, symbol, t_enq) در حالت coalesce
+        self._latest_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+        # شمارنده‌ها
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.wait = LatencyHistogram("ingest_wait")
+
+    # ----------------- سمت تولیدکننده (ترد CDP) ----------------- #
+
+    def push(self, price, ts, symbol=None):
+        """قرار دادن تیک بدون انتظار؛ خروجی False یعنی تیکی دور ریخته یا ادغام شد"""
+        item = (price, ts, symbol, time.perf_counter())
+        self.enqueued += 1
+        q = self._q
+        accepted = True
+        if self.policy == COALESCE and (self._latest or len(q) >= self.maxsize):
+            # تا تخلیه‌ی کامل صف، همه‌ی تیک‌ها ادغام می‌شوند (ترتیب هر نماد به هم نمی‌خورد)
+            with self._latest_lock:
+                if symbol in self._latest:
+                    self.coalesced += 1
+                    accepted = False
+                self._latest[symbol] = item
+        else:
+            if len(q) >= self.maxsize:
+                try:
+                    q.popleft()
+                    self.dropped += 1
+                    accepted = False
+                except IndexError:
+                    pass            # مصرف‌کننده همین حالا صف را خالی کرد
+            q.append(item)
+            depth = len(q)
+            if depth > self.max_depth:
+                self.max_depth = depth
+        self._wake.set()
+        return accepted
+
+    # ----------------- سمت مصرف‌کننده ----------------- #
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """توقف ترد بعد از پردازش تیک‌های باقی‌مانده"""
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            self._drain()
+            self._wake.clear()
+            if self._q or self._latest:
+                continue
+            if not self._running:
+                break
+            self._wake.wait(0.1)
+
+    def _drain(self):
+        q = self._q
+        while q:
+            self._consume(q.popleft())
+        if self._latest:
+            # صف خالی است؛ آخرین قیمت‌های ادغام‌شده جدیدترین داده‌ها هستند
+            with self._latest_lock:
+                latest, self._latest = self._latest, {}
+            for item in sorted(latest.values(), key=lambda it: it[1]):
+                self._consume(item)
+
+    def _consume(self, item):
+        price, ts, symbol, t_enq = item
+        self.wait.record(time.perf_counter() - t_enq)
+        try:
+            self.consumer(price, ts, symbol)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ خطا در پردازش تیک صف ورودی: {e}")
+        self.processed += 1
+
+    @property
+    def depth(self):
+        return len(self._q) + len(self._latest)
+
+    def metrics(self):
+        return {
+            "policy": self.policy,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "wait": self.wait.snapshot(),
+        }
@@ -0,0 +1,92 @@
+# وظایف:
+# ۱. هیستوگرام تأخیر با سطل‌های ثابت (ثبت O(1) بدون نگه داشتن تک‌تک نمونه‌ها)
+# ۲. خلاصه‌ی آماری: تعداد، میانگین، بیشینه و صدک‌های تقریبی (p50، p90، p99)
+# ۳. نمایش متنی هیستوگرام برای لاگ و کنسول
+
+"""
+ماژول LatencyHistogram
+-----------------------
+اندازه‌گیری تأخیر تصمیم و زمان‌بندی (ورودی به ثانیه، گزارش به میلی‌ثانیه).
+"""
+
+from bisect import bisect_left
+
+# مرزهای بالایی سطل‌ها (میلی‌ثانیه)؛ ۱۵ms همان سقف شرط خ است
+DEFAULT_BOUNDS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 15, 25, 50, 100, 250, 1000)
+
+
+class LatencyHistogram:
+    """
+    record(seconds) → افزودن یک نمونه
+    سطل i شامل نمونه‌های (bounds[i-1], bounds[i]] است و سطل آخر همه‌ی نمونه‌های بزرگ‌تر
+    """
+
+    def __init__(self, name="latency", bounds_ms=DEFAULT_BOUNDS_MS):
+        self.name = name
+        self.bounds = tuple(bounds_ms)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.min_ms = None
+
+    def record(self, seconds):
+        ms = seconds * 1000.0
+        self.counts[bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        if self.min_ms is None or ms < self.min_ms:
+            self.min_ms = ms
+
+    def percentile(self, p):
+        """صدک تقریبی (مرز بالای سطلی که صدک p در آن است)"""
+        if not self.count:
+            return None
+        target = self.count * p / 100.0
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def over(self, limit_ms):
+        """تعداد نمونه‌های بزرگ‌تر از limit_ms (limit_ms باید یکی از مرزها باشد)"""
+        i = bisect_left(self.bounds, limit_ms)
+        return sum(self.counts[i + 1:])
+
+    def snapshot(self):
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "name": self.name,
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 4) if self.count else None,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+    def format(self, width=40):
+        """هیستوگرام متنی (فقط سطل‌های غیرخالی)"""
+        lines = [f"⏱ {self.name}: n={self.count}"]
+        if not self.count:
+            return lines[0]
+        peak = max(self.counts)
+        lo = 0
+        for i, n in enumerate(self.counts):
+            hi = self.bounds[i] if i < len(self.bounds) else None
+            if n:
+                label = f"{lo}–{hi} ms" if hi is not None else f">{lo} ms"
+                bar = "█" * max(1, round(n * width / peak))
+                lines.append(f"{label:>14} | {bar} {n}")
+            if hi is not None:
+                lo = hi
+        return "\n".join(lines)
@@ -1,4 +1,7 @@
 from core.chrome_connector import ChromeConnector
+from core.blocking_poller import BlockingPoller
+from core.timer_wheel import default_wheel
+import threading
 import time
 
 # ---------------------------------------------------------
@@ -111,22 +114,33 @@ class LiveDataReader:
         print(f"⚠️ بعد از {attempts} تلاش، قیمت جدید دریافت نشد. بازگرداندن آخرین قیمت معتبر: {self.last_price}")
         return self.last_price
 
-    def collect_candle_loop(self, duration=30):
+    def collect_candle_loop(self, duration=30, wheel=None):
         """
         اجرای حلقه‌ی دریافت داده زنده به مدت مشخص (پیش‌فرض: ۳۰ ثانیه)
-        هر ۵ ثانیه قیمت فعلی خوانده می‌شود.
+        هر ۵ ثانیه قیمت فعلی خوانده می‌شود؛ خواندن مسدودکننده روی ترد BlockingPoller
+        و چاپ نتیجه روی چرخ مشترک انجام می‌شود.
         """
         print("🔹 شروع دریافت داده زنده از Pocket Option ...")
-        start_time = time.time()
+        wheel = wheel or default_wheel()
+        done = threading.Event()
 
-        while time.time() - start_time < duration:
+        def read():
             price = self.get_current_price()
-            if price:
-                print(f"📡 قیمت فعلی: {price}")
-            else:
+            if not price:
                 print("⚠️ قیمت یافت نشد (ممکن است Selector اشتباه باشد).")
+                return None
+            return price
 
-            time.sleep(5)
+        def show(price):
+            print(f"📡 قیمت فعلی: {price}")
+
+        timers = [BlockingPoller(wheel, 5, read, show, name="live-reader-poller").start(),
+                  wheel.call_later(duration, done.set)]
+        try:
+            done.wait()
+        finally:
+            for t in timers:
+                t.cancel()
 
         print("✅ پایان دریافت داده زنده.")
 
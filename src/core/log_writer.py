@@ -0,0 +1,195 @@
+# وظایف:
+# ۱. دریافت رکوردها در یک صف محدود در حافظه و بازگشت فوری به ترد معاملاتی
+# ۲. تخلیه‌ی صف در یک ترد جداگانه و نوشتن دسته‌ای (بر اساس اندازه یا زمان)
+# ۳. flush و close تمیز هنگام خاموش شدن
+# ۴. شمارنده‌ی عمق صف و رکوردهای دور ریخته شده (backpressure، بعد از close یا خطای sink)
+
+"""
+ماژول BackgroundLogWriter
+--------------------------
+نویسنده‌ی پس‌زمینه: تأخیر دیسک را از مسیر سفارش (order path) خارج می‌کند.
+"""
+
+import queue
+import threading
+import time
+
+_STOP = object()
+_TIMEOUT = object()
+
+
+class _FlushRequest:
+    """نشانگر flush در صف؛ بعد از نوشتن همه‌ی رکوردهای قبلی event آن set می‌شود."""
+    __slots__ = ("event",)
+
+    def __init__(self):
+        self.event = threading.Event()
+
+
+class BackgroundLogWriter:
+    """
+    sink(records): تابعی که یک لیست رکورد را یک‌جا می‌نویسد (مثلاً TradeJournal.append_many)
+    اگر صف پر باشد، رکورد جدید دور ریخته و در dropped شمرده می‌شود؛ put هرگز منتظر دیسک نمی‌ماند.
+    هر رکوردی که نوشته نشود در dropped است: صف پر، put بعد از close و دسته‌ی ناموفق sink
+    (written + dropped = همه‌ی put ها، بعد از close).
+    """
+
+    def __init__(self, sink, max_queue: int = 10000, batch_size: int = 256,
+                 flush_interval: float = 0.2, name: str = "log-writer"):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._q = queue.Queue(maxsize=max_queue)
+        # بررسی _closed و درج در صف زیر یک قفل: هیچ رکوردی بعد از نشانگر توقف در صف نمی‌رود
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stop_sent = False
+
+        # شمارنده‌ها
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_depth = 0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ----------------- سمت تولیدکننده ----------------- #
+
+    def put(self, rec) -> bool:
+        """
+        قرار دادن رکورد در صف بدون انتظار.
+        خروجی: True اگر پذیرفته شد، False اگر به خاطر پر بودن صف یا بسته بودن دور ریخته شد.
+        """
+        with self._lock:
+            if self._closed:
+                self.dropped += 1
+                return False
+            try:
+                self._q.put_nowait(rec)
+            except queue.Full:
+                self.dropped += 1
+                return False
+        depth = self._q.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        انتظار تا نوشته شدن همه‌ی رکوردهایی که تا این لحظه در صف بوده‌اند.
+        """
+        if self._closed or not self._thread.is_alive():
+            return False
+        req = _FlushRequest()
+        try:
+            self._q.put(req, timeout=timeout)
+        except queue.Full:
+            return False
+        return req.event.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> bool:
+        """
+        نوشتن باقی‌مانده‌ی صف و توقف ترد نویسنده.
+        اگر صف پر باشد، تا خالی شدن جا (حداکثر timeout) برای نشانگر توقف صبر می‌کند و
+        در هر حال منتظر پایان ترد می‌ماند. خروجی: True اگر ترد نویسنده تمام شده باشد
+        (فقط بعد از آن بستن sink امن است).
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            self._closed = True
+        if not self._stop_sent:
+            # put دیگر رکوردی نمی‌پذیرد، پس ترد نویسنده صف را خالی می‌کند و جا باز می‌شود
+            while self._thread.is_alive():
+                try:
+                    self._q.put(_STOP, timeout=max(0.0, min(0.1, deadline - time.monotonic())))
+                    self._stop_sent = True
+                    break
+                except queue.Full:
+                    if time.monotonic() >= deadline:
+                        print("⚠️ صف لاگ در مهلت close خالی نشد؛ ترد نویسنده هنوز فعال است.")
+                        break
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        return not self._thread.is_alive()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._q.qsize()
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_depth": self.max_depth,
+            "dropped": self.dropped,
+            "written": self.written,
+            "batches": self.batches,
+            "errors": self.errors,
+        }
+
+    # ----------------- ترد نویسنده ----------------- #
+
+    def _run(self):
+        pending = []
+        first_at = None
+        while True:
+            if pending:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - first_at))
+            else:
+                timeout = None
+            try:
+                item = self._q.get(timeout=timeout)
+            except queue.Empty:
+                item = _TIMEOUT
+
+            if item is _TIMEOUT:
+                # مهلت زمانی دسته تمام شد
+                self._write(pending)
+                pending, first_at = [], None
+                continue
+            if item is _STOP:
+                self._write(pending)
+                self._drain()
+                return
+            if isinstance(item, _FlushRequest):
+                self._write(pending)
+                pending, first_at = [], None
+                item.event.set()
+                continue
+
+            if not pending:
+                first_at = time.monotonic()
+            pending.append(item)
+            if len(pending) >= self.batch_size:
+                self._write(pending)
+                pending, first_at = [], None
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            self.sink(batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            # خطای دیسک نباید ترد نویسنده را از کار بیندازد؛ رکوردهای دسته از دست رفته‌اند
+            self.errors += 1
+            with self._lock:
+                self.dropped += len(batch)
+            print(f"⚠️ خطا در نوشتن دسته‌ی لاگ ({len(batch)} رکورد از دست رفت): {e}")
+
+    def _drain(self):
+        """
+        بعد از نشانگر توقف: flush های منتظر آزاد و رکوردهای احتمالی (که دیگر نوشته
+        نمی‌شوند) در dropped شمرده می‌شوند
+        """
+        while True:
+            try:
+                item = self._q.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, _FlushRequest):
+                item.event.set()
+            elif item is not _STOP:
+                with self._lock:
+                    self.dropped += 1
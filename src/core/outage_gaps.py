@@ -0,0 +1,75 @@
+# وظایف:
+# ۱. نگهداری وقفه‌های اتصال [شروع، پایان] یک CandleBuilder به ترتیب زمان
+# ۲. دسترسی امن بین ترد ناظر اتصال (begin) و ترد پردازش تیک (close_by_tick / spans)
+# ۳. بستن وقفه فقط با تیکی که بعد از شروع آن است (تیک‌های مانده در صف ورودی وقفه را نمی‌بندند)
+
+"""
+ماژول OutageGaps
+-----------------
+ConnectionSupervisor هنگام قطعی begin_gap را از ترد خودش صدا می‌زند، در حالی که ترد صف
+ورودی ممکن است وسط add_price باشد؛ همه‌ی تغییرات فهرست وقفه‌ها زیر یک قفل انجام می‌شود.
+مسیر داغ add_price فقط یک خواندن اتمیک (open is None) دارد و قفل نمی‌گیرد.
+"""
+
+import math
+import threading
+
+
+class OutageGaps:
+    """
+    begin(ts): شروع وقفه از زمان سرور آخرین تیک سالم
+    close_by_tick(ts): اولین تیک با زمان بعد از شروع، وقفه را می‌بندد
+    spans(start, end): آیا کندل [start, end) با یکی از وقفه‌ها هم‌پوشانی دارد
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gaps = []         # [شروع، پایان] به ترتیب زمان
+        self.open = None        # وقفه‌ی باز (پایان = inf تا اولین تیک بعدی)
+        self.outages = 0
+
+    def __bool__(self):
+        return bool(self._gaps)
+
+    def begin(self, ts):
+        """شروع وقفه در ts؛ اگر وقفه‌ای باز باشد کاری نمی‌کند. خروجی: آیا وقفه‌ی جدید باز شد"""
+        with self._lock:
+            if self.open is not None:
+                return False
+            self.open = [ts, math.inf]
+            self._gaps.append(self.open)
+            self.outages += 1
+            return True
+
+    def end(self, ts):
+        """پایان وقفه‌ی باز در زمان ts (بدون شرط؛ برای فراخوانی صریح end_gap)"""
+        with self._lock:
+            gap = self.open
+            if gap is None:
+                return
+            gap[1] = max(ts, gap[0])
+            self.open = None
+
+    def close_by_tick(self, ts):
+        """
+        بستن وقفه‌ی باز با تیک ts. تیکی که زمانش بعد از شروع وقفه نیست، قبل از قطعی
+        دریافت شده و هنوز در صف ورودی بوده است؛ وقفه را نمی‌بندد.
+        """
+        with self._lock:
+            gap = self.open
+            if gap is None or ts <= gap[0]:
+                return
+            gap[1] = ts
+            self.open = None
+
+    def spans(self, start, end):
+        """آیا بازه‌ی [start, end) کندل با یکی از وقفه‌ها هم‌پوشانی دارد"""
+        with self._lock:
+            gaps = self._gaps
+            # کندل‌ها به ترتیب زمان بسته می‌شوند؛ وقفه‌های تمام‌شده قبل از این کندل دیگر لازم نیستند
+            while gaps and gaps[0][1] <= start:
+                del gaps[0]
+            for g_start, g_end in gaps:
+                if g_start < end and g_end > start:
+                    return True
+            return False
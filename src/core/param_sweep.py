@@ -0,0 +1,208 @@
+# وظایف:
+# ۱. ساخت فضای پارامترها: شبکه‌ی کامل (grid) یا جستجوی تصادفی با seed ثابت
+# ۲. اجرای موازی بک‌تست‌ها روی چند هسته (ProcessPoolExecutor)
+# ۳. اشتراک فقط‌خواندنی تیک‌ها بین پروسس‌ها با فایل .npy و mmap (بدون کپی برای هر کار)
+# ۴. ذخیره‌ی نتیجه‌ی هر ترکیب به محض پایان (قابل ادامه بعد از قطع) و جدول رتبه‌بندی
+
+"""
+ماژول ParameterSweep
+---------------------
+تنظیم پارامترهای استراتژی و مارتینگل با بک‌تست روی تیک‌های ضبط‌شده.
+پارامترهای قابل جستجو همان کلیدهای config هستند:
+    doji_body_ratio، parallel_max_range، martingale_step، max_steps، reverse_trading، ...
+"""
+
+import csv
+import itertools
+import json
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from core.backtest import Backtester
+from core.trade_journal import FSYNC_ALWAYS, TradeJournal
+
+RANK_KEYS = ("pnl", "winrate", "total", "max_loss_streak", "max_drawdown")
+
+
+def grid_space(grid):
+    """
+    grid: dict نام پارامتر → لیست مقادیر
+    خروجی: لیست همه‌ی ترکیب‌ها (dict)
+    """
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def random_space(space, samples, seed=0):
+    """
+    space: dict نام پارامتر → لیست مقادیر (انتخاب تصادفی) یا (min, max) (یکنواخت؛
+           اگر هر دو int باشند عدد صحیح)
+    seed ثابت → همان نمونه‌ها در اجرای دوباره (لازمه‌ی ادامه‌ی sweep)
+    """
+    rnd = random.Random(seed)
+    names = sorted(space)
+    out = []
+    for _ in range(samples):
+        params = {}
+        for n in names:
+            v = space[n]
+            if isinstance(v, tuple) and len(v) == 2:
+                lo, hi = v
+                if isinstance(lo, int) and isinstance(hi, int):
+                    params[n] = rnd.randint(lo, hi)
+                else:
+                    params[n] = rnd.uniform(lo, hi)
+            else:
+                params[n] = rnd.choice(list(v))
+        out.append(params)
+    return out
+
+
+def params_key(params):
+    """کلید یکتای یک ترکیب (برای رد کردن ترکیب‌های انجام‌شده)"""
+    return json.dumps(params, sort_keys=True)
+
+
+def max_drawdown(equity):
+    """بیشترین افت از سقف منحنی سرمایه (عدد مثبت)"""
+    if len(equity) == 0:
+        return 0.0
+    curve = np.concatenate(([0.0], equity))
+    return float(np.max(np.maximum.accumulate(curve) - curve))
+
+
+# ----------------- سمت پروسس کارگر ----------------- #
+
+_WORKER = {}
+
+
+def _init_worker(ticks_path, base_config, period_sec, payout):
+    """
+    یک بار در هر پروسس: mmap فایل تیک‌ها و ساخت کندل‌ها.
+    کندل‌ها به پارامترهای جستجو وابسته نیستند، پس بین همه‌ی کارهای این پروسس مشترک‌اند.
+    """
+    data = np.load(ticks_path, mmap_mode="r")
+    ts, px = data[0], data[1]
+    candles = Backtester(base_config, period_sec=period_sec, payout=payout).build_candles(ts, px)
+    _WORKER.update(ts=ts, px=px, candles=candles, config=base_config,
+                   period=period_sec, payout=payout)
+
+
+def _run_one(params):
+    cfg = dict(_WORKER["config"])
+    cfg.update(params)
+    result = Backtester(cfg, period_sec=_WORKER["period"], payout=_WORKER["payout"]).run(
+        _WORKER["ts"], _WORKER["px"], candles=_WORKER["candles"])
+    s = result.stats
+    return {
+        "params": params,
+        "total": s["total"],
+        "wins": s["wins"],
+        "losses": s["losses"],
+        "winrate": s["winrate"],
+        "pnl": s["pnl"],
+        "max_loss_streak": s["max_loss_streak"],
+        "max_drawdown": round(max_drawdown(result.equity), 2),
+    }
+
+
+# ----------------- سمت پروسس اصلی ----------------- #
+
+class ParameterSweep:
+    """
+    out_dir/
+        ticks.npy      → تیک‌های مشترک (2×N float64) که کارگرها با mmap باز می‌کنند
+        results.jsonl  → یک خط برای هر ترکیب تمام‌شده (ادامه‌ی کار از همین فایل)
+        ranked.csv     → جدول رتبه‌بندی بر اساس rank_by
+    """
+
+    def __init__(self, timestamps, prices, base_config=None, out_dir="logs/sweep",
+                 period_sec=5, payout=0.8, workers=None, rank_by="pnl"):
+        if rank_by not in RANK_KEYS:
+            raise ValueError(f"معیار رتبه‌بندی نامعتبر است: {rank_by}")
+        self.ts = np.asarray(timestamps, dtype=np.float64)
+        self.px = np.asarray(prices, dtype=np.float64)
+        self.base_config = dict(base_config or {})
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.period = period_sec
+        self.payout = payout
+        self.workers = workers
+        self.rank_by = rank_by
+        self.journal = TradeJournal(self.out_dir / "results.jsonl", fsync=FSYNC_ALWAYS)
+
+    def _share_ticks(self):
+        """نوشتن تیک‌ها در یک فایل .npy برای mmap فقط‌خواندنی در کارگرها"""
+        path = self.out_dir / "ticks.npy"
+        np.save(path, np.vstack((self.ts, self.px)))
+        return str(path)
+
+    def done(self):
+        """کلید ترکیب‌های انجام‌شده در اجراهای قبلی"""
+        return {params_key(r["params"]) for r in self.journal.iter_records() if "params" in r}
+
+    def run(self, combos):
+        """
+        اجرای ترکیب‌های باقی‌مانده (ترکیب‌های موجود در results.jsonl دوباره اجرا نمی‌شوند).
+        با Ctrl+C کارهای در صف لغو می‌شوند و نتایج ذخیره‌شده حفظ می‌شوند.
+        خروجی: جدول رتبه‌بندی‌شده
+        """
+        done = self.done()
+        pending, seen = [], set(done)
+        for p in combos:
+            key = params_key(p)
+            if key not in seen:
+                seen.add(key)
+                pending.append(p)
+        print(f"🔷 sweep: {len(pending)} ترکیب باقی‌مانده ({len(done)} ترکیب قبلاً انجام شده)")
+        if pending:
+            self._run_pool(pending)
+        ranked = self.ranked()
+        self.write_table(ranked)
+        return ranked
+
+    def _run_pool(self, pending):
+        ticks_path = self._share_ticks()
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(ticks_path, self.base_config, self.period, self.payout))
+        finished = 0
+        try:
+            futures = [pool.submit(_run_one, p) for p in pending]
+            for fut in as_completed(futures):
+                try:
+                    rec = fut.result()
+                except Exception as e:
+                    print(f"❌ خطا در اجرای یک ترکیب: {e}")
+                    continue
+                self.journal.append(rec)
+                finished += 1
+                print(f"✅ [{finished}/{len(pending)}] {rec['params']} → "
+                      f"pnl={rec['pnl']} winrate={rec['winrate']}%")
+        except KeyboardInterrupt:
+            print("⚠️ sweep متوقف شد؛ نتایج ذخیره‌شده در اجرای بعدی ادامه داده می‌شوند.")
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            pool.shutdown(wait=True)
+            self.journal.close()
+
+    def ranked(self, top=None):
+        """نتایج مرتب‌شده (بیشترین pnl/winrate/total، کمترین streak/drawdown)"""
+        rows = [r for r in self.journal.iter_records() if "params" in r]
+        reverse = self.rank_by not in ("max_loss_streak", "max_drawdown")
+        rows.sort(key=lambda r: r[self.rank_by], reverse=reverse)
+        return rows[:top] if top else rows
+
+    def write_table(self, rows, path=None):
+        """نوشتن جدول رتبه‌بندی در CSV (یک ستون برای هر پارامتر)"""
+        path = Path(path or self.out_dir / "ranked.csv")
+        names = sorted({k for r in rows for k in r["params"]})
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            w = csv.writer(fh)
+            w.writerow(["rank"] + names + list(RANK_KEYS))
+            for i, r in enumerate(rows, 1):
+                w.writerow([i] + [r["params"].get(n) for n in names] + [r[k] for k in RANK_KEYS])
+        return path
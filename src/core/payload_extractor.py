@@ -0,0 +1,248 @@
+# وظایف:
+# ۱. یادگیری ساختار پیام هر رویداد در اولین فریمی که قیمت دارد
+# ۲. ساخت یک accessor مستقیم (بستار روی کلیدها) برای همان مسیر (قیمت، نماد، زمان سرور)
+# ۳. cache بر اساس نام رویداد: فریم‌های بعدی فقط یک lookup و یک فراخوانی
+# ۴. cache بر اساس شکل: هر مسیر فقط یک بار ساخته می‌شود؛ شکل‌های دیگر همان رویداد
+#    (مثلاً دو نوع فریم یک‌درمیان) قبل از جستجوی دوباره امتحان می‌شوند
+# ۵. شمارنده‌های hit / miss / یادگیری برای متریک‌ها
+
+"""
+ماژول PayloadExtractor
+-----------------------
+الگوهای قابل یادگیری (در هر عمق تا MAX_DEPTH):
+    {"price": 1.2345, "symbol": "EURUSD", "time": 1700000000}
+    {"data": {"price": ...}}  /  [{"price": ...}, ...]
+    [["EURUSD_otc", 1700000000.123, 1.0845], ...]   (نماد، زمان، قیمت)
+اگر رکورد داخل یک لیست باشد، accessor همه‌ی ردیف‌های آن لیست را برمی‌گرداند
+(چند نماد در یک فریم updateStream).
+اگر accessor روی فریمی شکست بخورد، شکل‌های قبلی همان رویداد امتحان و در غیر این صورت
+همان فریم دوباره یاد گرفته می‌شود (accessor هر شکل فقط یک بار ساخته می‌شود)؛ اگر آن فریم
+قیمتی نداشته باشد (ضربان/وضعیت با همان نام رویداد)، accessor قبلی حفظ می‌شود.
+"""
+
+from operator import itemgetter
+
+from core.clock_sync import normalize_epoch
+
+MAX_DEPTH = 4
+PRICE_KEYS = ("price", "bid", "rate")
+SYMBOL_KEYS = ("symbol", "asset", "pair", "instrument")
+TS_KEYS = ("time", "timestamp", "ts", "t")
+
+# رویدادی که قیمت ندارد؛ بعد از RETRY_AFTER فریم دوباره امتحان می‌شود
+RETRY_AFTER = 256
+# حداکثر شکل‌های قبلی نگه‌داشته‌شده برای هر رویداد
+MAX_ALTERNATES = 4
+
+_ACCESSOR_ERRORS = (KeyError, IndexError, TypeError, ValueError)
+
+
+def _is_number(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _is_price(v):
+    """عدد یا رشته‌ی عددی (مثل "1.08453")"""
+    if _is_number(v):
+        return True
+    if isinstance(v, str):
+        try:
+            float(v)
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+def _find_shape(data, path=(), depth=0):
+    """
+    جستجوی اولین رکورد قیمت. خروجی: (مسیر رکورد، کلید قیمت، کلید نماد، کلید زمان) یا None
+    """
+    if isinstance(data, dict):
+        for key in PRICE_KEYS:
+            if _is_price(data.get(key)):
+                sym = next((k for k in SYMBOL_KEYS if isinstance(data.get(k), str)), None)
+                ts = next((k for k in TS_KEYS if _is_number(data.get(k))), None)
+                return path, key, sym, ts
+        if depth < MAX_DEPTH:
+            for key, value in data.items():
+                if isinstance(value, (dict, list)):
+                    found = _find_shape(value, path + (key,), depth + 1)
+                    if found:
+                        return found
+        return None
+    if isinstance(data, list) and data:
+        # رکورد موقعیتی: [نماد، زمان، قیمت]
+        if len(data) >= 3 and isinstance(data[0], str) and _is_number(data[1]) and _is_number(data[2]):
+            return path, 2, 0, 1
+        if depth < MAX_DEPTH and isinstance(data[0], (dict, list)):
+            return _find_shape(data[0], path + (0,), depth + 1)
+    return None
+
+
+def _path_getter(keys):
+    """تابع d → d[k0][k1]... برای مسیر ثابت keys (بستار روی مسیر، بدون تولید کد)"""
+    if not keys:
+        return None
+    if len(keys) == 1:
+        return itemgetter(keys[0])
+    if len(keys) == 2:
+        k0, k1 = keys
+
+        def get(d):
+            return d[k0][k1]
+        return get
+
+    def get(d):
+        for k in keys:
+            d = d[k]
+        return d
+    return get
+
+
+def _row_getter(price_key, symbol_key, ts_key):
+    """تابع r → (price, symbol, ts)؛ کلید None یعنی مقدار None"""
+    if symbol_key is not None and ts_key is not None:
+        return itemgetter(price_key, symbol_key, ts_key)
+    if symbol_key is not None:
+        def row(r):
+            return r[price_key], r[symbol_key], None
+    elif ts_key is not None:
+        def row(r):
+            return r[price_key], None, r[ts_key]
+    else:
+        def row(r):
+            return r[price_key], None, None
+    return row
+
+
+def compile_accessor(path, price_key, symbol_key, ts_key):
+    """
+    ساخت تابع مستقیم d → [(price, symbol, ts), ...] برای یک مسیر یادگرفته‌شده.
+    اندیس عددی در مسیر یعنی ورود به لیست (کلیدهای JSON همیشه رشته‌اند)؛ آخرین اندیس
+    به حلقه روی همه‌ی ردیف‌های آن لیست تبدیل می‌شود.
+    accessor بستاری روی کلیدهاست (itemgetter)؛ هیچ کدی از روی ورودی خارجی ساخته نمی‌شود.
+    """
+    for k in path + (price_key, symbol_key, ts_key):
+        if k is not None and not isinstance(k, (str, int)):
+            raise TypeError(f"کلید نامعتبر در مسیر: {k!r}")
+    row = _row_getter(price_key, symbol_key, ts_key)
+    rows = max((i for i, k in enumerate(path) if isinstance(k, int)), default=None)
+    if rows is None:
+        record = _path_getter(path)
+        if record is None:
+            def accessor(d):
+                return [row(d)]
+        else:
+            def accessor(d):
+                return [row(record(d))]
+        shape = "d" + "".join(f"[{k!r}]" for k in path) + f"[{price_key!r}]"
+    else:
+        outer = _path_getter(path[:rows]) or (lambda d: d)
+        inner = _path_getter(path[rows + 1:])
+        if inner is None:
+            def accessor(d):
+                return [row(r) for r in outer(d)]
+        else:
+            def accessor(d):
+                return [row(inner(r)) for r in outer(d)]
+        shape = ("d" + "".join(f"[{k!r}]" for k in path[:rows]) + "[*]"
+                 + "".join(f"[{k!r}]" for k in path[rows + 1:]) + f"[{price_key!r}]")
+    accessor.shape = shape
+    return accessor
+
+
+class PayloadExtractor:
+    """
+    extract(event, data) → لیست (price, symbol, server_ts) یا None
+    event: نام رویداد socket.io (برای JSON ساده None)
+    فقط رویدادی که هیچ‌وقت قیمت نداشته به‌صورت منفی cache می‌شود.
+    """
+
+    def __init__(self):
+        self._cache = {}            # رویداد → accessor یا شمارنده‌ی فریم‌های بدون قیمت
+        self._by_shape = {}         # شکل (خروجی _find_shape) → accessor ساخته‌شده
+        self._alternates = {}       # رویداد → accessor های قبلی همان رویداد (جدیدتر اول)
+        self.hits = 0
+        self.misses = 0
+        self.learned = 0
+        self.no_price = 0
+
+    def extract(self, event, data):
+        entry = self._cache.get(event)
+        if entry is not None and not isinstance(entry, int):
+            result = self._apply(entry, data)
+            if result:
+                self.hits += 1
+                return result
+            # فریم با ساختار دیگر: اول شکل‌های قبلی همین رویداد، بعد جستجوی مسیر جدید؛
+            # اگر قیمتی نباشد (ضربان/وضعیت) accessor فعلی برای فریم‌های بعدی می‌ماند
+            self.misses += 1
+            for alt in self._alternates.get(event, ()):
+                result = self._apply(alt, data)
+                if result:
+                    self._activate(event, alt)
+                    return result
+            shape = _find_shape(data)
+            if shape is None:
+                return None
+            return self._use(event, shape, data)
+        if isinstance(entry, int):
+            # رویداد بدون قیمت: فقط هر RETRY_AFTER فریم یک بار دوباره بررسی می‌شود
+            if entry < RETRY_AFTER:
+                self._cache[event] = entry + 1
+                self.no_price += 1
+                return None
+        return self._learn(event, data)
+
+    def _learn(self, event, data):
+        shape = _find_shape(data)
+        if shape is None:
+            self._cache[event] = 0
+            self.no_price += 1
+            return None
+        return self._use(event, shape, data)
+
+    def _use(self, event, shape, data):
+        """accessor همان شکل (فقط بار اول ساخته می‌شود) برای رویداد فعال می‌شود"""
+        accessor = self._by_shape.get(shape)
+        if accessor is None:
+            accessor = self._by_shape[shape] = compile_accessor(*shape)
+            self.learned += 1
+        self._activate(event, accessor)
+        # None: ردیف‌های بعدی لیست شکل ردیف اول را ندارند
+        return self._apply(accessor, data)
+
+    def _activate(self, event, accessor):
+        """accessor فعال رویداد عوض می‌شود؛ قبلی در فهرست شکل‌های جایگزین می‌ماند"""
+        prev = self._cache.get(event)
+        self._cache[event] = accessor
+        alternates = [a for a in self._alternates.get(event, ()) if a is not accessor]
+        if prev is not None and not isinstance(prev, int) and prev is not accessor:
+            alternates.insert(0, prev)
+        self._alternates[event] = alternates[:MAX_ALTERNATES]
+
+    def _apply(self, accessor, data):
+        try:
+            return self._rows(accessor(data)) or None
+        except _ACCESSOR_ERRORS:
+            return None
+
+    @staticmethod
+    def _rows(rows):
+        return [(float(price), str(sym) if sym is not None else None,
+                 normalize_epoch(ts) if _is_number(ts) else None)
+                for price, sym, ts in rows]
+
+    def shapes(self):
+        """مسیر یادگرفته‌شده برای هر رویداد"""
+        return {str(e): a.shape for e, a in self._cache.items() if not isinstance(a, int)}
+
+    def metrics(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "learned": self.learned,
+            "no_price": self.no_price,
+            "shapes": self.shapes(),
+        }
@@ -0,0 +1,90 @@
+# وظایف:
+# ۱. تعریف رابط مشترک استراتژی‌ها برای CandleEngine و StrategyRunner
+# ۲. نام‌گذاری استراتژی‌ها برای گزارش ترید‌های فرضی (shadow)
+# ۳. تصمیم دومرحله‌ای: arm(c1, c2) هنگام بسته شدن کندل دوم، fire روی قیمت کندل سوم
+
+"""
+ماژول Strategy
+---------------
+هر استراتژی فقط decide_trade(c1, c2, current_open, current_price) را پیاده‌سازی می‌کند:
+    ۰ → خرید، ۱ → فروش، None → عدم ترید
+"""
+
+# شرط کندل سوم در ArmedSignal
+FIRE_ALWAYS = 0      # بدون شرط (مثلاً قاعده‌ی شدو)
+FIRE_IF_UP = 1       # current_price >= current_open
+FIRE_IF_DOWN = -1    # current_price <= current_open
+
+
+class ArmedSignal:
+    """
+    وضعیت فشرده‌ی «مسلح»: همه‌ی شرط‌های وابسته به c1/c2 از قبل حل شده‌اند و
+    روی هر تیک کندل سوم فقط یک مقایسه باقی می‌ماند.
+    """
+
+    __slots__ = ("direction", "condition")
+
+    def __init__(self, direction, condition=FIRE_ALWAYS):
+        self.direction = direction
+        self.condition = condition
+
+    def fire(self, current_open, current_price):
+        cond = self.condition
+        if cond == FIRE_ALWAYS:
+            return self.direction
+        if current_open is None:
+            return None
+        if cond == FIRE_IF_UP:
+            return self.direction if current_price >= current_open else None
+        return self.direction if current_price <= current_open else None
+
+    def __repr__(self):
+        return f"ArmedSignal(direction={self.direction}, condition={self.condition})"
+
+
+class _DeferredSignal:
+    """arm پیش‌فرض برای استراتژی‌هایی که فقط decide_trade دارند"""
+
+    __slots__ = ("strategy", "c1", "c2")
+
+    def __init__(self, strategy, c1, c2):
+        self.strategy = strategy
+        self.c1 = c1
+        self.c2 = c2
+
+    def fire(self, current_open, current_price):
+        return self.strategy.decide_trade(self.c1, self.c2, current_open, current_price)
+
+
+class Strategy:
+    """
+    کلاس پایه‌ی استراتژی‌ها.
+    name: نام نمایشی در گزارش‌ها (پیش‌فرض: نام کلاس)
+    indicators: IndicatorSet متصل (CandleEngine یا CandleBuilder)؛ مقدار فعلی با
+        self.indicators["rsi"] بدون محاسبه‌ی دوباره خوانده می‌شود
+    """
+
+    name = None
+
+    def __init__(self, config=None, name=None):
+        self.config = config if config is not None else {}
+        self.indicators = None
+        if name is not None:
+            self.name = name
+        elif self.name is None:
+            self.name = type(self).__name__
+
+    def bind_indicators(self, indicators):
+        """اتصال مجموعه‌ی اندیکاتورها (همان IndicatorSet در حالت زنده و بک‌تست)"""
+        self.indicators = indicators
+
+    def decide_trade(self, c1, c2, current_open, current_price):
+        raise NotImplementedError
+
+    def arm(self, c1, c2):
+        """
+        مرحله‌ی اول تصمیم (هنگام بسته شدن c2): شیئی با fire(current_open, current_price)
+        یا None اگر با این دو کندل هیچ تریدی ممکن نیست.
+        پیش‌فرض: decide_trade در زمان fire صدا زده می‌شود.
+        """
+        return _DeferredSignal(self, c1, c2)
@@ -0,0 +1,103 @@
+# وظایف:
+# ۱. نسخه‌ی برداری StrategyFiveSec.decide_trade روی آرایه‌های OHLC (تحقیق و بک‌تست)
+# ۲. پردازش تکه‌ای با بافرهای ثابت (out=) تا آرایه‌های میانی در کش CPU بمانند
+
+"""
+ماژول strategy_batch
+---------------------
+هسته‌ی NumPy برای StrategyFiveSec.decide_batch؛ نتیجه بیت‌به‌بیت برابر decide_trade است.
+"""
+
+import numpy as np
+
+BATCH_CHUNK = 16384     # اندازه‌ی تکه (۱۲۸KB برای هر آرایه‌ی float64 میانی؛ همه در کش L2)
+
+
+def decide_five_sec(open_, high, low, close, current_open, current_price,
+                    doji_body_ratio, parallel_max_range, spans_gap=None):
+    """
+    ورودی:
+        open_, high, low, close: آرایه‌های کندل‌ها (قدیمی → جدید)
+        current_open, current_price: قیمت باز و قیمت فعلی کندل سوم بعد از هر کندل
+            (آرایه‌ی هم‌طول یا عدد؛ NaN معادل None در مسیر تکی است)
+        doji_body_ratio, parallel_max_range: آستانه‌های StrategyFiveSec
+        spans_gap: آرایه‌ی bool هم‌طول (Candle.spans_gap) یا None؛ c1 یا c2 هم‌پوش با قطعی → ‎-1
+    خروجی: آرایه‌ی int8 که signal[i] تصمیم با c1=i-1 و c2=i است:
+        ۰ → خرید، ۱ → فروش، ‎-1 → عدم ترید (signal[0] همیشه ‎-1)
+    """
+    o = np.asarray(open_, dtype=np.float64)
+    h = np.asarray(high, dtype=np.float64)
+    l = np.asarray(low, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+    n = o.size
+    out = np.empty(o.shape, dtype=np.int8)
+    if n < 2:
+        out.fill(-1)
+        return out
+    out[0] = -1
+    po = np.broadcast_to(np.asarray(current_open, dtype=np.float64), o.shape)
+    pp = np.broadcast_to(np.asarray(current_price, dtype=np.float64), o.shape)
+    k = doji_body_ratio
+    pmax = parallel_max_range
+    gap = None if spans_gap is None else np.asarray(spans_gap, dtype=bool)
+
+    # بافرهای موقت یک تکه (w کندل c2 به‌اضافه‌ی یک کندل c1 قبل از آن)
+    m = min(BATCH_CHUNK, n - 1)
+    rng_buf = np.empty(m + 1)
+    diff_buf = np.empty(m + 1)
+    ratio_buf = np.empty(m)
+    bull_buf = np.empty(m + 1, dtype=bool)
+    bear_buf = np.empty(m + 1, dtype=bool)
+    small_buf = np.empty(m + 1, dtype=bool)
+    blocked_buf = np.empty(m, dtype=bool)
+    tmp_buf = np.empty(m, dtype=bool)
+    buy_buf = np.empty(m, dtype=bool)
+    sell_buf = np.empty(m, dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start in range(1, n, BATCH_CHUNK):
+            stop = min(n, start + BATCH_CHUNK)
+            w = stop - start
+            pair = slice(start - 1, stop)    # c1 و c2
+            cur = slice(start, stop)         # فقط c2
+
+            rng = np.subtract(h[pair], l[pair], out=rng_buf[:w + 1])
+            diff = np.subtract(c[pair], o[pair], out=diff_buf[:w + 1])
+            bull = np.greater(diff, 0.0, out=bull_buf[:w + 1])
+            bear = np.less(diff, 0.0, out=bear_buf[:w + 1])
+            small = np.less_equal(rng, pmax, out=small_buf[:w + 1])
+            rng2 = rng[1:]
+            tmp = tmp_buf[:w]
+
+            # --- شرط ت) دوجی: |close - open| همان body است (‎-k <= ratio <= k بدون گذر abs) ---
+            ratio = np.divide(diff[1:], rng2, out=ratio_buf[:w])
+            blocked = np.less_equal(ratio, k, out=blocked_buf[:w])
+            blocked &= np.greater_equal(ratio, -k, out=tmp)
+            blocked |= np.equal(rng2, 0.0, out=tmp)
+            # --- شرط الف) موازی ---
+            blocked |= np.logical_and(small[:-1], small[1:], out=tmp)
+            # --- کندل هم‌پوش با قطعی اتصال (داده‌ی ناقص) ---
+            if gap is not None:
+                blocked |= gap[start - 1:stop - 1]
+                blocked |= gap[cur]
+
+            # --- شرط پ) هم‌جهتی کندل سوم و شرط ج) شدوی پایین (bottom = open در کندل صعودی) ---
+            # (مقایسه با NaN همیشه False است، پس current_open=NaN یعنی بدون تأیید)
+            oc = o[cur]
+            buy = np.greater_equal(pp[cur], po[cur], out=buy_buf[:w])
+            buy &= bull[:-1]
+            buy |= np.greater(oc, l[cur], out=tmp)
+            buy &= bull[1:]
+            # --- شرط پ) و شرط ث) شدوی بالا (top = open در کندل نزولی) ---
+            sell = np.less_equal(pp[cur], po[cur], out=sell_buf[:w])
+            sell &= bear[:-1]
+            sell |= np.greater(h[cur], oc, out=tmp)
+            sell &= bear[1:]
+
+            # خرید و فروش ناسازگارند (bull2 و bear2 هم‌زمان برقرار نمی‌شوند):
+            # none = مسدود یا بدون سیگنال (برای bool: x <= y یعنی ‎~x | y)؛ signal = sell - none
+            none = np.logical_or(buy, sell, out=buy)
+            np.less_equal(none, blocked, out=none)
+            np.greater(sell, blocked, out=sell)
+            np.subtract(sell.view(np.int8), none.view(np.int8), out=out[cur])
+    return out
@@ -21,29 +21,42 @@
 شامل شرط‌های الف تا خ.
 """
 
+from core.strategy_base import FIRE_ALWAYS, FIRE_IF_DOWN, FIRE_IF_UP, ArmedSignal, Strategy
+from core.strategy_batch import decide_five_sec
+
 # پارامترهای قابل تنظیم برای حساسیت کندل‌ها
 DOJI_BODY_RATIO = 0.1       # نسبت بدنه به رنج برای تشخیص دوجی
 PARALLEL_MAX_RANGE = 0.0005 # حداقل اختلاف برای موازی بودن کندل‌ها
 
-class StrategyFiveSec:
+# وضعیت‌های ممکن arm (ثابت و بدون ساخت شیء جدید در مسیر داغ)
+_BUY_NOW = ArmedSignal(0, FIRE_ALWAYS)
+_SELL_NOW = ArmedSignal(1, FIRE_ALWAYS)
+_BUY_IF_UP = ArmedSignal(0, FIRE_IF_UP)
+_SELL_IF_DOWN = ArmedSignal(1, FIRE_IF_DOWN)
+
+class StrategyFiveSec(Strategy):
     """
     این کلاس شامل منطق تصمیم‌گیری برای روش ۵ ثانیه‌ای است.
     """
 
-    def __init__(self, config):
-        self.config = config
+    def __init__(self, config, name=None):
+        super().__init__(config, name)
+        # مقادیر config (doji_body_ratio، parallel_max_range) بر ثابت‌های ماژول مقدم‌اند
+        self.doji_body_ratio = self.config.get("doji_body_ratio", DOJI_BODY_RATIO)
+        self.parallel_max_range = self.config.get("parallel_max_range", PARALLEL_MAX_RANGE)
 
     # --- توابع کمکی تشخیص الگوها --- #
 
     def is_doji(self, candle):
         """تشخیص کندل دوجی"""
-        if candle.range == 0:
+        rng = candle.range
+        if rng == 0:
             return True
-        return (candle.body / candle.range) <= DOJI_BODY_RATIO
+        return (candle.body / rng) <= self.doji_body_ratio
 
     def is_parallel(self, c1, c2):
         """تشخیص دو کندل موازی (در رنج محدود)"""
-        return (c1.range <= PARALLEL_MAX_RANGE) and (c2.range <= PARALLEL_MAX_RANGE)
+        return (c1.range <= self.parallel_max_range) and (c2.range <= self.parallel_max_range)
 
     def decide_trade(self, c1, c2, current_open, current_price):
         """
@@ -59,6 +72,10 @@ class StrategyFiveSec:
             None → عدم ترید
         """
 
+        # --- کندل هم‌پوش با قطعی اتصال (داده‌ی ناقص) ---
+        if c1.spans_gap or c2.spans_gap:
+            return None
+
         # --- شرط ت) دوجی ---
         if self.is_doji(c2):
             # اگر کندل دوم دوجی بود، ترید نکن
@@ -69,8 +86,11 @@ class StrategyFiveSec:
             return None
 
         # --- جهت کلی دو کندل ---
-        both_bull = c1.is_bullish and c2.is_bullish
-        both_bear = c1.is_bearish and c2.is_bearish
+        # (ویژگی‌های Candle هنگام بسته شدن محاسبه شده‌اند؛ اینجا فقط خوانده می‌شوند)
+        c2_bull = c2.is_bullish
+        c2_bear = c2.is_bearish
+        both_bull = c1.is_bullish and c2_bull
+        both_bear = c1.is_bearish and c2_bear
 
         # --- شرط پ) هم‌جهتی کندل سوم ---
         third_confirms = False
@@ -81,10 +101,10 @@ class StrategyFiveSec:
                 third_confirms = True
 
         # --- شرط ث) شدوی بالا روی کندل نزولی ---
-        shadow_sell = c2.is_bearish and (c2.upper_wick() > 0)
+        shadow_sell = c2_bear and (c2.upper_shadow > 0)
 
         # --- شرط ج) شدوی پایین روی کندل صعودی ---
-        shadow_buy = c2.is_bullish and (c2.lower_wick() > 0)
+        shadow_buy = c2_bull and (c2.lower_shadow > 0)
 
         # --- شرط ح) کندل دوم بدون سایه مانعی ندارد ---
         # (نیاز به اقدام خاص ندارد، فقط در شرط بالا رد نمی‌شود)
@@ -105,46 +125,54 @@ class StrategyFiveSec:
 
         return cmd
 
+    def arm(self, c1, c2):
+        """
+        مرحله‌ی اول شرط خ: حل شرط‌های الف، ت، ث، ج و جهت دو کندل هنگام بسته شدن c2.
+        خروجی ArmedSignal یا None؛ fire(current_open, current_price) روی هر تیک کندل سوم
+        دقیقاً برابر decide_trade است.
+        """
+        if c1.spans_gap or c2.spans_gap:
+            return None
+        if self.is_doji(c2) or self.is_parallel(c1, c2):
+            return None
+        if c2.is_bullish:
+            if c2.lower_shadow > 0:          # شرط ج (بدون توجه به کندل سوم)
+                return _BUY_NOW
+            return _BUY_IF_UP if c1.is_bullish else None     # شرط پ
+        if c2.is_bearish:
+            if c2.upper_shadow > 0:          # شرط ث
+                return _SELL_NOW
+            return _SELL_IF_DOWN if c1.is_bearish else None  # شرط پ
+        return None
+
+    def decide_batch(self, open_, high, low, close, current_open, current_price, spans_gap=None):
+        """
+        نسخه‌ی برداری decide_trade برای تحقیق و بک‌تست روی آرایه‌های OHLC
+        (هسته در core.strategy_batch.decide_five_sec).
+        ورودی:
+            open_, high, low, close: آرایه‌های کندل‌ها (قدیمی → جدید)
+            current_open, current_price: قیمت باز و قیمت فعلی کندل سوم بعد از هر کندل
+                (آرایه‌ی هم‌طول یا عدد؛ NaN معادل None در مسیر تکی است)
+            spans_gap: آرایه‌ی bool هم‌طول از Candle.spans_gap (None یعنی بدون قطعی)
+        خروجی: آرایه‌ی int8 که signal[i] تصمیم با c1=i-1 و c2=i است:
+            ۰ → خرید، ۱ → فروش، ‎-1 → عدم ترید (signal[0] همیشه ‎-1)
+        نتیجه دقیقاً برابر decide_trade روی کندل‌هایی با همین spans_gap است.
+        """
+        return decide_five_sec(open_, high, low, close, current_open, current_price,
+                               self.doji_body_ratio, self.parallel_max_range, spans_gap)
+
 # ---------------------------------------------
 # 🚀 تست مستقل ماژول StrategyFiveSec
 # ---------------------------------------------
 if __name__ == "__main__":
-    # کلاس ساده برای شبیه‌سازی کندل‌ها
-    class DummyCandle:
-        def __init__(self, open_p, close_p, high, low):
-            self.open = open_p
-            self.close = close_p
-            self.high = high
-            self.low = low
-
-        @property
-        def body(self):
-            return abs(self.close - self.open)
-
-        @property
-        def range(self):
-            return self.high - self.low
-
-        @property
-        def is_bullish(self):
-            return self.close > self.open
-
-        @property
-        def is_bearish(self):
-            return self.close < self.open
-
-        def upper_wick(self):
-            return self.high - max(self.open, self.close)
-
-        def lower_wick(self):
-            return min(self.open, self.close) - self.low
+    from core.candle import Candle
 
     # نمونه‌سازی استراتژی
     strategy = StrategyFiveSec(config={})
 
     # تعریف دو کندل تستی
-    c1 = DummyCandle(100, 101, 101.2, 99.8)
-    c2 = DummyCandle(101, 101.5, 101.8, 100.9)
+    c1 = Candle(100, 101.2, 99.8, 101)
+    c2 = Candle(101, 101.8, 100.9, 101.5)
     current_open = 101.5
     current_price = 101.7
 
@@ -0,0 +1,196 @@
+# وظایف:
+# ۱. اجرای استراتژی اصلی (primary) در لحظه‌ی بسته شدن کندل و برگرداندن فوری سیگنال آن
+# ۲. ارزیابی استراتژی‌های سایه (shadow) در ترد پس‌زمینه، بعد از ارسال سیگنال اصلی
+#    با عکس اندیکاتورهای همان لحظه (همان مقادیری که استراتژی اصلی دید)
+# ۳. ثبت ترید‌های فرضی سایه‌ها و تسویه‌ی آن‌ها بعد از expiry_candles کندل
+# ۴. گزارش آمار هر سایه (برد، باخت، درصد برد، سود/زیان) برای مقایسه با استراتژی اصلی
+
+"""
+ماژول StrategyRunner
+---------------------
+فقط سیگنال استراتژی اصلی اجرا می‌شود؛ سایه‌ها هیچ تأخیری به مسیر تصمیم اصلی اضافه نمی‌کنند
+(on_candle فقط یک رویداد به executor تک‌ترده‌ی سایه‌ها می‌سپارد).
+IndicatorSet زنده تا ارزیابی سایه‌ها جلو می‌رود؛ برای همین هر رویداد snapshot اندیکاتورهای
+متصل به استراتژی اصلی را با خودش می‌برد و سایه‌ها قبل از تصمیم به همان snapshot وصل می‌شوند.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from core.trade_stats import TradeStats
+
+
+class ShadowBook:
+    """
+    دفتر ترید‌های فرضی یک استراتژی سایه.
+    ترید در رویداد k با قیمت current_price باز و در رویداد k + expiry_candles
+    با current_price همان رویداد تسویه می‌شود؛ قیمت برابر → draw.
+    """
+
+    def __init__(self, strategy, amount=1.0, payout=0.8, expiry_candles=1):
+        self.strategy = strategy
+        self.name = strategy.name
+        self.amount = amount
+        self.payout = payout
+        self.expiry_candles = expiry_candles
+        self.stats = TradeStats(payout=payout)
+        self.pending = []       # (رویداد تسویه، جهت، قیمت ورود، زمان ورود)
+        self.trades = 0
+        self.errors = 0
+
+    def on_event(self, seq, c1, c2, current_open, current_price, ts):
+        # اول تسویه‌ی ترید‌های سررسید شده
+        if self.pending and current_price is not None:
+            keep = []
+            for item in self.pending:
+                if item[0] <= seq:
+                    self._settle(item, current_price, ts)
+                else:
+                    keep.append(item)
+            self.pending = keep
+
+        try:
+            cmd = self.strategy.decide_trade(c1, c2, current_open, current_price)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ خطا در استراتژی سایه {self.name}: {e}")
+            return
+        if cmd is not None and current_price is not None:
+            self.pending.append((seq + self.expiry_candles, cmd, current_price, ts))
+
+    def _settle(self, item, price, ts):
+        _, cmd, entry, _ = item
+        if price == entry:
+            result = "draw"
+        elif (price > entry) == (cmd == 0):
+            result = "win"
+        else:
+            result = "loss"
+        self.trades += 1
+        self.stats.update({"direction": "buy" if cmd == 0 else "sell", "amount": self.amount,
+                           "result": result}, ts=ts)
+
+    def report(self):
+        out = self.stats.snapshot()
+        out["open_trades"] = len(self.pending)
+        out["errors"] = self.errors
+        return out
+
+
+class StrategyRunner:
+    """
+    primary: استراتژی اصلی (سیگنالش اجرا می‌شود)
+    shadows: لیست استراتژی‌ها یا پارامترهای دیگر (فقط ترید فرضی)
+    expiry_candles: مدت ترید فرضی بر حسب تعداد کندل (۵ ثانیه ترید روی کندل ۵ ثانیه‌ای → ۱)
+    max_queue: بیشترین رویداد ارزیابی‌نشده؛ بیشتر از آن رویداد سایه دور ریخته می‌شود (dropped)
+    """
+
+    def __init__(self, primary, shadows=(), amount=1.0, payout=0.8, expiry_candles=1,
+                 max_queue=10000):
+        self.primary = primary
+        self.books = []
+        names = set()
+        for s in shadows:
+            book = ShadowBook(s, amount, payout, expiry_candles)
+            # نام تکراری (مثلاً یک کلاس با پارامترهای مختلف) → پسوند شماره
+            n = 2
+            while book.name in names:
+                book.name = f"{s.name}#{n}"
+                n += 1
+            names.add(book.name)
+            self.books.append(book)
+        self._seq = 0
+        self._lock = threading.Lock()           # دفترها (ترد سایه‌ها و report)
+        self._count_lock = threading.Lock()     # شمارنده‌ی صف (ترد اصلی و ترد سایه‌ها)
+        self.max_queue = max_queue
+        self.queued = 0
+        self.max_depth = 0
+        self.evaluated = 0
+        self.dropped = 0
+        self._closed = False
+        self.executor = None
+        if self.books:
+            # یک ترد: رویدادها به ترتیب ارزیابی می‌شوند (تسویه‌ی دفترها به ترتیب seq است)
+            self.executor = ThreadPoolExecutor(max_workers=1,
+                                               thread_name_prefix="shadow-strategies")
+
+    def on_candle(self, c1, c2, current_open, current_price, ts=None):
+        """
+        تصمیم استراتژی اصلی (برگردانده‌شده بدون انتظار برای سایه‌ها)؛
+        ارزیابی سایه‌ها فقط در صف ترد پس‌زمینه قرار می‌گیرد.
+        """
+        signal = self.primary.decide_trade(c1, c2, current_open, current_price)
+        self.shadow(c1, c2, current_open, current_price, ts)
+        return signal
+
+    def shadow(self, c1, c2, current_open, current_price, ts=None):
+        """
+        فقط ارزیابی سایه‌ها (وقتی سیگنال اصلی جای دیگری، مثلاً ArmedDecider، صادر می‌شود)
+        """
+        seq = self._seq
+        self._seq += 1
+        if self.executor is None or self._closed:
+            return
+        with self._count_lock:
+            if self.queued >= self.max_queue:
+                self.dropped += 1
+                return
+            self.queued += 1
+            if self.queued > self.max_depth:
+                self.max_depth = self.queued
+        indicators = getattr(self.primary, "indicators", None)
+        snapshot = indicators.snapshot() if indicators else None
+        event = (seq, c1, c2, current_open, current_price, ts if ts is not None else time.time())
+        try:
+            self.executor.submit(self._evaluate, event, snapshot)
+        except RuntimeError:
+            # close هم‌زمان از ترد دیگر
+            with self._count_lock:
+                self.queued -= 1
+                self.dropped += 1
+
+    def _evaluate(self, event, snapshot):
+        """اجرا در ترد سایه‌ها"""
+        try:
+            with self._lock:
+                for book in self.books:
+                    if snapshot is not None:
+                        book.strategy.bind_indicators(snapshot)
+                    book.on_event(*event)
+        finally:
+            with self._count_lock:
+                self.queued -= 1
+                self.evaluated += 1
+
+    def flush(self, timeout=5.0):
+        """انتظار تا همه‌ی رویدادهای ارسال‌شده ارزیابی شوند"""
+        if self.executor is None or self._closed:
+            return True
+        try:
+            # executor تک‌ترده است: کار خالی بعد از همه‌ی رویدادهای قبلی اجرا می‌شود
+            self.executor.submit(int).result(timeout)
+            return True
+        except FutureTimeout:
+            return False
+
+    def report(self):
+        """آمار ترید‌های فرضی هر سایه: {نام: snapshot}"""
+        with self._lock:
+            return {book.name: book.report() for book in self.books}
+
+    def metrics(self):
+        if self.executor is None:
+            return {}
+        return {
+            "queue_depth": self.queued,
+            "max_depth": self.max_depth,
+            "evaluated": self.evaluated,
+            "dropped": self.dropped,
+        }
+
+    def close(self):
+        """ارزیابی رویدادهای باقی‌مانده و توقف ترد سایه‌ها (رویدادهای بعدی نادیده گرفته می‌شوند)"""
+        if self.executor is not None and not self._closed:
+            self._closed = True
+            self.executor.shutdown(wait=True)
@@ -0,0 +1,160 @@
+# وظایف:
+# ۱. نگهداری یک CandleBuilder برای هر نماد (ده‌ها دارایی Pocket Option از یک تب)
+# ۲. تبدیل نام نماد به شناسه‌ی عددی (intern شده) و مسیریابی تیک‌ها با اندیس لیست
+# ۳. انتخاب بهترین نماد برای ترید هنگام بسته شدن کندل
+
+"""
+ماژول SymbolRegistry
+---------------------
+رجیستری چندنمادی کندل‌ها برای WebSocketHandler.
+انتخاب نماد: وقتی همه‌ی نمادهای فعال مرز کندل جدید را بستند (یا select_delay ثانیه
+از مرز گذشت)، best_symbol یک بار برای آن مرز اجرا و نتیجه به on_best داده می‌شود.
+"""
+
+import sys
+from core.candle_builder import CandleBuilder
+
+
+def default_score(c1, c2):
+    """
+    امتیاز پیش‌فرض یک سیگنال: نسبت بدنه به رنج کندل دوم (کندل قوی‌تر → امتیاز بیشتر)
+    """
+    return c2.body / c2.range if c2.range else 0.0
+
+
+class SymbolRegistry:
+    """
+    symbol_id(symbol) → شناسه‌ی عددی ثابت (یک بار lookup در dict)
+    add_price(sid, price, ts) → مسیریابی مستقیم با اندیس لیست
+    on_close(symbol, candle): کال‌بک اختیاری برای بسته شدن کندل هر نماد
+    strategy, on_best(symbol, signal, score): انتخاب بهترین نماد در هر مرز کندل (اختیاری)
+    select_delay: حداکثر انتظار (ثانیه‌ی زمان تیک) برای بسته شدن کندل نمادهای کند
+    builder_kwargs: پارامترهای CandleBuilder برای همه‌ی نمادها (period_sec، allowed_lateness، ...)
+    """
+
+    def __init__(self, on_close=None, strategy=None, on_best=None, score=default_score,
+                 select_delay=0.5, **builder_kwargs):
+        self.on_close = on_close
+        self.strategy = strategy
+        self.on_best = on_best
+        self.score = score
+        self.select_delay = select_delay
+        self.builder_kwargs = builder_kwargs
+        self._ids = {}          # نام نماد (intern شده) → شناسه
+        self.symbols = []       # شناسه → نام نماد
+        self.builders = []      # شناسه → CandleBuilder
+        self.last_prices = []   # شناسه → آخرین قیمت
+        # آخرین نماد دیده‌شده: فریم‌های پشت سر هم معمولاً یک نماد دارند (بدون lookup)
+        self._last_symbol = None
+        self._last_sid = None
+
+        # وضعیت انتخاب نماد در مرز جاری
+        self._boundary = None   # end_ts کندل‌هایی که در این مرز بسته می‌شوند
+        self._closed = set()    # نمادهایی که کندل این مرز را بسته‌اند
+        self._waiting = set()   # نمادهای فعال مرز قبل که هنوز این مرز را نبسته‌اند
+        self._selected = True   # انتخاب این مرز انجام شده است
+        self.picks = 0
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def symbol_id(self, symbol):
+        """شناسه‌ی نماد؛ اگر نماد جدید باشد builder آن ساخته می‌شود"""
+        sid = self._ids.get(symbol)
+        if sid is None:
+            symbol = sys.intern(str(symbol))
+            sid = len(self.symbols)
+            self._ids[symbol] = sid
+            self.symbols.append(symbol)
+            self.last_prices.append(None)
+            self.builders.append(CandleBuilder(on_close=self._close_hook(sid), **self.builder_kwargs))
+        return sid
+
+    def _close_hook(self, sid):
+        def hook(candle):
+            if self.on_close:
+                self.on_close(self.symbols[sid], candle)
+            if self.on_best is not None:
+                self._on_symbol_close(sid, candle.end_ts)
+        return hook
+
+    def add_price(self, sid, price, ts=None):
+        """مسیریابی تیک با شناسه‌ی عددی (مسیر سریع)"""
+        self.last_prices[sid] = price
+        self.builders[sid].add_price(price, ts)
+        if not self._selected and ts is not None and ts >= self._boundary + self.select_delay:
+            # نمادهای کند بیشتر از select_delay منتظر نمی‌مانند
+            self._select()
+
+    def add_tick(self, symbol, price, ts=None):
+        """
+        مسیریابی تیک با نام نماد؛ lookup فقط وقتی نماد با تیک قبلی فرق کند
+        (مقایسه‌ی رشته‌ی کوتاه ارزان‌تر از hash رشته‌ی تازه parse شده است)
+        """
+        if symbol == self._last_symbol:
+            sid = self._last_sid
+        else:
+            sid = self.symbol_id(symbol)
+            self._last_symbol = symbol
+            self._last_sid = sid
+        self.add_price(sid, price, ts)
+
+    def begin_gap(self, ts=None):
+        """
+        شروع وقفه‌ی اتصال برای همه‌ی نمادها (هر builder با اولین تیک خودش وقفه را می‌بندد)
+        """
+        for b in self.builders:
+            b.begin_gap(ts)
+
+    def builder(self, symbol):
+        sid = self._ids.get(symbol)
+        return self.builders[sid] if sid is not None else None
+
+    def best_symbol(self, strategy, score=default_score, since=None):
+        """
+        بررسی همه‌ی نمادهای آماده با strategy.decide_trade و انتخاب بهترین سیگنال.
+        since: فقط نمادهایی که کندل دومشان تا این زمان (end_ts) بسته شده است
+        خروجی: (symbol, signal, score) یا None اگر هیچ نمادی سیگنال نداشت.
+        """
+        best = None
+        for sid, b in enumerate(self.builders):
+            if not b.ready_for_strategy():
+                continue
+            c1, c2 = b.get_last_n(2)
+            if since is not None and c2.end_ts < since:
+                continue
+            signal = strategy.decide_trade(c1, c2, b.get_current_open(), self.last_prices[sid])
+            if signal is None:
+                continue
+            s = score(c1, c2)
+            if best is None or s > best[2]:
+                best = (self.symbols[sid], signal, s)
+        return best
+
+    # ----------------- انتخاب نماد در مرز کندل ----------------- #
+
+    def _on_symbol_close(self, sid, end_ts):
+        """ثبت بسته شدن کندل یک نماد؛ وقتی همه‌ی نمادهای فعال بستند انتخاب انجام می‌شود"""
+        if self._boundary is None or end_ts > self._boundary:
+            if not self._selected:
+                self._select()
+            # نمادهایی که مرز قبل را بستند فعال‌اند و برای این مرز منتظرشان می‌مانیم
+            self._waiting = self._closed
+            self._closed = set()
+            self._boundary = end_ts
+            self._selected = False
+        elif end_ts < self._boundary:
+            return              # کندل پرکننده‌ی دیرهنگام یک نماد کند
+        self._closed.add(sid)
+        self._waiting.discard(sid)
+        if not self._waiting and not self._selected:
+            self._select()
+
+    def _select(self):
+        """اجرای best_symbol برای مرز جاری (فقط یک بار) و اطلاع به on_best"""
+        self._selected = True
+        self._waiting = set()
+        best = self.best_symbol(self.strategy, self.score, since=self._boundary)
+        if best is not None:
+            self.picks += 1
+            self.on_best(*best)
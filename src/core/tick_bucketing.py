@@ -0,0 +1,58 @@
+# وظایف:
+# ۱. تقسیم آرایه‌ی تیک‌ها به بازه‌های کندل با floor(ts / period) به‌صورت برداری
+# ۲. محاسبه‌ی OHLC هر بازه در یک گذر (reduceat)
+
+"""
+ماژول tick_bucketing
+---------------------
+ابزار برداری NumPy برای مسیر دسته‌ای CandleBuilder.add_prices (بازپخش و بک‌تست).
+"""
+
+import numpy as np
+
+
+def bucket_ohlc(prices, timestamps, period):
+    """
+    ورودی: prices و timestamps (آرایه‌های هم‌طول، timestamps غیرنزولی)
+    خروجی: dict با آرایه‌های هم‌طول برای هر بازه:
+        idx (اندیس بازه = floor(ts / period))، open، high، low، close،
+        first_ts، last_ts، ticks
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    ts = np.asarray(timestamps, dtype=np.float64)
+    if prices.shape != ts.shape:
+        raise ValueError("طول prices و timestamps باید برابر باشد")
+    n = prices.size
+    if n == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return {"idx": np.empty(0, dtype=np.int64), "open": empty, "high": empty, "low": empty,
+                "close": empty, "first_ts": empty, "last_ts": empty,
+                "ticks": np.empty(0, dtype=np.int64)}
+
+    # همان محاسبه‌ی int(ts // period) در مسیر تک‌تیک
+    idx = np.floor_divide(ts, period).astype(np.int64)
+    change = np.empty(n, dtype=bool)
+    change[0] = True
+    np.not_equal(idx[1:], idx[:-1], out=change[1:])
+    starts = np.flatnonzero(change)
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:]
+    ends[-1] = n
+    last = ends - 1
+
+    return {
+        "idx": idx[starts],
+        "open": prices[starts],
+        "high": np.maximum.reduceat(prices, starts),
+        "low": np.minimum.reduceat(prices, starts),
+        "close": prices[last],
+        "first_ts": ts[starts],
+        "last_ts": ts[last],
+        "ticks": ends - starts,
+    }
+
+
+def is_sorted(timestamps):
+    """آیا زمان‌ها غیرنزولی هستند؟ (شرط مسیر برداری)"""
+    ts = np.asarray(timestamps)
+    return ts.size < 2 or not np.any(ts[1:] < ts[:-1])
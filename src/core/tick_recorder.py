@@ -0,0 +1,192 @@
+# وظایف:
+# ۱. ضبط تیک‌های WebSocketHandler به‌صورت رکوردهای باینری با طول ثابت (ts, symbol id, price)
+# ۲. تقسیم فایل‌ها به سگمنت‌های روزانه (ticks/YYYYMMDD.bin)
+# ۳. نوشتن در ترد پس‌زمینه تا کال‌بک فریم تأخیری نگیرد
+# ۴. خواندن memory-mapped و بازپخش برای CandleBuilder (زمان واقعی، N برابر سرعت، حداکثر سرعت)
+
+"""
+ماژول TickRecorder / TickReplayer
+----------------------------------
+فرمت رکورد (little-endian، ۲۰ بایت): float64 ts | uint32 symbol_id | float64 price
+نگاشت symbol_id → نام نماد در فایل symbols.json کنار سگمنت‌ها نگه داشته می‌شود.
+"""
+
+import json
+import mmap
+import struct
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from core.log_writer import BackgroundLogWriter
+
+RECORD = struct.Struct("<dId")
+TICK_DTYPE = np.dtype([("ts", "<f8"), ("sid", "<u4"), ("price", "<f8")])
+
+
+def segment_name(ts):
+    """نام سگمنت روزانه بر اساس تاریخ UTC تیک"""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y%m%d") + ".bin"
+
+
+class TickRecorder:
+    """
+    record(price, ts, symbol) فقط یک tuple در صف می‌گذارد؛ بسته‌بندی و نوشتن در ترد جداگانه است.
+    امضای record با on_tick سازگار است، پس می‌تواند مستقیم کال‌بک WebSocketHandler باشد.
+    """
+
+    def __init__(self, directory="ticks", max_queue=100000, batch_size=4096, flush_interval=0.5):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._symbols_path = self.dir / "symbols.json"
+        self.symbols = load_symbols(self.dir)
+        self._ids = {s: i for i, s in enumerate(self.symbols)}
+        self._fh = None
+        self._segment = None
+        self.writer = BackgroundLogWriter(self._write_batch, max_queue=max_queue,
+                                          batch_size=batch_size, flush_interval=flush_interval,
+                                          name="tick-recorder")
+
+    def record(self, price, ts, symbol=""):
+        """ثبت یک تیک (بدون بلاک شدن؛ در صورت پر بودن صف، تیک دور ریخته و شمرده می‌شود)"""
+        self.writer.put((ts, symbol, price))
+
+    def symbol_id(self, symbol):
+        sid = self._ids.get(symbol)
+        if sid is None:
+            symbol = sys.intern(str(symbol))
+            sid = self._ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            tmp = self._symbols_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.symbols, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self._symbols_path)
+        return sid
+
+    def _write_batch(self, batch):
+        """اجرا در ترد نویسنده: بسته‌بندی رکوردها و نوشتن در سگمنت روز مربوط"""
+        buf = bytearray()
+        pack = RECORD.pack
+        for ts, symbol, price in batch:
+            name = segment_name(ts)
+            if name != self._segment:
+                self._flush_to(buf)
+                buf = bytearray()
+                self._open_segment(name)
+            buf += pack(ts, self.symbol_id(symbol), price)
+        self._flush_to(buf)
+
+    def _open_segment(self, name):
+        if self._fh is not None:
+            self._fh.close()
+        self._segment = name
+        self._fh = open(self.dir / name, "ab")
+        # رکورد ناقص انتهای فایل (قطع برنامه وسط نوشتن) حذف می‌شود تا رکوردهای جدید هم‌تراز بمانند
+        torn = self._fh.tell() % RECORD.size
+        if torn:
+            self._fh.truncate(self._fh.tell() - torn)
+
+    def _flush_to(self, buf):
+        if buf and self._fh is not None:
+            self._fh.write(buf)
+            self._fh.flush()
+
+    def metrics(self):
+        return self.writer.metrics()
+
+    def close(self):
+        self.writer.close()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def load_symbols(directory):
+    """خواندن نگاشت symbol_id → نام نماد"""
+    path = Path(directory) / "symbols.json"
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def load_segment(path):
+    """
+    نگاشت یک سگمنت به حافظه (mmap) و برگرداندن آرایه‌ی ساخت‌یافته‌ی NumPy بدون کپی.
+    رکورد ناقص انتهای فایل (نوشتن نیمه‌کاره) نادیده گرفته می‌شود.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    count = size // TICK_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=TICK_DTYPE)
+    with open(path, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    return np.frombuffer(mm, dtype=TICK_DTYPE, count=count)
+
+
+class TickReplayer:
+    """
+    بازپخش سگمنت‌ها:
+        speed=1.0 → زمان واقعی، speed=N → N برابر سریع‌تر، speed=None → حداکثر سرعت
+    """
+
+    def __init__(self, directory="ticks"):
+        self.dir = Path(directory)
+        self.symbols = load_symbols(self.dir)
+
+    def segments(self, start_day=None, end_day=None):
+        """مسیر سگمنت‌ها (به ترتیب روز)؛ روزها به‌صورت رشته‌ی YYYYMMDD"""
+        out = []
+        for p in sorted(self.dir.glob("*.bin")):
+            day = p.stem
+            if start_day and day < start_day:
+                continue
+            if end_day and day > end_day:
+                continue
+            out.append(p)
+        return out
+
+    def load(self, symbol=None, start_day=None, end_day=None):
+        """
+        آرایه‌های (timestamps, prices) برای مسیر دسته‌ای CandleBuilder.add_prices
+        """
+        parts = [load_segment(p) for p in self.segments(start_day, end_day)]
+        data = np.concatenate(parts) if len(parts) > 1 else (parts[0] if parts else
+                                                              np.empty(0, dtype=TICK_DTYPE))
+        if symbol is not None:
+            if symbol not in self.symbols:
+                return np.empty(0), np.empty(0)
+            data = data[data["sid"] == self.symbols.index(symbol)]
+        return data["ts"], data["price"]
+
+    def replay(self, on_tick, symbol=None, speed=None, start_day=None, end_day=None):
+        """
+        ارسال تیک‌ها به on_tick(price, ts) (مثلاً CandleBuilder.add_price).
+        اگر symbol داده نشود، on_tick(price, ts, symbol) صدا زده می‌شود.
+        """
+        sid = None
+        if symbol is not None:
+            if symbol not in self.symbols:
+                return 0
+            sid = self.symbols.index(symbol)
+        count = 0
+        t0_wall = t0_data = None
+        for path in self.segments(start_day, end_day):
+            data = load_segment(path)
+            if sid is not None:
+                data = data[data["sid"] == sid]
+            for ts, s, price in zip(data["ts"].tolist(), data["sid"].tolist(), data["price"].tolist()):
+                if speed:
+                    if t0_wall is None:
+                        t0_wall, t0_data = time.perf_counter(), ts
+                    delay = (ts - t0_data) / speed - (time.perf_counter() - t0_wall)
+                    if delay > 0:
+                        time.sleep(delay)
+                if sid is None:
+                    on_tick(price, ts, self.symbols[s])
+                else:
+                    on_tick(price, ts)
+                count += 1
+        return count
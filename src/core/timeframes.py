@@ -0,0 +1,155 @@
+# وظایف:
+# ۱. ساخت کندل‌های تایم‌فریم بالاتر (۱۵ ثانیه، ۳۰ ثانیه، ۱ دقیقه، ۵ دقیقه، ...)
+# ۲. تجمیع افزایشی از کندل‌های بسته‌شده‌ی تایم‌فریم پایه (نه از تیک‌های خام)
+# ۳. کال‌بک جداگانه‌ی بسته شدن برای هر تایم‌فریم
+# ۴. بازتاب اصلاح کندل پایه (تیک دیرهنگام) در کندل تایم‌فریم بالاتر و کال‌بک on_amend
+# ۵. MultiTimeframe: افزودن تایم‌فریم‌ها و اصلاح کندل پایه‌ی CandleBuilder (mixin)
+
+"""
+ماژول TimeframeAggregator
+--------------------------
+هر کندل پایه‌ی بسته‌شده فقط یک بار و با هزینه‌ی O(1) در کندل تایم‌فریم بالاتر ادغام می‌شود.
+اصلاح بعدی همان کندل پایه (amend) هم با هزینه‌ی O(1) در کندل بالاتر اعمال می‌شود.
+MultiTimeframe از ویژگی‌های CandleBuilder استفاده می‌کند:
+    period، max_keep، amend_horizon، timeframes، candles، _recent، _emitted، on_amend
+"""
+
+from core.candle import FormingCandle
+from core.candle_buffer import CandleRingBuffer
+
+
+class TimeframeAggregator:
+    """
+    period: طول کندل این تایم‌فریم (ثانیه) — باید مضرب base_period باشد
+    on_close(candle): کال‌بک هنگام بسته شدن هر کندل این تایم‌فریم
+    on_amend(candle): کال‌بک وقتی کندل بسته‌شده‌ی این تایم‌فریم با اصلاح زیرکندل عوض می‌شود
+    amend_horizon: افق اصلاح تایم‌فریم پایه (تعداد کندل پایه)
+    """
+
+    def __init__(self, period, base_period, max_keep=2000, on_close=None, on_amend=None,
+                 amend_horizon=1):
+        if period <= base_period or period % base_period:
+            raise ValueError(f"تایم‌فریم {period}s باید مضرب بزرگ‌تری از {base_period}s باشد")
+        self.period = period
+        self.base_period = base_period
+        self.on_close = on_close
+        self.on_amend = on_amend
+        self.candles = CandleRingBuffer(max_keep)
+        self.current_candle = None
+        # کندل‌های بسته‌شده‌ای که زیرکندلشان هنوز ممکن است اصلاح شود
+        self.amend_horizon = amend_horizon // (period // base_period) + 1
+        self._recent = {}       # start_ts → (FormingCandle, شماره‌ی ترتیب)
+        self._emitted = 0
+        self.amended = 0
+
+    def add_candle(self, candle):
+        """
+        ادغام یک کندل پایه‌ی بسته‌شده.
+        کندل بالاتر با رسیدن آخرین زیرکندلش بسته می‌شود (بدون انتظار برای کندل بعدی)؛
+        اگر زیرکندل آخر نیامده باشد (مثلاً قطعی داده)، با اولین کندل دوره‌ی بعد بسته می‌شود.
+        """
+        cur = self.current_candle
+        if cur is not None and candle.start_ts >= cur.end_ts:
+            self._close()
+            cur = None
+        if cur is None:
+            start = int(candle.start_ts // self.period) * self.period
+            cur = self.current_candle = FormingCandle(start, start + self.period)
+        cur.merge(candle)
+        if candle.end_ts >= cur.end_ts:
+            self._close()
+
+    def amend(self, candle):
+        """
+        کندل پایه‌ی قبلاً ادغام‌شده اصلاح شد: کندل در حال ساخت یا کندل بسته‌شده‌ی
+        متناظر به‌روز می‌شود (دومی در بافر جایگزین و با on_amend اعلام می‌شود).
+        """
+        start = int(candle.start_ts // self.period) * self.period
+        cur = self.current_candle
+        if cur is not None and cur.start_ts == start:
+            cur.remerge(candle)
+            return None
+        entry = self._recent.get(start)
+        if entry is None:
+            return None
+        fc, seq = entry
+        fc.remerge(candle)
+        amended = fc.close_candle()
+        age = self._emitted - seq
+        if age <= len(self.candles):
+            self.candles.replace(-age, amended)
+        self.amended += 1
+        if self.on_amend:
+            self.on_amend(amended)
+        return amended
+
+    def _close(self):
+        fc = self.current_candle
+        candle = fc.close_candle()
+        self.current_candle = None
+        recent = self._recent
+        recent[fc.start_ts] = (fc, self._emitted)
+        while len(recent) > self.amend_horizon:
+            del recent[next(iter(recent))]
+        self._emitted += 1
+        self.candles.append(candle)
+        if self.on_close:
+            self.on_close(candle)
+
+    def get_last_n(self, n):
+        return self.candles.last(n)
+
+
+class MultiTimeframe:
+    """
+    تایم‌فریم‌های بالاتر CandleBuilder و اصلاح کندل‌های بسته‌شده با تیک دیرهنگام.
+    اندیکاتورها افزایشی‌اند و بازگشت‌پذیر نیستند: با اصلاح دوباره محاسبه نمی‌شوند.
+    """
+
+    def add_timeframe(self, period_sec, on_close=None, on_amend=None):
+        """
+        افزودن یک تایم‌فریم بالاتر با کال‌بک‌های بسته شدن و اصلاح مخصوص خودش.
+        """
+        agg = self.timeframes.get(period_sec)
+        if agg is None:
+            agg = TimeframeAggregator(period_sec, self.period, self.max_keep, on_close, on_amend,
+                                      self.amend_horizon)
+            self.timeframes[period_sec] = agg
+        else:
+            if on_close is not None:
+                agg.on_close = on_close
+            if on_amend is not None:
+                agg.on_amend = on_amend
+        return agg
+
+    def _amend(self, k, price, ts):
+        """
+        اعمال تیک دیرهنگام روی کندلی که قبلاً بسته شده است.
+        کندل اصلاح‌شده در بافر جایگزین، با on_amend اعلام و در تایم‌فریم‌های بالاتر هم
+        اعمال می‌شود؛ اندیکاتورها مقدار لحظه‌ی بسته شدن کندل را نگه می‌دارند (stale).
+        """
+        self.late_ticks += 1
+        entry = self._recent.get(k)
+        if entry is None:
+            self.late_dropped += 1
+            return
+        fc, seq = entry
+        fc.add_tick(price, ts)
+        candle = fc.close_candle()
+        age = self._emitted - seq
+        if age <= len(self.candles):
+            self.candles.replace(-age, candle)
+        self.amended += 1
+        if self.on_amend:
+            self.on_amend(candle)
+        if self.timeframes:
+            for agg in self.timeframes.values():
+                agg.amend(candle)
+
+    def get_last_n(self, n, timeframe=None):
+        """
+        برگرداندن آخرین n کندل بسته شده (timeframe=None → تایم‌فریم پایه)
+        """
+        if timeframe is None or timeframe == self.period:
+            return self.candles.last(n)
+        return self.timeframes[timeframe].get_last_n(n)
@@ -0,0 +1,193 @@
+# وظایف:
+# ۱. چرخ زمان‌سنج هش‌شده (hashed timer wheel) با درج و لغو O(1)
+# ۲. یک ترد واحد برای همه‌ی زمان‌سنج‌ها: بسته شدن کندل، انقضای ترید، مکث بین تریدها، polling
+# ۳. زمان‌سنج‌های تکرارشونده بدون drift (موعد بعدی = موعد قبلی + interval)
+# ۴. شمارنده‌ها و هیستوگرام دیرکرد اجرای کال‌بک‌ها
+
+"""
+ماژول TimerWheel
+-----------------
+به‌جای چندین حلقه‌ی time.sleep / time.time() در CandleEngine، LiveDataReader و main.py،
+همه‌ی کارهای زمان‌دار روی یک چرخ ثبت می‌شوند.
+دقت اجرا در حد tick چرخ است (پیش‌فرض ۵ میلی‌ثانیه)؛ برای موعدهای زیر میلی‌ثانیه
+از timing.PrecisionScheduler استفاده کنید.
+کال‌بک‌های چرخ نباید بلاک شوند (همه‌ی زمان‌سنج‌ها روی یک ترد هستند)؛ کار مسدودکننده
+با blocking_poller.BlockingPoller روی ترد خودش انجام و فقط نتیجه روی چرخ تحویل داده می‌شود.
+"""
+
+import math
+import threading
+import time
+
+from core.latency import LatencyHistogram
+
+
+class Timer:
+    """یک زمان‌سنج ثبت‌شده روی چرخ (cancel در O(1))"""
+
+    __slots__ = ("wheel", "deadline", "interval", "callback", "args", "rounds", "slot",
+                 "cancelled")
+
+    def __init__(self, wheel, deadline, interval, callback, args):
+        self.wheel = wheel
+        self.deadline = deadline        # perf_counter
+        self.interval = interval        # None → یک‌بار
+        self.callback = callback
+        self.args = args
+        self.rounds = 0
+        self.slot = None
+        self.cancelled = False
+
+    def cancel(self):
+        self.wheel.cancel(self)
+
+
+class TimerWheel:
+    """
+    tick: طول هر خانه‌ی چرخ (ثانیه)
+    slots: تعداد خانه‌ها؛ زمان‌سنج‌های دورتر از یک دور کامل با شمارنده‌ی rounds نگه داشته می‌شوند
+    """
+
+    def __init__(self, tick=0.005, slots=1024, name="timer-wheel"):
+        self.tick = tick
+        self.slots = slots
+        self.name = name
+        self._wheel = [set() for _ in range(slots)]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = time.perf_counter()
+        self._cursor = 0                # شماره‌ی tick بعدی برای پردازش (مطلق)
+        self.lateness = LatencyHistogram("timer_lateness")
+        self.pending = 0
+        self.fired = 0
+        self.errors = 0
+
+    # ----------------- ثبت و لغو ----------------- #
+
+    def call_later(self, delay, callback, *args):
+        """اجرای callback(*args) بعد از delay ثانیه"""
+        return self._add(time.perf_counter() + max(0.0, delay), None, callback, args)
+
+    def call_at(self, deadline_epoch, callback, *args):
+        """اجرای callback(*args) در زمان مطلق epoch"""
+        return self.call_later(deadline_epoch - time.time(), callback, *args)
+
+    def call_every(self, interval, callback, *args, first=None):
+        """
+        اجرای تکرارشونده هر interval ثانیه (first: تأخیر اولین اجرا؛ پیش‌فرض interval)
+        موعدها مطلق محاسبه می‌شوند تا دیرکرد یک اجرا به اجراهای بعد منتقل نشود.
+        """
+        if interval <= 0:
+            raise ValueError(f"بازه‌ی تکرار نامعتبر است: {interval}")
+        delay = interval if first is None else max(0.0, first)
+        return self._add(time.perf_counter() + delay, interval, callback, args)
+
+    def cancel(self, timer):
+        """لغو O(1): حذف از مجموعه‌ی خانه‌ی خودش"""
+        with self._lock:
+            if timer.cancelled:
+                return
+            timer.cancelled = True
+            if timer.slot is not None:
+                self._wheel[timer.slot].discard(timer)
+                timer.slot = None
+                self.pending -= 1
+
+    def _add(self, deadline, interval, callback, args):
+        timer = Timer(self, deadline, interval, callback, args)
+        with self._lock:
+            self._place(timer)
+        return timer
+
+    def _place(self, timer):
+        """قرار دادن در خانه‌ی مربوط (باید زیر قفل صدا زده شود؛ cursor = اولین tick پردازش‌نشده)"""
+        ticks = math.ceil((timer.deadline - self._start) / self.tick)
+        ticks = max(ticks, self._cursor)
+        timer.rounds = (ticks - self._cursor) // self.slots
+        timer.slot = ticks % self.slots
+        self._wheel[timer.slot].add(timer)
+        self.pending += 1
+
+    # ----------------- ترد چرخ ----------------- #
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        tick = self.tick
+        while not self._stop.is_set():
+            target = self._start + self._cursor * tick
+            delay = target - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+                continue
+            # پردازش همه‌ی tick های عقب‌افتاده (اگر ترد دیر بیدار شده باشد)
+            now_tick = int((time.perf_counter() - self._start) / tick)
+            while self._cursor <= now_tick and not self._stop.is_set():
+                self._process()
+
+    def _process(self):
+        due = []
+        with self._lock:
+            # cursor زیر قفل جلو می‌رود تا زمان‌سنج جدید هرگز در خانه‌ی در حال پردازش نیفتد
+            bucket = self._wheel[self._cursor % self.slots]
+            self._cursor += 1
+            for timer in tuple(bucket):
+                if timer.rounds > 0:
+                    timer.rounds -= 1
+                    continue
+                bucket.discard(timer)
+                timer.slot = None
+                self.pending -= 1
+                due.append(timer)
+        if not due:
+            return
+        due.sort(key=lambda t: t.deadline)
+        now = time.perf_counter()
+        for timer in due:
+            if timer.cancelled:
+                continue
+            self.lateness.record(max(0.0, now - timer.deadline))
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ خطا در کال‌بک زمان‌سنج: {e}")
+            self.fired += 1
+            if timer.interval is not None:
+                with self._lock:
+                    if not timer.cancelled:
+                        timer.deadline += timer.interval
+                        self._place(timer)
+
+    def metrics(self):
+        return {
+            "pending": self.pending,
+            "fired": self.fired,
+            "errors": self.errors,
+            "lateness": self.lateness.snapshot(),
+        }
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_wheel():
+    """چرخ مشترک فرایند (یک ترد برای همه‌ی ماژول‌ها)؛ در اولین استفاده شروع می‌شود"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = TimerWheel().start()
+        return _default
@@ -2,31 +2,93 @@
 ماژول Timing
 -------------
 مدیریت زمان‌بندی دقیق برای اجرای تریدها با دقت میلی‌ثانیه‌ای.
+انتظار ترکیبی: خواب درشت تا نزدیک موعد و busy-wait فقط در برش پایانی کالیبره‌شده،
+تا برای انتظارهای طولانی (تا یک کندل کامل) یک هسته‌ی کامل مصرف نشود.
+برش spin یک بار در راه‌اندازی (calibrate) اندازه‌گیری می‌شود؛ مسیر ترید آن را هرگز نمی‌پردازد.
 """
 
+import heapq
+import itertools
+import threading
 import time
 
-def wait_until(deadline_epoch):
+from core.latency import LatencyHistogram
+
+# حداقل و حداکثر برش busy-wait پایانی (ثانیه)
+MIN_SPIN = 0.0002
+MAX_SPIN = 0.005
+
+_spin_slice = None
+
+
+def calibrate_sleep(samples=30, request=0.001):
     """
-    توقف تا رسیدن به زمان مشخص (بر اساس epoch seconds)
-    استفاده از busy-wait برای دقت میلی‌ثانیه‌ای (بدون sleep(0.01))
+    اندازه‌گیری دیر بیدار شدن time.sleep روی این سیستم.
+    خروجی: برش spin پیشنهادی (بیشترین تأخیر دیده‌شده + حاشیه، محدود به MIN/MAX_SPIN)
     """
+    worst = 0.0
+    for _ in range(samples):
+        t0 = time.perf_counter()
+        time.sleep(request)
+        late = time.perf_counter() - t0 - request
+        if late > worst:
+            worst = late
+    return min(MAX_SPIN, max(MIN_SPIN, worst * 1.5))
 
-    now = time.time()
-    delay = deadline_epoch - now
-    if delay <= 0:
-        return
 
-    # استفاده از time.perf_counter برای دقت بالا
-    target = time.perf_counter() + delay
+def calibrate(force=False):
+    """
+    اندازه‌گیری برش spin هنگام راه‌اندازی (ساخت PrecisionScheduler یا Trader)؛ فقط یک بار
+    مگر force. خروجی: برش کالیبره‌شده
+    """
+    global _spin_slice
+    if _spin_slice is None or force:
+        _spin_slice = calibrate_sleep()
+    return _spin_slice
+
 
-    # در چند میلی‌ثانیه پایانی busy-wait می‌کنیم
-    while time.perf_counter() < target - 0.002:
-        pass
+def spin_slice():
+    """
+    برش spin کالیبره‌شده؛ قبل از calibrate() برش محافظه‌کارانه‌ی MAX_SPIN
+    (اندازه‌گیری ~۳۰ میلی‌ثانیه‌ای هرگز داخل یک انتظار زمان‌دار انجام نمی‌شود)
+    """
+    return MAX_SPIN if _spin_slice is None else _spin_slice
+
+
+def wait_until_perf(target, spin=None):
+    """
+    توقف تا رسیدن time.perf_counter() به target:
+    خواب تا target - spin و busy-wait فقط در همان برش پایانی
+    """
+    if spin is None:
+        spin = spin_slice()
+    remaining = target - time.perf_counter()
+    if remaining > spin:
+        time.sleep(remaining - spin)
     while time.perf_counter() < target:
         pass
 
 
+def wait_until(deadline_epoch, spin=None):
+    """
+    توقف تا رسیدن به زمان مشخص (بر اساس epoch seconds)
+    خواب درشت و busy-wait فقط در چند صدم میلی‌ثانیه‌ی پایانی (برش کالیبره‌شده)
+    """
+    delay = deadline_epoch - time.time()
+    if delay <= 0:
+        return
+    wait_until_perf(time.perf_counter() + delay, spin)
+
+
+def next_boundary(period, offset=0.0, now=None):
+    """
+    اولین مرز کندل + offset بعد از now (epoch)؛ مثلاً next_boundary(5, 0.002)
+    """
+    if now is None:
+        now = time.time()
+    return (now - offset) // period * period + period + offset
+
+
 def has_elapsed(start_time, seconds):
     """
     بررسی اینکه از زمان شروع، چند ثانیه گذشته یا نه.
@@ -38,4 +100,103 @@ def precise_now():
     """
     بازگرداندن زمان دقیق با دقت بالا (برای لاگ‌ها و تحلیل تاخیر)
     """
-    return time.perf_counter()
\ No newline at end of file
+    return time.perf_counter()
+
+
+class ScheduledCall:
+    """دسته‌ی یک فراخوانی زمان‌بندی‌شده (برای لغو)"""
+
+    __slots__ = ("deadline", "callback", "args", "cancelled")
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline        # epoch
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class PrecisionScheduler:
+    """
+    اجرای کال‌بک‌ها در موعدهای مطلق epoch روی یک ترد جداگانه (ترد فراخواننده آزاد می‌ماند).
+    ترد زمان‌بند تا نزدیک موعد روی Condition می‌خوابد و فقط برش پایانی را spin می‌کند.
+    lateness: هیستوگرام دیرکرد اجرای کال‌بک نسبت به موعد
+    """
+
+    def __init__(self, spin=None, name="precision-scheduler"):
+        # کالیبراسیون در راه‌اندازی، نه در اولین موعد
+        self.spin = spin if spin is not None else calibrate()
+        self.lateness = LatencyHistogram("scheduler_lateness")
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def call_at(self, deadline_epoch, callback, *args):
+        """زمان‌بندی callback(*args) در زمان مطلق deadline_epoch"""
+        call = ScheduledCall(deadline_epoch, callback, args)
+        with self._cond:
+            heapq.heappush(self._heap, (deadline_epoch, next(self._seq), call))
+            self._cond.notify()
+        return call
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(time.time() + delay, callback, *args)
+
+    def call_at_boundary(self, period, offset, callback, *args):
+        """اجرای callback در مرز بعدی کندل + offset (مثلاً ۵ ثانیه + ۲ میلی‌ثانیه)"""
+        return self.call_at(next_boundary(period, offset), callback, *args)
+
+    def pending(self):
+        with self._cond:
+            return sum(1 for _, _, c in self._heap if not c.cancelled)
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (not self._heap or self._heap[0][2].cancelled):
+                    if self._heap:
+                        heapq.heappop(self._heap)
+                        continue
+                    self._cond.wait()
+                if not self._running:
+                    return
+                deadline, _, call = self._heap[0]
+                remaining = deadline - time.time()
+                if remaining > self.spin:
+                    # خواب درشت (کال‌بک زودتر جدید این انتظار را کوتاه می‌کند)
+                    self._cond.wait(remaining - self.spin)
+                    continue
+                heapq.heappop(self._heap)
+
+            # برش پایانی بیرون از قفل تا call_at ها بلاک نشوند
+            target = time.perf_counter() + (deadline - time.time())
+            while time.perf_counter() < target:
+                pass
+            if call.cancelled:
+                continue
+            self.lateness.record(max(0.0, time.time() - deadline))
+            try:
+                call.callback(*call.args)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ خطا در کال‌بک زمان‌بندی‌شده: {e}")
+
+    def metrics(self):
+        return {
+            "spin_slice_ms": round(self.spin * 1000, 3),
+            "pending": self.pending(),
+            "errors": self.errors,
+            "lateness": self.lateness.snapshot(),
+        }
@@ -0,0 +1,189 @@
+# وظایف:
+# ۱. نوشتن رکوردهای معامله/رویداد به‌صورت append-only (هر رکورد یک خط JSON)
+# ۲. کنترل سیاست fsync (همیشه / دوره‌ای / هرگز)
+# ۳. بازسازی لیست رکوردهای یک روز (نمای قبلی trades.json)
+# ۴. مهاجرت یک‌باره از فایل قدیمی trades.json
+
+"""
+ماژول TradeJournal
+-------------------
+ژورنال append-only معاملات با فرمت JSON Lines.
+هزینه‌ی هر نوشتن O(1) است و دیگر کل فایل در هر رکورد خوانده و بازنویسی نمی‌شود.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from datetime import date, datetime
+
+# سیاست‌های fsync
+FSYNC_ALWAYS = "always"      # بعد از هر نوشتن (امن‌ترین، کندترین)
+FSYNC_INTERVAL = "interval"  # حداکثر هر fsync_interval ثانیه یک بار
+FSYNC_NEVER = "never"        # فقط flush به سیستم‌عامل
+
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+
+
+def to_iso(value):
+    """پذیرش datetime / date / رشته‌ی ISO برای فیلترهای زمانی"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    return value.isoformat()
+
+
+class TradeJournal:
+    """
+    فایل ژورنال: هر خط یک رکورد JSON کامل است.
+    خط ناقص انتهای فایل (مثلاً بعد از کرش) هنگام خواندن نادیده گرفته می‌شود و نوشتن بعدی
+    از خط جدید شروع می‌شود.
+    """
+
+    def __init__(self, path: str = "logs/trades.jsonl", fsync: str = FSYNC_INTERVAL,
+                 fsync_interval: float = 1.0):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"سیاست fsync نامعتبر است: {fsync}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._last_fsync = time.monotonic()
+        self._fh = None
+
+    # ----------------- نوشتن ----------------- #
+
+    def append(self, rec: dict):
+        """افزودن یک رکورد به انتهای ژورنال"""
+        self.append_many((rec,))
+
+    def append_many(self, records):
+        """
+        افزودن چند رکورد با یک write و حداکثر یک fsync.
+        """
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        if not lines:
+            return
+        fh = self._handle()
+        fh.write(lines)
+        fh.flush()
+        self._maybe_fsync(fh)
+
+    def sync(self):
+        """اجبار fsync (مثلاً هنگام خاموش شدن)"""
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._last_fsync = time.monotonic()
+
+    def close(self):
+        """بستن فایل پس از fsync نهایی"""
+        if self._fh is None:
+            return
+        try:
+            if self.fsync != FSYNC_NEVER:
+                self.sync()
+        finally:
+            self._fh.close()
+            self._fh = None
+
+    def _handle(self):
+        if self._fh is None:
+            self._fh = open(self.path, "a", encoding="utf-8")
+            if self._torn_tail():
+                # خط ناقص بعد از کرش: بستن آن تا رکورد بعدی به انتهایش چسبیده و گم نشود
+                self._fh.write("\n")
+        return self._fh
+
+    def _torn_tail(self):
+        """آیا فایل موجود با خطی بدون \n تمام شده است"""
+        with open(self.path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            if fh.tell() == 0:
+                return False
+            fh.seek(-1, os.SEEK_END)
+            return fh.read(1) != b"\n"
+
+    def _maybe_fsync(self, fh):
+        if self.fsync == FSYNC_ALWAYS:
+            os.fsync(fh.fileno())
+            self._last_fsync = time.monotonic()
+        elif self.fsync == FSYNC_INTERVAL:
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(fh.fileno())
+                self._last_fsync = now
+
+    # ----------------- خواندن ----------------- #
+
+    def iter_records(self):
+        """
+        پیمایش همه‌ی رکوردها به ترتیب ثبت (بدون بارگذاری کل فایل در حافظه).
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # خط ناقص (نوشتن نیمه‌کاره) → رد
+                    continue
+
+    def iter_trades(self, start=None, end=None, direction=None, result=None, session=None):
+        """
+        فیلتر معاملات با پیمایش خطی (برای کوئری‌های سنگین از SQLiteTradeStore استفاده کنید).
+        start/end: رشته‌ی ISO یا datetime، بازه‌ی [start, end)
+        """
+        start, end = to_iso(start), to_iso(end)
+        for r in self.iter_records():
+            if "result" not in r:
+                continue
+            t = str(r.get("time", ""))
+            if start is not None and t < start:
+                continue
+            if end is not None and t >= end:
+                continue
+            if direction is not None and r.get("direction") != direction:
+                continue
+            if result is not None and r.get("result") != result:
+                continue
+            if session is not None and r.get("session") != session:
+                continue
+            yield r
+
+    def read_day(self, day=None):
+        """
+        بازسازی لیست رکوردهای یک روز (پیش‌فرض: امروز)، مشابه محتوای قدیمی trades.json.
+        """
+        prefix = (day or date.today()).isoformat()
+        return [r for r in self.iter_records() if str(r.get("time", "")).startswith(prefix)]
+
+
+def migrate_json_to_journal(json_path, journal, backup_suffix: str = ".migrated"):
+    """
+    مهاجرت یک‌باره‌ی فایل قدیمی trades.json (آرایه‌ی JSON) به ژورنال
+    (یا هر store با append_many/sync، مثل SQLiteTradeStore).
+    پس از موفقیت، فایل قدیمی با پسوند backup_suffix تغییر نام می‌دهد تا دوباره مهاجرت نشود.
+    خروجی: تعداد رکوردهای منتقل شده
+    """
+    src = Path(json_path)
+    if not src.exists():
+        return 0
+    try:
+        data = json.loads(src.read_text(encoding="utf-8") or "[]")
+    except ValueError as e:
+        print(f"⚠️ فایل {src} قابل خواندن نیست و مهاجرت انجام نشد: {e}")
+        return 0
+    if not isinstance(data, list):
+        data = [data]
+
+    journal.append_many(data)
+    journal.sync()
+    src.rename(src.with_name(src.name + backup_suffix))
+    print(f"📦 {len(data)} رکورد از {src} به ژورنال {journal.path} منتقل شد.")
+    return len(data)
@@ -1,39 +1,102 @@
-import json
 from pathlib import Path
 from datetime import datetime
+from core.trade_journal import TradeJournal, migrate_json_to_journal, FSYNC_INTERVAL
+from core.trade_store import SQLiteTradeStore
+from core.log_writer import BackgroundLogWriter
+from core.trade_stats import TradeStats
 
 class TradeLogger:
-    def __init__(self, path: str = "logs/trades.json"):
+    def __init__(self, path: str = "logs/trades.jsonl", fsync: str = FSYNC_INTERVAL,
+                 backend: str = "journal", session: str = None,
+                 background: bool = True, max_queue: int = 10000,
+                 batch_size: int = 256, flush_interval: float = 0.2,
+                 payout: float = 0.8, window_trades: int = 50, window_seconds: float = 600.0):
+        # backend: "journal" (فایل JSONL) یا "sqlite" (تاریخچه‌ی بلندمدت با کوئری ایندکس‌دار)
+        if backend not in ("journal", "sqlite"):
+            raise ValueError(f"backend نامعتبر است: {backend}")
         self.path = Path(path)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.path.exists():
-            self.path.write_text("[]", encoding="utf-8")
+        # سازگاری با مسیر قدیمی: logs/trades.json → logs/trades.jsonl (یا trades.db)
+        suffix = ".db" if backend == "sqlite" else ".jsonl"
+        if self.path.suffix in (".json", ".jsonl", ".db") and self.path.suffix != suffix:
+            self.path = self.path.with_suffix(suffix)
+        # شناسه‌ی session روی همه‌ی رکوردها ثبت می‌شود (برای کوئری بر اساس session)
+        self.session = session or datetime.now().strftime("%Y%m%dT%H%M%S")
 
-    def log_trade(self, direction: str, amount: float, result: str):
-        ts = datetime.now().isoformat(timespec="seconds")
-        rec = {"time": ts, "direction": direction, "amount": amount, "result": result}
-        data = self._read_all()
-        data.append(rec)
-        self._write_all(data)
+        legacy = self.path.with_suffix(".json")
+        needs_migration = legacy.exists() and not self.path.exists()
+        if backend == "sqlite":
+            self.store = SQLiteTradeStore(self.path, fsync=fsync)
+        else:
+            self.store = TradeJournal(self.path, fsync=fsync)
+
+        # مهاجرت یک‌باره از فایل قدیمی (فقط اگر store هنوز ساخته نشده بود)
+        if needs_migration:
+            migrate_json_to_journal(legacy, self.store)
+
+        # آمار افزایشی: یک بار از ژورنال بازسازی و سپس با هر معامله به‌روز می‌شود
+        self._stats = TradeStats(window_trades=window_trades, window_seconds=window_seconds,
+                                 payout=payout)
+        self._stats.rebuild(self.store.iter_trades())
+
+        # نوشتن در پس‌زمینه: log_* فقط رکورد را در صف می‌گذارد و فوراً برمی‌گردد
+        self.writer = None
+        if background:
+            self.writer = BackgroundLogWriter(self.store.append_many, max_queue=max_queue,
+                                              batch_size=batch_size, flush_interval=flush_interval)
+
+    def log_trade(self, direction: str, amount: float, result: str, pnl: float = None):
+        now = datetime.now()
+        ts = now.isoformat(timespec="seconds")
+        rec = {"time": ts, "session": self.session, "direction": direction,
+               "amount": amount, "result": result}
+        if pnl is not None:
+            rec["pnl"] = pnl
+        self._stats.update(rec, now.timestamp())
+        self._write(rec)
 
     def log_event(self, name: str, payload: dict):
         ts = datetime.now().isoformat(timespec="seconds")
-        rec = {"time": ts, "event": name, "payload": payload}
-        data = self._read_all()
-        data.append(rec)
-        self._write_all(data)
+        rec = {"time": ts, "session": self.session, "event": name, "payload": payload}
+        self._write(rec)
+
+    def records(self, day=None):
+        """لیست رکوردهای یک روز (پیش‌فرض: امروز)"""
+        self.flush()
+        return self.store.read_day(day)
+
+    def iter_trades(self, start=None, end=None, direction=None, result=None, session=None):
+        """پیمایش معاملات بر اساس بازه‌ی زمانی، جهت، نتیجه و session (iterator)"""
+        self.flush()
+        return self.store.iter_trades(start=start, end=end, direction=direction,
+                                      result=result, session=session)
 
     def stats(self):
-        data = self._read_all()
-        trades = [d for d in data if "result" in d]
-        wins = sum(1 for t in trades if t["result"] == "win")
-        losses = sum(1 for t in trades if t["result"] == "loss")
-        total = len(trades)
-        wr = (wins / total * 100) if total else 0.0
-        return {"total": total, "wins": wins, "losses": losses, "winrate": round(wr, 2)}
-
-    def _read_all(self):
-        return json.loads(self.path.read_text(encoding="utf-8"))
-
-    def _write_all(self, data):
-        self.path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
\ No newline at end of file
+        """
+        آمار O(1): شمارنده‌های کل + پنجره‌های last_n (N معامله‌ی آخر) و last_t (T ثانیه‌ی آخر)
+        """
+        return self._stats.snapshot()
+
+    def metrics(self):
+        """شمارنده‌های صف نوشتن (عمق صف، رکوردهای دور ریخته شده، ...)"""
+        return self.writer.metrics() if self.writer else {}
+
+    def flush(self):
+        """انتظار تا نوشته شدن همه‌ی رکوردهای در صف"""
+        if self.writer:
+            self.writer.flush()
+
+    def close(self, timeout: float = 30.0):
+        """
+        بستن ژورنال فقط بعد از پایان ترد نویسنده (وگرنه نوشتن دیرهنگام فایل را دوباره باز می‌کند)
+        """
+        if self.writer and not self.writer.close(timeout):
+            print("⚠️ نویسنده‌ی لاگ در مهلت متوقف نشد؛ ژورنال باز می‌ماند.")
+            return False
+        self.store.close()
+        return True
+
+    def _write(self, rec):
+        if self.writer:
+            self.writer.put(rec)
+        else:
+            self.store.append(rec)
@@ -0,0 +1,144 @@
+# وظایف:
+# ۱. نگهداری شمارنده‌های جاری (برد، باخت، درصد برد، سود/زیان، رشته‌ی باخت)
+# ۲. پنجره‌های غلتان: N معامله‌ی آخر و T ثانیه‌ی آخر (ring buffer)
+# ۳. به‌روزرسانی O(1) با هر معامله تا UI و کنترل ریسک بتوانند بی‌هزینه poll کنند
+
+"""
+ماژول TradeStats
+-----------------
+آمار افزایشی معاملات؛ بدون خواندن دوباره‌ی ژورنال در هر فراخوانی.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+def trade_pnl(rec: dict, payout: float) -> float:
+    """سود/زیان یک رکورد معامله (اگر pnl صریح ثبت نشده باشد از مبلغ و payout محاسبه می‌شود)"""
+    if rec.get("pnl") is not None:
+        return float(rec["pnl"])
+    amount = float(rec.get("amount") or 0.0)
+    result = rec.get("result")
+    if result == "win":
+        return amount * payout
+    if result == "loss":
+        return -amount
+    return 0.0
+
+
+def record_epoch(rec: dict) -> float:
+    """تبدیل فیلد time (ISO) رکورد به epoch seconds"""
+    try:
+        return datetime.fromisoformat(rec["time"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+
+class _Window:
+    """مجموع‌های یک پنجره‌ی غلتان؛ هر ورودی (ts, win, loss, pnl)"""
+    __slots__ = ("items", "total", "wins", "losses", "pnl")
+
+    def __init__(self, maxlen=None):
+        self.items = deque(maxlen=maxlen)
+        self.total = 0
+        self.wins = 0
+        self.losses = 0
+        self.pnl = 0.0
+
+    def push(self, item):
+        if self.items.maxlen is not None and len(self.items) == self.items.maxlen:
+            self._drop(self.items[0])
+        self.items.append(item)
+        self.total += 1
+        self.wins += item[1]
+        self.losses += item[2]
+        self.pnl += item[3]
+
+    def evict_before(self, cutoff):
+        items = self.items
+        while items and items[0][0] < cutoff:
+            self._drop(items.popleft())
+
+    def _drop(self, item):
+        self.total -= 1
+        self.wins -= item[1]
+        self.losses -= item[2]
+        self.pnl -= item[3]
+
+    def snapshot(self):
+        wr = (self.wins / self.total * 100) if self.total else 0.0
+        return {"total": self.total, "wins": self.wins, "losses": self.losses,
+                "winrate": round(wr, 2), "pnl": round(self.pnl, 2)}
+
+
+class TradeStats:
+    """
+    آمار افزایشی:
+        window_trades: اندازه‌ی پنجره‌ی «N معامله‌ی آخر»
+        window_seconds: طول پنجره‌ی «T ثانیه‌ی آخر»
+        payout: ضریب سود معامله‌ی برنده (برای محاسبه‌ی PnL)
+    """
+
+    def __init__(self, window_trades: int = 50, window_seconds: float = 600.0, payout: float = 0.8):
+        self.payout = payout
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+
+        self.total = 0
+        self.wins = 0
+        self.losses = 0
+        self.pnl = 0.0
+        self.loss_streak = 0
+        self.max_loss_streak = 0
+
+        self._last_n = _Window(maxlen=window_trades)
+        self._last_t = _Window()
+
+    def update(self, rec: dict, ts: float = None):
+        """اعمال یک رکورد معامله (دارای کلید result)"""
+        result = rec.get("result")
+        win = 1 if result == "win" else 0
+        loss = 1 if result == "loss" else 0
+        pnl = trade_pnl(rec, self.payout)
+        item = (ts if ts is not None else record_epoch(rec), win, loss, pnl)
+
+        with self._lock:
+            self.total += 1
+            self.wins += win
+            self.losses += loss
+            self.pnl += pnl
+            if loss:
+                self.loss_streak += 1
+                if self.loss_streak > self.max_loss_streak:
+                    self.max_loss_streak = self.loss_streak
+            elif win:
+                self.loss_streak = 0
+            self._last_n.push(item)
+            self._last_t.push(item)
+            self._last_t.evict_before(item[0] - self.window_seconds)
+
+    def rebuild(self, records):
+        """بازسازی شمارنده‌ها از رکوردهای ژورنال (هنگام شروع برنامه)"""
+        for rec in records:
+            if "result" in rec:
+                self.update(rec)
+
+    def snapshot(self, now: float = None) -> dict:
+        """خروجی آمار فعلی؛ کلیدهای قدیمی stats() حفظ شده‌اند"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._last_t.evict_before(now - self.window_seconds)
+            wr = (self.wins / self.total * 100) if self.total else 0.0
+            return {
+                "total": self.total,
+                "wins": self.wins,
+                "losses": self.losses,
+                "winrate": round(wr, 2),
+                "pnl": round(self.pnl, 2),
+                "loss_streak": self.loss_streak,
+                "max_loss_streak": self.max_loss_streak,
+                "last_n": self._last_n.snapshot(),
+                "last_t": self._last_t.snapshot(),
+            }
@@ -0,0 +1,155 @@
+# وظایف:
+# ۱. ذخیره‌ی معاملات و رویدادها در SQLite (ماژول استاندارد sqlite3) برای تاریخچه‌ی چندماهه
+# ۲. حالت WAL و درج دسته‌ای در یک تراکنش
+# ۳. ایندکس روی زمان، نتیجه و session
+# ۴. کوئری بر اساس بازه‌ی زمانی، جهت، نتیجه و session به‌صورت iterator
+
+"""
+ماژول SQLiteTradeStore
+-----------------------
+بک‌اند SQLite برای TradeLogger با همان رابط TradeJournal (append_many / iter_records / read_day).
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from core.trade_journal import FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER, FSYNC_POLICIES, to_iso
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id        INTEGER PRIMARY KEY,
+    time      TEXT NOT NULL,
+    session   TEXT,
+    event     TEXT,
+    direction TEXT,
+    amount    REAL,
+    result    TEXT,
+    pnl       REAL,
+    data      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_time ON records(time);
+CREATE INDEX IF NOT EXISTS idx_records_result ON records(result, time);
+CREATE INDEX IF NOT EXISTS idx_records_session ON records(session, time);
+"""
+
+# سطح synchronous متناظر با سیاست fsync ژورنال
+_SYNCHRONOUS = {FSYNC_ALWAYS: "FULL", FSYNC_INTERVAL: "NORMAL", FSYNC_NEVER: "OFF"}
+
+
+class SQLiteTradeStore:
+    """
+    همه‌ی نوشتن‌ها از یک اتصال (معمولاً ترد BackgroundLogWriter) انجام می‌شود؛
+    هر کوئری اتصال فقط‌خواندنی خودش را باز می‌کند تا در حالت WAL با نوشتن تداخل نداشته باشد.
+    """
+
+    def __init__(self, path: str = "logs/trades.db", fsync: str = FSYNC_INTERVAL):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"سیاست fsync نامعتبر است: {fsync}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={_SYNCHRONOUS[fsync]}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ----------------- نوشتن ----------------- #
+
+    def append(self, rec: dict):
+        self.append_many((rec,))
+
+    def append_many(self, records):
+        """درج دسته‌ای رکوردها در یک تراکنش"""
+        rows = [(
+            r.get("time"), r.get("session"), r.get("event"), r.get("direction"),
+            r.get("amount"), r.get("result"), r.get("pnl"),
+            json.dumps(r, ensure_ascii=False),
+        ) for r in records]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO records (time, session, event, direction, amount, result, pnl, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def sync(self):
+        """نقطه‌ی بازرسی WAL (انتقال WAL به فایل اصلی)"""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ----------------- خواندن ----------------- #
+
+    def _query(self, where, params):
+        """اجرای کوئری روی اتصال جداگانه و برگرداندن رکوردها به‌صورت iterator"""
+        sql = "SELECT data FROM records"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY time, id"
+        # as_uri مسیر را percent-encode می‌کند (فاصله، ?، # و % در نام پوشه)
+        conn = sqlite3.connect(self.path.resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            for (data,) in conn.execute(sql, params):
+                yield json.loads(data)
+        finally:
+            conn.close()
+
+    def iter_records(self):
+        return self._query([], ())
+
+    def iter_trades(self, start=None, end=None, direction=None, result=None, session=None):
+        """
+        پیمایش معاملات با فیلترهای اختیاری:
+            start/end: بازه‌ی زمانی [start, end)
+            direction: buy / sell
+            result: win / loss
+            session: شناسه‌ی session
+        """
+        where, params = ["result IS NOT NULL"], []
+        if start is not None:
+            where.append("time >= ?")
+            params.append(to_iso(start))
+        if end is not None:
+            where.append("time < ?")
+            params.append(to_iso(end))
+        if direction is not None:
+            where.append("direction = ?")
+            params.append(direction)
+        if result is not None:
+            where.append("result = ?")
+            params.append(result)
+        if session is not None:
+            where.append("session = ?")
+            params.append(session)
+        return self._query(where, params)
+
+    def iter_events(self, name=None, start=None, end=None, session=None):
+        """پیمایش رویدادها (log_event) با فیلترهای اختیاری"""
+        where, params = ["event IS NOT NULL"], []
+        if name is not None:
+            where.append("event = ?")
+            params.append(name)
+        if start is not None:
+            where.append("time >= ?")
+            params.append(to_iso(start))
+        if end is not None:
+            where.append("time < ?")
+            params.append(to_iso(end))
+        if session is not None:
+            where.append("session = ?")
+            params.append(session)
+        return self._query(where, params)
+
+    def read_day(self, day=None):
+        """رکوردهای یک روز (پیش‌فرض: امروز) با استفاده از ایندکس زمان"""
+        day = day or date.today()
+        nxt = day + timedelta(days=1)
+        return list(self._query(["time >= ?", "time < ?"], (day.isoformat(), nxt.isoformat())))
@@ -29,19 +29,24 @@
 """
 
 from core.martingale import MartingaleManager
-from core.timing import wait_until
+from core.timing import PrecisionScheduler, next_boundary
 import time
 
+# فاصله‌ی اجرای ترید بعد از مرز کندل (ثانیه)
+BOUNDARY_OFFSET = 0.002
+
 class Trader:
     """
     کلاس Trader مسئول اجرای تریدها و مدیریت وضعیت کلی معاملات است.
     """
 
-    def __init__(self, chrome_interface, config):
+    def __init__(self, chrome_interface, config, scheduler=None):
         # chrome_interface: آبجکت برای ارسال کلیک به مرورگر (pychrome)
         # config: تنظیمات عمومی از config.json
+        # scheduler: زمان‌بند دقیق مشترک (پیش‌فرض: زمان‌بند جدید، کالیبره در همین راه‌اندازی)
         self.chrome = chrome_interface
         self.config = config
+        self.scheduler = scheduler if scheduler is not None else PrecisionScheduler()
 
         # شمارنده‌ها و وضعیت‌ها
         self.trade_counter = 0         # تعداد کل معاملات انجام شده
@@ -82,6 +87,17 @@ class Trader:
         except Exception as e:
             print(f"⚠️ خطا در ارسال معامله به مرورگر: {e}")
 
+    def place_trade_at(self, direction, deadline_epoch):
+        """
+        زمان‌بندی place_trade در زمان مطلق deadline_epoch روی ترد زمان‌بند
+        (ترد فراخواننده، مثلاً ترد تیک‌ها، منتظر نمی‌ماند). خروجی: ScheduledCall برای لغو
+        """
+        return self.scheduler.call_at(deadline_epoch, self.place_trade, direction)
+
+    def place_trade_at_boundary(self, direction, period, offset=BOUNDARY_OFFSET, now=None):
+        """اجرای ترید در مرز بعدی کندل + offset (مثلاً ۵ ثانیه + ۲ میلی‌ثانیه)"""
+        return self.place_trade_at(direction, next_boundary(period, offset, now))
+
     def update_result(self, result):
         """
         بروزرسانی وضعیت آخرین معامله
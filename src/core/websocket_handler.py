@@ -1,33 +1,61 @@
 # وظیفه:
 # ۱. اتصال به websocket داخلی Pocket Option (با pychrome)
-# ۲. دریافت و decode پیام‌ها (Base64 → JSON)
+# ۲. دریافت و decode پیام‌ها (socket.io، پیوست باینری، Base64 → JSON) با FrameDecoder
 # ۳. استخراج symbol, period, price
 # ۴. ارسال قیمت‌ها به CandleBuilder برای ساخت کندل‌ها
-# ۵. مدیریت خطا و reconnect خودکار
+# ۵. مدیریت خطا و reconnect خودکار (reattach لیسنرها؛ نظارت با ConnectionSupervisor)
+# ۶. زمان تیک‌ها بر اساس ساعت سرور (زمان داخل فریم یا تخمین offset با ServerClock)
+# ۷. استخراج قیمت/نماد/زمان با accessor کامپایل‌شده برای هر نوع رویداد (PayloadExtractor)
+# ۸. جدا کردن ترد CDP از پردازش تیک‌ها با صف ورودی محدود (IngestQueue)
+# ۹. ساخت فید وب‌سوکت همراه با ناظر اتصال (start_ws_feed)
 
 """
 ماژول WebSocketHandler
 -----------------------
 شنود فریم‌های وب‌سوکت از طریق پروتکل DevTools و استخراج قیمت برای CandleBuilder.
+فید را با start_ws_feed بسازید تا ConnectionSupervisor هم کنار handler راه بیفتد.
 """
 
-import json
-import base64
 import time
 
+from core.clock_sync import ServerClock
+from core.connection_supervisor import ConnectionSupervisor
+from core.frame_decoder import OPCODE_TEXT, FrameDecoder
+from core.ingest_queue import DROP_OLDEST, IngestQueue
+from core.payload_extractor import PayloadExtractor
+
 class WebSocketHandler:
     """
     این کلاس WebSocketFrameReceived های تب را گوش می‌دهد و قیمت‌ها را از پیام‌ها استخراج می‌کند.
     """
 
-    def __init__(self, tab, on_tick, symbol_filter=None):
+    def __init__(self, tab, on_tick=None, symbol_filter=None, registry=None, recorder=None,
+                 clock=None, events=None, queue_size=4096, overflow=DROP_OLDEST):
         # tab: همان self.tab از ChromeConnector
         # on_tick(price, ts): کال‌بک برای ارسال قیمت و زمان
+        # registry: SymbolRegistry برای ساخت کندل همه‌ی نمادها (اختیاری)
+        # recorder: TickRecorder برای ضبط باینری تیک‌ها و بازپخش بعدی (اختیاری)
+        # clock: ServerClock مشترک (مثلاً همان که به CandleBuilder داده می‌شود)
+        # events: نام رویدادهای socket.io حاوی قیمت؛ بقیه بدون parse دور ریخته می‌شوند
+        # queue_size: سقف صف بین ترد CDP و ترد پردازش (0 → پردازش مستقیم روی ترد CDP)
+        # overflow: سیاست صف پر (DROP_OLDEST یا COALESCE = آخرین قیمت هر نماد)
         self.tab = tab
         self.on_tick = on_tick
         self.symbol_filter = symbol_filter  # اگر بخواهیم فقط یک نماد را پردازش کنیم
+        self.registry = registry
+        self.recorder = recorder
         self._enabled = False
         self._ws_urls = set()  # لیست ws ها برای فیلتر کردن
+        self.clock = clock if clock is not None else ServerClock()
+        self.decoder = FrameDecoder(events)
+        self.extractor = PayloadExtractor()
+        self.last_event = None      # نام رویداد socket.io آخرین فریم decode شده
+        self.ticks = 0
+        self.server_stamped = 0     # تیک‌هایی که زمان سرور داخل فریم داشتند
+        self.last_tick_ts = None    # زمان سرور آخرین تیک (شروع وقفه هنگام قطعی)
+        self.last_tick_local = None # زمان محلی آخرین تیک (تشخیص سکوت)
+        self.ingest = IngestQueue(self._dispatch, queue_size, overflow, name="ws-ingest") \
+            if queue_size else None
 
     def start(self):
         """
@@ -36,6 +64,9 @@ class WebSocketHandler:
         if self._enabled:
             return
         self._enabled = True
+        self.last_tick_local = time.time()
+        if self.ingest is not None:
+            self.ingest.start()
 
         # رویداد دریافت فریم وب‌سوکت
         self.tab.set_listener("Network.webSocketCreated", self._on_ws_created)
@@ -52,6 +83,36 @@ class WebSocketHandler:
         # پاک کردن لیسنرها
         self.tab.set_listener("Network.webSocketCreated", None)
         self.tab.set_listener("Network.webSocketFrameReceived", None)
+        if self.ingest is not None:
+            self.ingest.stop()
+
+    def reattach(self, tab=None):
+        """
+        ثبت دوباره‌ی لیسنرها روی تب فعلی یا تب جدید (بعد از reconnect).
+        خطای CDP به فراخواننده (ConnectionSupervisor) برگردانده می‌شود.
+        """
+        if tab is not None and tab is not self.tab:
+            try:
+                self.tab.set_listener("Network.webSocketCreated", None)
+                self.tab.set_listener("Network.webSocketFrameReceived", None)
+            except Exception:
+                pass
+            self.tab = tab
+        self.decoder.reset()
+        self._enabled = False
+        self.start()
+        self.tab.call_method("Network.enable")
+
+    def metrics(self):
+        """شمارنده‌های تیک و وضعیت هم‌زمان‌سازی ساعت سرور"""
+        return {
+            "ticks": self.ticks,
+            "server_stamped": self.server_stamped,
+            "clock": self.clock.metrics(),
+            "decoder": self.decoder.metrics(),
+            "extractor": self.extractor.metrics(),
+            "ingest": self.ingest.metrics() if self.ingest is not None else None,
+        }
 
     # ----------------- لیسنرها ----------------- #
 
@@ -72,95 +133,105 @@ class WebSocketHandler:
         """
         if not self._enabled:
             return
+        # زمان دریافت تا حد ممکن زود گرفته می‌شود (نمونه‌ی هم‌زمان‌سازی دقیق‌تر)
+        local_ts = time.time()
         try:
-            payload_data = kwargs.get("response", {}).get("payloadData", "")
+            response = kwargs.get("response", {})
+            payload_data = response.get("payloadData", "")
             if not payload_data:
                 return
 
-            # برخی WS ها باینری Base64 هستند؛ اگر JSON متنی بود، همان را Parse می‌کنیم.
-            data = self._decode_payload(payload_data)
+            # دسته‌بندی با پیشوند فریم؛ ping/pong و رویدادهای نامرتبط قبل از parse رد می‌شوند
+            data = self._decode_payload(payload_data, response.get("opcode", OPCODE_TEXT))
             if not data:
                 return
 
-            # تلاش برای استخراج قیمت (این بخش بسته به فرمت واقعی پیام‌ها باید تنظیم شود)
-            price = self._extract_price(data)
-            if price is None:
-                return
-
-            # فیلتر نماد (اختیاری)
-            sym = self._extract_symbol(data)
-            if self.symbol_filter and sym and sym != self.symbol_filter:
+            # استخراج با مسیر یادگرفته‌شده برای این رویداد (اولین فریم هر رویداد جستجو می‌شود)
+            ticks = self.extractor.extract(self.last_event, data)
+            if not ticks:
                 return
-
-            ts = time.time()
-            self.on_tick(price, ts)
+            # یک فریم ممکن است تیک چند نماد را با هم داشته باشد
+            for price, sym, server_ts in ticks:
+                self._handle_tick(price, sym, server_ts, local_ts)
 
         except Exception as e:
             # برای جلوگیری از قطع جریان، فقط گزارش کن
             print("⚠️ خطا در پردازش فریم WS:", e)
 
-    # ----------------- ابزارهای استخراج ----------------- #
-
-    def _decode_payload(self, payload):
+    def _handle_tick(self, price, sym, server_ts, local_ts):
+        """زمان‌گذاری، ضبط و ارسال یک تیک به صف ورودی"""
+        self.ticks += 1
+        if server_ts is not None:
+            # زمان سرور: هم برای تیک و هم به‌عنوان نمونه‌ی هم‌زمان‌سازی ساعت
+            self.server_stamped += 1
+            self.clock.observe(server_ts, local_ts)
+            ts = server_ts
+        else:
+            ts = self.clock.to_server(local_ts)
+        self.last_tick_ts = ts
+        self.last_tick_local = local_ts
+
+        # ضبط تیک (فقط قرار دادن در صف؛ نوشتن در ترد جداگانه انجام می‌شود)
+        if self.recorder is not None:
+            self.recorder.record(price, ts, sym or "")
+
+        # بقیه‌ی پردازش در ترد صف ورودی؛ ترد CDP بلافاصله آزاد می‌شود
+        if self.ingest is not None:
+            self.ingest.push(price, ts, sym)
+        else:
+            self._dispatch(price, ts, sym)
+
+    def _dispatch(self, price, ts, sym):
         """
-        تلاش برای Decode پیام:
-        1) JSON ساده
-        2) Base64 → متن → JSON
-        3) Base64 → باینری خاص (غیرقابل استفاده در این سطح) → رد
+        پردازش تیک (رجیستری، فیلتر نماد، on_tick) در ترد صف ورودی.
         """
-        # 1) اگر مستقیم JSON بود
-        try:
-            if payload and payload[0] in ("{", "["):
-                return json.loads(payload)
-        except Exception:
-            pass
+        # ارسال به رجیستری چندنمادی (همه‌ی نمادها)
+        if self.registry is not None and sym:
+            self.registry.add_tick(sym, price, ts)
 
-        # 2) Base64 → Try JSON
-        try:
-            raw = base64.b64decode(payload)
-            txt = raw.decode("utf-8", errors="ignore").strip()
-            if txt and txt[0] in ("{", "["):
-                return json.loads(txt)
-        except Exception:
-            pass
+        # فیلتر نماد (اختیاری)
+        if self.symbol_filter and sym and sym != self.symbol_filter:
+            return
+
+        if self.on_tick:
+            self.on_tick(price, ts)
 
-        return None
+    # ----------------- ابزارهای استخراج ----------------- #
 
-    def _extract_price(self, data):
+    def _decode_payload(self, payload, opcode=OPCODE_TEXT):
         """
-        استخراج قیمت از ساختارهای رایج پیام‌ها.
-        این تابع باید با ساختار واقعی Pocket Option تطبیق داده شود.
-        چند الگوی رایج بررسی می‌شود.
+        Decode پیام با FrameDecoder:
+        1) socket.io (‎42[...]‎ و ‎451-[...]‎ + پیوست‌های باینری)
+        2) JSON ساده
+        3) Base64 → JSON (فریم باینری یا سازگاری قبلی)
+        خروجی فقط داده است؛ نام رویداد در self.last_event نگه داشته می‌شود.
         """
-        try:
-            # مثال‌های احتمالی (با توجه به پلتفرم):
-            # 1) {"price": 1.23456}
-            if isinstance(data, dict) and "price" in data:
-                return float(data["price"])
-
-            # 2) {"data": {"price": ...}}
-            if isinstance(data, dict) and "data" in data and "price" in data["data"]:
-                return float(data["data"]["price"])
-
-            # 3) آرایه‌ای از تیک‌ها
-            if isinstance(data, list) and data and isinstance(data[0], dict):
-                cand = data[0]
-                if "price" in cand:
-                    return float(cand["price"])
-        except Exception:
+        result = self.decoder.decode(payload, opcode)
+        if result is None:
             return None
-        return None
+        self.last_event, data = result
+        return data
 
-    def _extract_symbol(self, data):
-        """
-        تلاش برای استخراج نماد از پیام (اختیاری).
-        """
-        try:
-            if isinstance(data, dict):
-                if "symbol" in data:
-                    return str(data["symbol"])
-                if "data" in data and "symbol" in data["data"]:
-                    return str(data["data"]["symbol"])
-        except Exception:
-            pass
-        return None
\ No newline at end of file
+
+def start_ws_feed(connector, on_tick=None, builder=None, registry=None, symbol_filter=None,
+                  recorder=None, clock=None, events=None, **supervisor_kwargs):
+    """
+    ساخت و شروع WebSocketHandler روی تب connector همراه با ConnectionSupervisor.
+    builder / registry هم مقصد وقفه‌های اتصال (gap_sinks) هستند تا کندل‌های هم‌پوش
+    با قطعی spans_gap بگیرند. خروجی: (handler, supervisor)؛ توقف با stop_ws_feed.
+    """
+    if connector.tab is None:
+        connector.connect()
+    handler = WebSocketHandler(connector.tab, on_tick=on_tick, symbol_filter=symbol_filter,
+                               registry=registry, recorder=recorder, clock=clock, events=events)
+    handler.start()
+    sinks = [s for s in (builder, registry) if s is not None]
+    supervisor = ConnectionSupervisor(connector, handler, gap_sinks=sinks, **supervisor_kwargs)
+    supervisor.start()
+    return handler, supervisor
+
+
+def stop_ws_feed(handler, supervisor):
+    """توقف ناظر (اول، تا reconnect جدیدی شروع نشود) و بعد handler"""
+    supervisor.stop()
+    handler.stop()
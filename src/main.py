@@ -4,11 +4,20 @@ Bot Trade Project - Offline Simulation Mode
 اجرای ربات در حالت آفلاین با داده‌های تست (شبیه‌سازی کندل‌های ۵ ثانیه‌ای)
 """
 
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+
 from core.candle_engine import CandleEngine
 from core.strategy_five_sec import StrategyFiveSec
 from core.martingale_manager import MartingaleManager
 from core.trade_executor import TradeExecutorMock
 from core.trade_logger import TradeLogger
+from core.timer_wheel import default_wheel
+from core.timing import PrecisionScheduler, next_boundary
+from core.trader import BOUNDARY_OFFSET
 
 def main():
     """
@@ -22,32 +31,55 @@ def main():
         "five_second_mode": True,
         "max_trades": 10,
         "martingale_factor": 2,
-        "continue_after_loss": True
+        "continue_after_loss": True,
+        "trade_duration": 5,
+        "pause_between_trades": 1,
     }
 
     # 🧩 ایجاد ماژول‌ها
-    engine = CandleEngine(mode="sim")              # موتور شبیه‌سازی کندل‌ها
+    wheel = default_wheel()                        # چرخ زمان‌سنج مشترک (کندل، انقضا، مکث)
+    scheduler = PrecisionScheduler()               # اجرای ترید در مرز کندل (کالیبره در راه‌اندازی)
+    engine = CandleEngine(mode="sim", wheel=wheel) # موتور شبیه‌سازی کندل‌ها
     strategy = StrategyFiveSec(cfg)                # منطق تصمیم‌گیری
     logger = TradeLogger()                         # ثبت وقایع
     martingale = MartingaleManager(base_amount=1.0, factor=2.0, max_steps=3)
     executor = TradeExecutorMock(logger=logger)    # اجرای ترید ماک
 
-    # اجرای شبیه‌سازی و تولید کندل‌های تست
-    engine.run_simulation(duration=60)
-
     # ✅ شبیه‌سازی ترید بر اساس سیگنال تصادفی استراتژی
+    # هر ترید بعد از trade_duration روی چرخ تسویه می‌شود و ترید بعدی بعد از pause_between_trades
+    # در اولین مرز کندل + BOUNDARY_OFFSET با زمان‌بند دقیق باز می‌شود
     import random
-    for i in range(cfg["max_trades"]):
+    finished = threading.Event()
+    placed = [0]
+
+    def place_next():
+        placed[0] += 1
         direction = random.choice(["buy", "sell"])
         amount = martingale.current_amount()
-        print(f"\n🕓 ترید شماره {i+1} | جهت: {direction.upper()} | حجم: {amount}")
-        win = executor.place_trade(direction, amount)
+        print(f"\n🕓 ترید شماره {placed[0]} | جهت: {direction.upper()} | حجم: {amount}")
+        win = executor.place_trade(direction, amount, expiry_seconds=cfg["trade_duration"])
+        wheel.call_later(cfg["trade_duration"], settle, direction, amount, win)
+
+    def settle(direction, amount, win):
         result = "win" if win else "loss"
         logger.log_trade(direction, amount, result=result)
         if win:
             martingale.on_win()
         else:
             martingale.on_loss()
+        if placed[0] < cfg["max_trades"]:
+            after_pause = time.time() + cfg["pause_between_trades"]
+            scheduler.call_at(next_boundary(5, BOUNDARY_OFFSET, after_pause), place_next)
+        else:
+            finished.set()
+
+    scheduler.call_at_boundary(5, BOUNDARY_OFFSET, place_next)
+
+    # اجرای شبیه‌سازی و تولید کندل‌های تست
+    engine.run_simulation(duration=60)
+    finished.wait(cfg["max_trades"] * (cfg["trade_duration"] + cfg["pause_between_trades"] + 5) + 5)
+    scheduler.stop()
+    print(f"⏱ دیرکرد زمان‌بند ترید: {scheduler.metrics()['lateness']}")
 
     # 📊 نمایش آمار نهایی
     stats = logger.stats()
@@ -55,6 +87,148 @@ def main():
     print(f"تعداد کل معاملات: {stats['total']}")
     print(f"بردها: {stats['wins']} | باخت‌ها: {stats['losses']}")
     print(f"درصد برد: {stats['winrate']}%")
+    logger.close()
+
+def run_backtest(ticks_dir, symbol=None, start_day=None, end_day=None):
+    """
+    بک‌تست قطعی روی تیک‌های ضبط‌شده (به‌جای سیگنال و نتیجه‌ی تصادفی)
+    """
+    from core.backtest import Backtester
+    from core.tick_recorder import TickReplayer
+
+    cfg_path = Path(__file__).resolve().parent.parent / "config.json"
+    cfg = json.loads(cfg_path.read_text(encoding="utf-8")) if cfg_path.exists() else {}
+
+    ts, prices = TickReplayer(ticks_dir).load(symbol, start_day, end_day)
+    if len(ts) == 0:
+        print("⚠️ هیچ تیکی برای بک‌تست پیدا نشد.")
+        return None
+    print(f"🔷 بک‌تست روی {len(ts)} تیک ...")
+    result = Backtester(cfg).run(ts, prices)
+    stats = result.stats
+    print("\n📈 نتایج بک‌تست:")
+    print(f"تعداد کل معاملات: {stats['total']}")
+    print(f"بردها: {stats['wins']} | باخت‌ها: {stats['losses']}")
+    print(f"درصد برد: {stats['winrate']}% | سود/زیان: {stats['pnl']}")
+    print(f"بیشترین رشته‌ی باخت: {stats['max_loss_streak']}")
+    return result
+
+def run_sweep(space_path, ticks_dir, symbol=None, start_day=None, end_day=None, workers=None):
+    """
+    جستجوی پارامترها روی چند هسته. فایل فضای جستجو (JSON):
+        {"grid": {"doji_body_ratio": [0.05, 0.1], "max_steps": [3, 5]}}
+    یا
+        {"random": {"reverse_trading": [true, false]},
+         "ranges": {"doji_body_ratio": [0.02, 0.3], "max_steps": [1, 6]},
+         "samples": 200, "seed": 0}
+    """
+    from core.param_sweep import ParameterSweep, grid_space, random_space
+    from core.tick_recorder import TickReplayer
+
+    cfg_path = Path(__file__).resolve().parent.parent / "config.json"
+    cfg = json.loads(cfg_path.read_text(encoding="utf-8")) if cfg_path.exists() else {}
+    spec = json.loads(Path(space_path).read_text(encoding="utf-8"))
+    if "grid" in spec:
+        combos = grid_space(spec["grid"])
+    else:
+        space = dict(spec.get("random", {}))
+        space.update({k: tuple(v) for k, v in spec.get("ranges", {}).items()})
+        combos = random_space(space, spec.get("samples", 100), spec.get("seed", 0))
+
+    ts, prices = TickReplayer(ticks_dir).load(symbol, start_day, end_day)
+    if len(ts) == 0:
+        print("⚠️ هیچ تیکی برای sweep پیدا نشد.")
+        return None
+    ranked = ParameterSweep(ts, prices, base_config=cfg, workers=workers).run(combos)
+    print("\n🏆 بهترین ترکیب‌ها:")
+    for i, r in enumerate(ranked[:10], 1):
+        print(f"{i}. {r['params']} | pnl={r['pnl']} | winrate={r['winrate']}% | "
+              f"max_drawdown={r['max_drawdown']}")
+    return ranked
+
+
+def run_ws_live(symbol=None, duration=300, record_dir=None):
+    """
+    حالت زنده روی فید وب‌سوکت Pocket Option: کندل‌ها با CandleBuilder (زمان سرور)،
+    تصمیم با ArmedDecider و نظارت اتصال با ConnectionSupervisor (علامت‌گذاری وقفه‌ها).
+    بدون symbol همه‌ی دارایی‌های تب با SymbolRegistry دنبال می‌شوند و در هر بسته شدن
+    کندل بهترین نماد انتخاب می‌شود. record_dir: ضبط باینری همه‌ی تیک‌ها با TickRecorder
+    (قابل بازپخش با --backtest همان پوشه).
+    """
+    from core.armed_decision import ArmedDecider
+    from core.candle_builder import CandleBuilder
+    from core.chrome_connector import ChromeConnector
+    from core.clock_sync import ServerClock
+    from core.symbol_registry import SymbolRegistry
+    from core.tick_recorder import TickRecorder
+    from core.websocket_handler import start_ws_feed, stop_ws_feed
+
+    cfg_path = Path(__file__).resolve().parent.parent / "config.json"
+    cfg = json.loads(cfg_path.read_text(encoding="utf-8")) if cfg_path.exists() else {}
+
+    def on_signal(cmd, candle):
+        print(f"🚀 سیگنال معاملاتی زنده: {'BUY' if cmd == 0 else 'SELL'} (کندل {candle.start_ts})")
+
+    def on_best(sym, cmd, score):
+        print(f"🎯 بهترین نماد: {sym} → {'BUY' if cmd == 0 else 'SELL'} (امتیاز {score:.2f})")
+
+    clock = ServerClock()
+    strategy = StrategyFiveSec(cfg)
+    decider = builder = registry = on_tick = None
+    if symbol is None:
+        registry = SymbolRegistry(strategy=strategy, on_best=on_best, clock=clock)
+    else:
+        decider = ArmedDecider(strategy, on_signal=on_signal, clock=clock.now)
+        builder = CandleBuilder(on_close=decider.on_close, clock=clock)
+
+        def on_tick(price, ts):
+            builder.add_price(price, ts)
+            decider.on_tick(builder.get_current_open(), price, ts)
+
+    recorder = TickRecorder(record_dir) if record_dir else None
+    connector = ChromeConnector()
+    connector.connect()
+    handler, supervisor = start_ws_feed(connector, on_tick=on_tick, builder=builder,
+                                        registry=registry, symbol_filter=symbol,
+                                        recorder=recorder, clock=clock)
+    print(f"🔷 حالت زنده (وب‌سوکت) برای {duration} ثانیه ...")
+    try:
+        threading.Event().wait(duration)
+    except KeyboardInterrupt:
+        print("\n⏹ حالت زنده به‌صورت دستی متوقف شد.")
+    finally:
+        stop_ws_feed(handler, supervisor)
+        connector.close()
+        print(f"📊 اتصال: {supervisor.metrics()}")
+        if recorder is not None:
+            recorder.close()
+            print(f"💾 ضبط تیک‌ها در {record_dir}: {recorder.metrics()}")
+        if decider is not None:
+            print(decider.report())
+        else:
+            print(f"📊 نمادها: {len(registry)} | انتخاب‌ها: {registry.picks}")
+    return decider if decider is not None else registry
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Bot Trade Project")
+    parser.add_argument("--backtest", metavar="TICKS_DIR", help="بک‌تست روی تیک‌های ضبط‌شده")
+    parser.add_argument("--symbol", help="نماد مورد نظر برای بک‌تست")
+    parser.add_argument("--start-day", help="روز شروع (YYYYMMDD)")
+    parser.add_argument("--end-day", help="روز پایان (YYYYMMDD)")
+    parser.add_argument("--sweep", metavar="SPACE_JSON",
+                        help="جستجوی پارامترها (همراه با --backtest برای مسیر تیک‌ها)")
+    parser.add_argument("--workers", type=int, help="تعداد پروسس‌های sweep")
+    parser.add_argument("--ws", action="store_true", help="حالت زنده روی فید وب‌سوکت مرورگر")
+    parser.add_argument("--duration", type=int, default=300, help="مدت حالت زنده (ثانیه)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="ضبط تیک‌های حالت --ws در سگمنت‌های باینری روزانه")
+    args = parser.parse_args()
+    if args.sweep and args.backtest:
+        run_sweep(args.sweep, args.backtest, args.symbol, args.start_day, args.end_day, args.workers)
+    elif args.backtest:
+        run_backtest(args.backtest, args.symbol, args.start_day, args.end_day)
+    elif args.ws:
+        run_ws_live(args.symbol, args.duration, args.record)
+    else:
+        main()
\ No newline at end of file
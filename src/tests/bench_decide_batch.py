@@ -0,0 +1,56 @@
+"""
+بنچمارک decide_batch در برابر حلقه‌ی decide_trade (فایل تست pytest نیست)
+اجرا از پوشه‌ی src:
+    python -m tests.bench_decide_batch [تعداد کندل]
+یا مستقیم:
+    python src/tests/bench_decide_batch.py [تعداد کندل]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# اجرای مستقیم فایل: پوشه‌ی src (ریشه‌ی importها) در مسیر نیست
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.candle import Candle
+from core.strategy_five_sec import StrategyFiveSec
+from tests.test_strategy_five_sec import _market
+
+
+def _timed(fn):
+    t = time.perf_counter()
+    fn()
+    return time.perf_counter() - t
+
+
+def main(n=200_000, rounds=7, batch_per_round=5):
+    s = StrategyFiveSec({})
+    o, h, l, c, current_open, current_price = _market(n, seed=1)
+    candles = [Candle(*x) for x in zip(o.tolist(), h.tolist(), l.tolist(), c.tolist())]
+    po = [None if x != x else x for x in current_open.tolist()]
+    pp = current_price.tolist()
+    decide = s.decide_trade
+
+    def scalar():
+        for i in range(1, n):
+            decide(candles[i - 1], candles[i], po[i], pp[i])
+
+    def batch():
+        s.decide_batch(o, h, l, c, current_open, current_price)
+
+    # دو مسیر یک‌درمیان اندازه‌گیری می‌شوند تا نویز ماشین روی هر دو یکسان اثر کند؛ کمینه‌ی هر کدام.
+    # مثل اجرای تحقیق (آرایه‌ها تازه از bucket_ohlc ساخته شده‌اند) داده‌ها قبل از اندازه‌گیری گرم‌اند.
+    best_batch = best_loop = float("inf")
+    for _ in range(rounds):
+        best_loop = min(best_loop, _timed(scalar))
+        batch()
+        for _ in range(batch_per_round):
+            best_batch = min(best_batch, _timed(batch))
+    batch, loop = best_batch, best_loop
+    print(f"📊 {n} کندل | decide_batch: {batch * 1e3:.2f} ms | "
+          f"حلقه‌ی decide_trade: {loop * 1e3:.1f} ms | تسریع: {loop / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,10 @@
+"""
+تنظیم مسیر import برای تست‌ها: پوشه‌ی src ریشه‌ی import است (from core.x import Y)
+"""
+
+import os
+import sys
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
@@ -0,0 +1,111 @@
+import threading
+
+import numpy as np
+
+from core.armed_decision import ArmedDecider
+from core.candle import Candle
+from core.candle_engine import CandleEngine
+from core.strategy_five_sec import StrategyFiveSec
+
+
+class _Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _pair(shadow):
+    # c1 و c2 صعودی؛ با shadow=True کندل دوم شدوی پایین دارد (شرط ج، بدون نیاز به کندل سوم)
+    c1 = Candle(1.0000, 1.0025, 1.0000, 1.0020, start_ts=0.0, end_ts=5.0)
+    low = 1.0015 if shadow else 1.0020
+    c2 = Candle(1.0020, 1.0052, low, 1.0050, start_ts=5.0, end_ts=10.0)
+    return c1, c2
+
+
+def test_arm_fire_matches_decide_trade():
+    s = StrategyFiveSec({})
+    rng = np.random.default_rng(5)
+    n = 20000
+    o = np.round(1 + rng.normal(0, 1e-3, n), 4)
+    c = np.round(o + rng.normal(0, 3e-4, n), 4)
+    flat = rng.random(n) < 0.05
+    c[flat] = o[flat]
+    h = np.maximum(o, c) + np.round(np.abs(rng.normal(0, 2e-4, n)), 4) * (rng.random(n) > 0.3)
+    l = np.minimum(o, c) - np.round(np.abs(rng.normal(0, 2e-4, n)), 4) * (rng.random(n) > 0.3)
+    candles = [Candle(*x) for x in zip(o.tolist(), h.tolist(), l.tolist(), c.tolist())]
+    fired_any = set()
+    for i in range(1, n):
+        c1, c2 = candles[i - 1], candles[i]
+        armed = s.arm(c1, c2)
+        for current_open, price in ((None, 1.0), (1.0, 1.0), (1.0, 1.0003), (1.0, 0.9997)):
+            fired = armed.fire(current_open, price) if armed is not None else None
+            assert fired == s.decide_trade(c1, c2, current_open, price)
+            fired_any.add(fired)
+    assert fired_any == {None, 0, 1}
+
+
+def test_deadline_counts_from_second_candle_close():
+    clock = _Clock()
+    d = ArmedDecider(StrategyFiveSec({}), window=0.015, clock=clock)
+    c1, c2 = _pair(shadow=False)
+    d.on_close(c1)
+    assert d.on_close(c2) is None           # شرط پ: منتظر تیک کندل سوم
+    # اولین تیک کندل سوم ۲۰ms بعد از end_ts؛ مهلت از end_ts است نه از این تیک
+    clock.now = 10.020
+    assert d.on_tick(1.0050, 1.0051, ts=10.020) is None
+    assert d.armed is None and d.expired == 1 and d.fired == 0
+
+
+def test_fires_inside_window_and_records_close_lag():
+    clock = _Clock()
+    d = ArmedDecider(StrategyFiveSec({}), window=0.015, clock=clock)
+    c1, c2 = _pair(shadow=False)
+    d.on_close(c1)
+    d.on_close(c2)
+    clock.now = 10.004
+    assert d.on_tick(1.0050, 1.0049, ts=10.003) is None     # کندل سوم نزولی: تأیید نشد
+    clock.now = 10.010
+    assert d.on_tick(1.0050, 1.0052, ts=10.009) == 0
+    assert d.on_tick(1.0050, 1.0053, ts=10.010) is None     # فقط یک بار
+    assert d.fired == 1 and d.close_lag.count == 1
+
+
+def test_late_delivery_is_not_fired():
+    # زمان تیک داخل مهلت است ولی پردازش آن دیرتر از end_ts + window انجام می‌شود
+    clock = _Clock()
+    d = ArmedDecider(StrategyFiveSec({}), window=0.015, clock=clock)
+    c1, c2 = _pair(shadow=False)
+    d.on_close(c1)
+    d.on_close(c2)
+    clock.now = 10.050
+    assert d.on_tick(1.0050, 1.0052, ts=10.005) is None
+    assert d.late == 1 and d.fired == 0
+
+
+def test_unconditional_signal_fires_on_close():
+    clock = _Clock(10.001)
+    signals = []
+    d = ArmedDecider(StrategyFiveSec({}), clock=clock, on_signal=lambda cmd, c: signals.append(cmd))
+    c1, c2 = _pair(shadow=True)
+    d.on_close(c1)
+    assert d.on_close(c2) == 0
+    assert signals == [0] and d.armed is None
+
+
+def test_live_engine_uses_armed_decider():
+    engine = CandleEngine(mode="live", live_reader=object())
+    signals = []
+    engine.decider.on_signal = lambda cmd, c: signals.append(cmd)
+    engine.running = True
+    engine._live = None
+    engine._live_start = 0.0
+    engine._live_lock = threading.Lock()
+    for prices in ((1.0000, 1.0025, 1.0020), (1.0020, 1.0015, 1.0052, 1.0050)):
+        for p in prices:
+            engine._on_live_price(p)
+        engine._close_live_candle()
+    c1, c2 = engine.candles.last(2)
+    assert c1.end_ts == c2.start_ts and c2.end_ts is not None
+    assert signals == [0] and engine.decider.fired == 1
@@ -0,0 +1,48 @@
+import numpy as np
+
+from core.backtest import Backtester
+from core.candle import Candle
+
+
+def _ticks(third_start):
+    # c1 و c2 صعودی با شدوی پایین روی c2 → خرید (شرط ج)
+    ts = [0.0, 4.0, 5.0, 6.0, 8.0, third_start, third_start + 1, third_start + 6]
+    px = [1.0000, 1.0020, 1.0021, 1.0010, 1.0050, 1.0052, 1.0060, 1.0061]
+    return np.array(ts), np.array(px)
+
+
+def test_signal_on_contiguous_candles():
+    bt = Backtester({})
+    candles = bt.build_candles(*_ticks(10.0))
+    assert bt.signals(candles) == [(2, 0)]
+    assert bt._signals_scalar(candles) == [(2, 0)]
+
+
+def test_no_signal_across_skipped_gap():
+    # فاصله‌ی بیش از max_gap_fill: کندل پرکننده ساخته نمی‌شود و c3 بعد از فاصله است
+    bt = Backtester({})
+    candles = bt.build_candles(*_ticks(7205.0))
+    assert [c.start_ts for c in candles] == [0, 5, 7205]
+    assert bt.signals(candles) == []
+    assert bt._signals_scalar(candles) == []
+
+
+def test_vectorized_signals_match_scalar():
+    rng = np.random.default_rng(7)
+    ts = np.cumsum(rng.exponential(0.4, 40000))
+    ts[20000:] += 5000.0                     # یک فاصله‌ی طولانی وسط داده
+    px = 1.1 + np.cumsum(rng.normal(0, 0.0002, ts.size))
+    bt = Backtester({})
+    candles = bt.build_candles(ts, px)
+    fast = bt.signals(candles)
+    assert fast
+    assert fast == bt._signals_scalar(candles)
+
+
+def test_gap_flagged_candles_are_not_traded():
+    bt = Backtester({})
+    c1 = Candle(1.0, 1.002, 1.0, 1.002, 0, 5)
+    c2 = Candle(1.002, 1.005, 1.001, 1.005, 5, 10, spans_gap=True)
+    c3 = Candle(1.005, 1.006, 1.005, 1.006, 10, 15)
+    assert bt.signals([c1, c2, c3]) == []
+    assert bt._signals_scalar([c1, c2, c3]) == []
@@ -0,0 +1,69 @@
+import random
+import threading
+
+import pytest
+
+from core.candle import Candle, FormingCandle
+from core.candle_engine import CandleEngine
+from core.strategy_five_sec import StrategyFiveSec
+
+
+def test_positional_order_is_open_high_low_close():
+    c = Candle(1.0, 4.0, 0.5, 3.0, 10, 15)
+    assert (c.open, c.high, c.low, c.close) == (1.0, 4.0, 0.5, 3.0)
+    assert (c.start_ts, c.end_ts) == (10, 15)
+    assert c.open_price == 1.0 and c.close_price == 3.0
+    # ویژگی‌های مشتق یک بار از همان ترتیب محاسبه می‌شوند
+    assert (c.body, c.range, c.upper_shadow, c.lower_shadow) == (2.0, 3.5, 1.0, 0.5)
+    assert c.is_bullish and not c.is_bearish and c.direction == "bullish"
+    bear = Candle(3.0, 4.0, 0.5, 1.0)
+    assert (bear.upper_shadow, bear.lower_shadow, bear.direction) == (1.0, 0.5, "bearish")
+    assert Candle(1.0, 1.2, 0.9, 1.00005).direction == "doji"
+
+
+def test_closed_candle_is_immutable():
+    c = Candle(1.0, 2.0, 0.5, 1.5)
+    with pytest.raises(AttributeError):
+        c.close = 2.0
+    with pytest.raises(AttributeError):
+        del c.open
+    assert not hasattr(c, "__dict__")
+
+
+def test_forming_candle_closes_with_same_order():
+    fc = FormingCandle(0, 5)
+    for price, ts in ((2.0, 0.1), (3.0, 1.0), (1.0, 2.0), (2.5, 3.0)):
+        fc.add_tick(price, ts)
+    c = fc.close_candle()
+    assert (c.open, c.high, c.low, c.close, c.start_ts, c.end_ts) == (2.0, 3.0, 1.0, 2.5, 0, 5)
+
+
+def test_engine_emits_candles_in_open_high_low_close_order():
+    random.seed(5)
+    engine = CandleEngine(mode="sim")
+    last = 100.0
+    for _ in range(200):
+        c = engine.generate_candle(last)
+        assert c.open == last
+        assert c.high >= max(c.open, c.close) and c.low <= min(c.open, c.close)
+        last = c.close
+
+    # کندل زنده از تیک‌ها: [open, high, low, close] (همان وضعیتی که run_live می‌سازد)
+    engine.running = True
+    engine._live, engine._live_start, engine._live_lock = None, 0.0, threading.Lock()
+    for price in (1.0, 1.4, 0.8, 1.1):
+        engine._on_live_price(price, 1.0)
+    engine._close_live_candle()
+    c = engine.candles.last(1)[0]
+    assert (c.open, c.high, c.low, c.close) == (1.0, 1.4, 0.8, 1.1)
+
+
+def test_strategy_reads_positional_candles_as_ohlc():
+    s = StrategyFiveSec({})
+    c1 = Candle(100, 101.2, 99.8, 101)
+    # c2 صعودی با شدوی پایین (low < open) → خرید بدون نیاز به تأیید کندل سوم
+    assert s.decide_trade(c1, Candle(101, 101.8, 100.9, 101.5), 101.5, 101.4) == 0
+    # c2 بدون شدوی پایین (low == open) → خرید فقط اگر کندل سوم هم صعودی باشد
+    c2 = Candle(101, 101.8, 101, 101.5)
+    assert s.decide_trade(c1, c2, 101.5, 101.6) == 0
+    assert s.decide_trade(c1, c2, 101.5, 101.4) is None
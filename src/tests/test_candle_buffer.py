@@ -0,0 +1,67 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from core.candle import Candle
+from core.candle_buffer import FIELDS, CandleRingBuffer
+
+
+def _candle(i):
+    return Candle(i, i + 2.0, i - 1.0, i + 1.0, start_ts=5.0 * i)
+
+
+def _fields(candles):
+    return {f: [getattr(c, f) for c in candles] for f in FIELDS}
+
+
+@pytest.mark.parametrize("capacity", [1, 3, 7])
+def test_wraparound_matches_bounded_deque(capacity):
+    buf = CandleRingBuffer(capacity)
+    ref = deque(maxlen=capacity)
+    for i in range(5 * capacity + 2):
+        c = _candle(i)
+        buf.append(c)
+        ref.append(c)
+        assert len(buf) == len(ref)
+        assert buf.last(capacity + 5) == list(ref)
+        assert buf[-1] is c and buf[0] is ref[0]
+        for n in range(len(ref) + 2):
+            expected = _fields(list(ref)[-n:] if n else [])
+            window = buf.window(n)
+            assert {f: window[f].tolist() for f in FIELDS} == expected
+            assert buf.field("close", n).tolist() == expected["close"]
+        assert {f: v.tolist() for f, v in buf.window().items()} == _fields(ref)
+
+
+def test_index_errors_and_replace_after_wrap():
+    buf = CandleRingBuffer(4)
+    for i in range(10):
+        buf.append(_candle(i))
+    with pytest.raises(IndexError):
+        buf[4]
+    with pytest.raises(IndexError):
+        buf[-5]
+    amended = Candle(8, 20.0, 1.0, 9.5, start_ts=40.0)
+    buf.replace(-2, amended)
+    assert buf[2] is amended
+    assert buf.window()["high"].tolist() == [8.0, 9.0, 20.0, 11.0]
+    assert buf.field("close").tolist() == [7.0, 8.0, 9.5, 10.0]
+
+
+def test_windows_are_read_only_views_without_copy():
+    buf = CandleRingBuffer(5)
+    for i in range(12):
+        buf.append(_candle(i))
+    w = buf.window(3)
+    assert np.shares_memory(w["close"], buf._arrays["close"])
+    with pytest.raises(ValueError):
+        w["close"][0] = 0.0
+    buf.clear()
+    assert len(buf) == 0 and buf.last(3) == [] and buf.window()["open"].size == 0
+
+
+def test_missing_start_ts_is_nan():
+    buf = CandleRingBuffer(2)
+    buf.append(Candle(1.0, 2.0, 0.5, 1.5))
+    assert np.isnan(buf.field("start_ts")[0])
@@ -0,0 +1,226 @@
+import time
+
+import numpy as np
+import pytest
+
+from core.candle_builder import CandleBuilder
+
+
+def _row(c):
+    return (c.start_ts, c.end_ts, c.open, c.high, c.low, c.close, c.synthetic, c.spans_gap)
+
+
+def _stream(ts, px, **kw):
+    closed, amended = [], []
+    b = CandleBuilder(on_close=closed.append, on_amend=amended.append, **kw)
+    for t, p in zip(ts.tolist(), px.tolist()):
+        b.add_price(p, t)
+    return b, closed, amended
+
+
+def _bulk(ts, px, cuts, **kw):
+    closed, amended = [], []
+    b = CandleBuilder(on_close=closed.append, on_amend=amended.append, **kw)
+    edges = [0] + sorted(cuts) + [ts.size]
+    for lo, hi in zip(edges, edges[1:]):
+        b.add_prices(px[lo:hi], ts[lo:hi])
+    return b, closed, amended
+
+
+def _assert_same(a, b):
+    (ba, ca, aa), (bb, cb, ab) = a, b
+    assert [_row(c) for c in ca] == [_row(c) for c in cb]
+    assert [_row(c) for c in aa] == [_row(c) for c in ab]
+    assert [_row(c) for c in ba.candles.last(len(ba.candles))] == \
+           [_row(c) for c in bb.candles.last(len(bb.candles))]
+    assert ba.metrics() == bb.metrics()
+    for tf in ba.timeframes:
+        assert [_row(c) for c in ba.get_last_n(10 ** 6, tf)] == \
+               [_row(c) for c in bb.get_last_n(10 ** 6, tf)]
+    fa, fb = ba.current_candle, bb.current_candle
+    assert (fa is None) == (fb is None)
+    if fa is not None:
+        assert (fa.start_ts, fa.open, fa.high, fa.low, fa.close, fa.ticks) == \
+               (fb.start_ts, fb.open, fb.high, fb.low, fb.close, fb.ticks)
+
+
+def _ticks(seed, n=20000):
+    rng = np.random.default_rng(seed)
+    ts = 1_700_000_000.0 + np.cumsum(rng.exponential(0.3, n))
+    ts[n // 3:] += 37.0            # فاصله‌ی کوتاه → کندل‌های تخت
+    ts[2 * n // 3:] += 7200.0      # فاصله‌ی بلند → رد شدن بدون کندل تخت
+    px = 1.1 + np.cumsum(rng.normal(0, 0.0002, n))
+    return ts, px
+
+
+@pytest.mark.parametrize("lateness", [0.0, 2.0])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_add_prices_matches_streaming_in_chunks(seed, lateness):
+    ts, px = _ticks(seed)
+    rng = np.random.default_rng(seed + 100)
+    cuts = rng.choice(np.arange(1, ts.size), size=25, replace=False).tolist()
+    # برش دقیقاً روی مرز کندل و وسط یک کندل
+    k = np.flatnonzero(np.diff(ts // 5) > 0)
+    cuts += [int(k[10]) + 1, int(k[11]) + 3]
+    _assert_same(_stream(ts, px, allowed_lateness=lateness, timeframes=(15, 60)),
+                 _bulk(ts, px, set(cuts), allowed_lateness=lateness, timeframes=(15, 60)))
+
+
+def test_add_prices_single_chunk_matches_streaming():
+    ts, px = _ticks(4)
+    _assert_same(_stream(ts, px), _bulk(ts, px, []))
+
+
+@pytest.mark.parametrize("seed", [5, 6])
+def test_out_of_order_input_matches_streaming(seed):
+    ts, px = _ticks(seed, 8000)
+    rng = np.random.default_rng(seed)
+    # جابه‌جایی محلی: تیک‌ها تا ~۱ ثانیه دیرتر از ترتیب زمانی می‌رسند
+    order = np.argsort(ts + rng.uniform(0, 1.0, ts.size), kind="stable")
+    ts, px = ts[order], px[order]
+    cuts = rng.choice(np.arange(1, ts.size), size=15, replace=False).tolist()
+    stream = _stream(ts, px, allowed_lateness=0.5)
+    assert stream[0].late_ticks > 0
+    _assert_same(stream, _bulk(ts, px, set(cuts), allowed_lateness=0.5))
+
+
+def test_chunk_starting_before_last_seen_tick_falls_back():
+    ts, px = _ticks(8, 3000)
+    ts2 = np.concatenate([ts[:1500], ts[1400:1600] - 0.01, ts[1500:]])
+    px2 = np.concatenate([px[:1500], px[1400:1600], px[1500:]])
+    _assert_same(_stream(ts2, px2, allowed_lateness=1.0),
+                 _bulk(ts2, px2, {1500, 1700}, allowed_lateness=1.0))
+
+
+def _late_ticks(seed, n=6000):
+    # تیک‌ها با تأخیر تصادفی تا ۳ ثانیه می‌رسند (ترتیب رسیدن ≠ ترتیب زمان)
+    rng = np.random.default_rng(seed)
+    ts = 1_700_000_000.0 + np.cumsum(rng.exponential(0.3, n))
+    px = 1.1 + np.cumsum(rng.normal(0, 0.0002, n))
+    order = np.argsort(ts + rng.uniform(0, 3.0, n), kind="stable")
+    return ts[order], px[order]
+
+
+@pytest.mark.parametrize("lateness", [0.0, 2.0])
+def test_amendments_reach_higher_timeframes(lateness):
+    from core.timeframes import TimeframeAggregator
+
+    ts, px = _late_ticks(11)
+    tf_amended = {15: [], 60: []}
+    b = CandleBuilder(allowed_lateness=lateness, max_keep=10 ** 5)
+    for tf in (15, 60):
+        b.add_timeframe(tf, on_amend=tf_amended[tf].append)
+    for t, p in zip(ts.tolist(), px.tolist()):
+        b.add_price(p, t)
+    assert b.amended > 0 and tf_amended[15] and tf_amended[60]
+
+    # مرجع: تجمیع دوباره‌ی کندل‌های پایه‌ی نهایی (اصلاح‌شده) از صفر
+    base = b.candles.last(len(b.candles))
+    for tf in (15, 60):
+        ref = TimeframeAggregator(tf, 5, 10 ** 5)
+        for c in base:
+            ref.add_candle(c)
+        assert [_row(c) for c in b.get_last_n(10 ** 6, tf)] == \
+               [_row(c) for c in ref.get_last_n(10 ** 6)]
+        fa, fb = b.timeframes[tf].current_candle, ref.current_candle
+        assert (fa.start_ts, fa.open, fa.high, fa.low, fa.close) == \
+               (fb.start_ts, fb.open, fb.high, fb.low, fb.close)
+
+
+@pytest.mark.parametrize("max_keep", [1, 2, 3])
+def test_small_buffers_wrap_and_keep_amends_in_place(max_keep):
+    # بافر پایه و بافر هر تایم‌فریم بارها دور می‌زنند؛ اصلاح با اندیس ‎-age باید همان
+    # کندلی را جایگزین کند که بافر بزرگ (بدون دور زدن) جایگزین می‌کند
+    ts, px = _late_ticks(5, n=3000)
+    closes = {}
+
+    def build(keep):
+        b = CandleBuilder(allowed_lateness=2.0, max_keep=keep)
+        for tf in (15, 30, 60):
+            b.add_timeframe(tf, on_close=closes.setdefault((keep, tf), []).append)
+        for t, p in zip(ts.tolist(), px.tolist()):
+            b.add_price(p, t)
+        return b
+
+    small, big = build(max_keep), build(10 ** 5)
+    assert small.amended == big.amended > 0
+    assert [_row(c) for c in small.get_last_n(10)] == [_row(c) for c in big.get_last_n(max_keep)]
+    for tf in (15, 30, 60):
+        assert len(small.timeframes[tf].candles) == max_keep
+        assert [_row(c) for c in small.get_last_n(10, tf)] == \
+               [_row(c) for c in big.get_last_n(max_keep, tf)]
+        assert [_row(c) for c in closes[(max_keep, tf)]] == [_row(c) for c in closes[(10 ** 5, tf)]]
+
+
+def test_indicators_keep_value_from_first_close():
+    # اندیکاتورها افزایشی‌اند: اصلاح کندل بعد از بسته شدن در آن‌ها بازتاب داده نمی‌شود
+    from core.indicators import SMA, IndicatorSet
+
+    indicators = IndicatorSet({"sma": SMA(2)})
+    amended = []
+    b = CandleBuilder(on_amend=amended.append, indicators=indicators, timeframes=(15,))
+    for t, p in ((0.0, 1.0), (4.0, 1.2), (5.0, 1.4), (9.0, 1.6), (10.0, 1.8)):
+        b.add_price(p, t)
+    assert indicators["sma"] == pytest.approx((1.2 + 1.6) / 2)
+
+    b.add_price(2.0, 9.5)                    # تیک دیرهنگام: close کندل [5, 10) → 2.0
+    assert [c.close for c in amended] == [2.0] and b.candles[-1].close == 2.0
+    assert b.timeframes[15].current_candle.close == 2.0
+    assert b.timeframes[15].current_candle.high == 2.0
+    # مقدار اندیکاتور همان مقدار لحظه‌ی بسته شدن است (stale تا کندل بعدی)
+    assert indicators["sma"] == pytest.approx((1.2 + 1.6) / 2)
+
+
+def test_gap_ignores_queued_ticks_and_flags_overlapping_candles():
+    closed = []
+    b = CandleBuilder(on_close=closed.append)
+    for t in (0.5, 1.0, 6.0):
+        b.add_price(1.0, t)
+    # ناظر اتصال وقفه را از زمان آخرین تیک دریافت‌شده (7.0) باز می‌کند؛
+    # تیک 7.0 هنوز در صف ورودی است و نباید وقفه را ببندد
+    b.begin_gap(7.0)
+    b.add_price(1.1, 7.0)
+    assert b.gaps.open is not None
+    b.add_price(1.2, 23.0)                   # اولین تیک بعد از بازیابی
+    assert b.gaps.open is None
+    b.add_price(1.3, 31.0)
+    flags = {c.start_ts: c.spans_gap for c in closed}
+    assert flags[0] is False
+    assert all(flags[s] for s in (5, 10, 15, 20))
+    assert flags[25] is False
+    assert b.metrics()["outages"] == 1
+
+
+def test_begin_gap_from_another_thread_is_safe():
+    import threading
+
+    b = CandleBuilder()
+    stop = threading.Event()
+
+    def supervisor():
+        while not stop.is_set():
+            b.begin_gap()
+
+    t = threading.Thread(target=supervisor)
+    t.start()
+    try:
+        for i in range(20000):
+            b.add_price(1.0 + (i % 7) * 1e-4, i * 0.01)
+    finally:
+        stop.set()
+        t.join()
+    # هر وقفه‌ی بسته‌شده بازه‌ی معتبر دارد و حداکثر یک وقفه باز است
+    gaps = b.gaps._gaps
+    assert all(g[1] >= g[0] for g in gaps)
+    assert sum(g[1] == float("inf") for g in gaps) <= 1
+
+
+def test_long_gap_without_fill_jumps_in_one_step():
+    b = CandleBuilder(fill_gaps=False)
+    b.add_price(1.0, 0.0)
+    t0 = time.perf_counter()
+    b.add_price(2.0, 5.0 * 10 ** 7)          # ده میلیون بازه‌ی خالی
+    b.add_price(3.0, 5.0 * 10 ** 7 + 5)
+    assert time.perf_counter() - t0 < 0.5
+    assert [c.close for c in b.get_last_n(10)] == [1.0, 2.0]
+    assert b.metrics()["gap_candles"] == 0 and b.metrics()["gaps_skipped"] == 0
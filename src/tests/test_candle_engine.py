@@ -0,0 +1,27 @@
+from core.candle_engine import CandleEngine
+
+
+class _PushReader:
+    """رابط DomPriceFeed برای CandleEngine (فید زنده؛ polling چیزی نمی‌خواند)"""
+
+    fresh = True
+
+    def __init__(self):
+        self.listeners = []
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self.listeners.remove(callback)
+
+    def get_live_price(self):
+        raise AssertionError("فید زنده است؛ polling نباید بخواند")
+
+
+def test_run_live_unsubscribes_on_exit():
+    reader = _PushReader()
+    engine = CandleEngine(mode="live", live_reader=reader)
+    for _ in range(2):
+        engine.run_live(duration=0.05)
+        assert reader.listeners == []
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from core.clock_sync import ServerClock, normalize_epoch
+
+
+def test_offset_is_max_of_window_like_brute_force():
+    rnd = random.Random(9)
+    clock = ServerClock(window=10.0)
+    samples = []
+    local = 1_700_000_000.0
+    true_offset = 2.5
+    for _ in range(3000):
+        local += rnd.expovariate(2.0)
+        delay = rnd.choice((0.01, 0.02, 0.05, 0.3, 1.2))
+        server = local + true_offset - delay
+        samples.append((local, server - local))
+        got = clock.observe(server, local)
+        expected = max(s for t, s in samples if t >= local - 10.0)
+        assert got == expected == clock.offset
+    assert clock.samples == 3000
+    # نمونه‌ی کمترین تأخیر (۱۰ میلی‌ثانیه) در هر پنجره‌ی ۱۰ ثانیه‌ای تقریباً حتماً هست
+    assert clock.offset == pytest.approx(true_offset - 0.01)
+
+
+def test_slow_samples_do_not_pull_offset_down():
+    clock = ServerClock(window=60.0)
+    clock.observe(100.0, 99.0)              # تأخیر کم: offset = 1.0
+    for i in range(1, 50):
+        clock.observe(100.0 + i, 99.0 + i + 0.4)   # تأخیر ۴۰۰ میلی‌ثانیه بیشتر
+    assert clock.offset == pytest.approx(1.0)
+    assert clock.jitter > 0.0
+
+
+def test_clock_step_is_absorbed_after_window():
+    clock = ServerClock(window=5.0)
+    for i in range(10):
+        clock.observe(1000.0 + i, 1000.0 + i - 3.0)     # offset = 3
+    assert clock.offset == pytest.approx(3.0)
+    # ساعت محلی ۲ ثانیه جلو کشیده شد: offset واقعی اکنون ۱ است
+    for i in range(10, 20):
+        clock.observe(1000.0 + i, 1000.0 + i - 1.0)
+        if i < 13:
+            assert clock.offset == pytest.approx(3.0)   # نمونه‌های قدیمی هنوز در پنجره‌اند
+    assert clock.offset == pytest.approx(1.0)
+
+
+def test_to_server_before_and_after_sync():
+    clock = ServerClock()
+    assert not clock.synced and clock.to_server(50.0) == 50.0
+    assert clock.metrics()["offset_ms"] is None
+    clock.observe(1_700_000_010.25, 1_700_000_010.0)
+    assert clock.synced and clock.to_server(1_700_000_020.0) == pytest.approx(1_700_000_020.25)
+    assert clock.metrics()["offset_ms"] == 250.0
+
+
+def test_normalize_epoch_units():
+    assert normalize_epoch(1_700_000_000) == 1_700_000_000.0
+    assert normalize_epoch(1_700_000_000_123) == pytest.approx(1_700_000_000.123)
+    assert normalize_epoch(1_700_000_000_123_456) == pytest.approx(1_700_000_000.123456)
+    assert normalize_epoch("1700000000.5") == 1_700_000_000.5
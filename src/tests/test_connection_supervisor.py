@@ -0,0 +1,169 @@
+import threading
+
+from core.connection_supervisor import ConnectionSupervisor, backoff_delay
+
+
+class _Clock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class _Tab:
+    def __init__(self):
+        self._stopped = threading.Event()
+        self.status = "started"
+
+    def stop(self):
+        self._stopped.set()
+        self.status = "stopped"
+
+
+class _Handler:
+    def __init__(self, tab, clock):
+        self.tab = tab
+        self.ticks = 0
+        self.last_tick_ts = 95.0
+        self.last_tick_local = clock.now
+        self.reattached = []
+        self.fail = False
+
+    def reattach(self, tab=None):
+        if self.fail:
+            raise RuntimeError("CDP error")
+        if tab is not None:
+            self.tab = tab
+        self.reattached.append(tab)
+
+
+class _Connector:
+    def __init__(self, tab):
+        self.tab = tab
+        self.connects = 0
+
+    def connect(self):
+        self.connects += 1
+        self.tab = _Tab()
+
+
+class _Sink:
+    def __init__(self):
+        self.gaps = []
+
+    def begin_gap(self, ts=None):
+        self.gaps.append(ts)
+
+
+def _setup(**kwargs):
+    clock = _Clock()
+    tab = _Tab()
+    handler = _Handler(tab, clock)
+    connector = _Connector(tab)
+    sink = _Sink()
+    sup = ConnectionSupervisor(connector, handler, gap_sinks=[sink], silence=10.0,
+                               base_delay=1.0, max_delay=8.0, jitter=0.0, clock=clock, **kwargs)
+    return clock, handler, connector, sink, sup
+
+
+def test_backoff_delay_is_capped_and_jittered():
+    assert [backoff_delay(a, 1.0, 8.0, 0.0) for a in range(1, 6)] == [1, 2, 4, 8, 8]
+    assert backoff_delay(3, 1.0, 8.0, 0.5, rand=lambda: 1.0) == 2.0
+
+
+def test_healthy_feed_does_nothing():
+    clock, handler, connector, sink, sup = _setup()
+    clock.now += 5
+    sup.check()
+    assert not sup.in_outage and sink.gaps == [] and handler.reattached == []
+
+
+def test_silence_reattach_backoff_and_recovery():
+    clock, handler, connector, sink, sup = _setup()
+    clock.now += 11                          # سکوت بیشتر از silence
+    sup.check()
+    assert sup.in_outage and sup.last_reason == "سکوت تیک‌ها"
+    assert sink.gaps == [95.0]               # وقفه از زمان سرور آخرین تیک سالم
+    assert handler.reattached == [None] and sup.reattaches == 1 and connector.connects == 0
+
+    # مهلت reattach: تا silence ثانیه بعد از آن، اتصال کامل دوباره انجام نمی‌شود
+    assert sup._next_try == clock.now + 10.0
+    for _ in range(9):
+        clock.now += 1.0
+        sup.check()
+    assert sup.attempt == 1 and sup.reconnects == 0
+
+    # تلاش دوم: اتصال دوباره (تب قبلی بسته و تب جدید به handler داده می‌شود)
+    old = handler.tab
+    clock.now += 1.0
+    sup.check()
+    assert sup.attempt == 2 and sup.reconnects == 1 and connector.connects == 1
+    assert old._stopped.is_set() and handler.tab is connector.tab
+    assert sup._next_try == clock.now + 2.0   # backoff نمایی
+
+    # اولین تیک بعد از بازیابی → پایان قطعی
+    handler.ticks += 1
+    clock.now += 1
+    sup.check()
+    assert not sup.in_outage and sup.attempt == 0
+    assert sup.downtime == clock.now - 111.0
+    assert sink.gaps == [95.0] and sup.outages == 1
+
+
+def test_closed_session_and_failed_attempts_back_off():
+    clock, handler, connector, sink, sup = _setup()
+    handler.tab.stop()
+    handler.fail = True
+    sup.check()
+    assert sup.last_reason == "نشست CDP بسته شد"
+    # تب مرده: از همان تلاش اول reconnect (بدون reattach روی تب بسته)
+    assert sup.reconnects == 1 and sup.reattaches == 0 and sup.failures == 1
+    delays = []
+    for _ in range(4):
+        delays.append(sup._next_try - clock.now)
+        clock.now = sup._next_try
+        sup.check()
+    assert delays == [1.0, 2.0, 4.0, 8.0]
+    assert sup.failures == 5 and sup.in_outage
+
+    # بدون تیک جدید، زنده شدن تب به‌تنهایی بازیابی حساب نمی‌شود
+    handler.fail = False
+    clock.now = sup._next_try
+    sup.check()
+    assert sup.in_outage
+    handler.ticks += 3
+    sup.check()
+    assert not sup.in_outage
+
+
+def test_start_ws_feed_wires_supervisor_with_gap_sinks():
+    from core.candle_builder import CandleBuilder
+    from core.symbol_registry import SymbolRegistry
+    from core.websocket_handler import start_ws_feed, stop_ws_feed
+
+    class _CdpTab(_Tab):
+        def __init__(self):
+            super().__init__()
+            self.listeners = {}
+
+        def set_listener(self, event, callback):
+            self.listeners[event] = callback
+
+        def call_method(self, method, **kwargs):
+            return {}
+
+    connector = _Connector(None)
+    connector.connect = lambda: setattr(connector, "tab", _CdpTab())
+    builder, registry = CandleBuilder(), SymbolRegistry()
+    handler, sup = start_ws_feed(connector, builder=builder, registry=registry,
+                                 check_interval=60.0)
+    try:
+        assert handler.tab is connector.tab
+        assert handler.tab.listeners["Network.webSocketFrameReceived"] is not None
+        assert sup.handler is handler and sup.gap_sinks == [builder, registry]
+        assert sup._thread is not None and sup._thread.is_alive()
+    finally:
+        stop_ws_feed(handler, sup)
+    assert sup._thread is None
+    assert handler.tab.listeners["Network.webSocketFrameReceived"] is None
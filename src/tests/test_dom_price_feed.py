@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+pytest.importorskip("pychrome")     # dom_price_feed → live_data_reader → chrome_connector
+
+from core.dom_price_feed import DomPriceFeed, observer_script  # noqa: E402
+
+
+class _Tab:
+    def __init__(self):
+        self.listeners = {}
+        self.calls = []
+
+    def set_listener(self, event, callback):
+        self.listeners[event] = callback
+
+    def call_method(self, method, **kwargs):
+        self.calls.append(method)
+        return {"identifier": "1"} if method == "Page.addScriptToEvaluateOnNewDocument" else {}
+
+
+class _Fallback:
+    def __init__(self):
+        self.reads = 0
+
+    def get_live_price(self):
+        self.reads += 1
+        return 1.5
+
+
+def _message(feed, payload):
+    feed.tab.listeners["Runtime.bindingCalled"](name=feed.binding, payload=payload)
+
+
+def test_not_fresh_until_first_binding_message():
+    fallback = _Fallback()
+    feed = DomPriceFeed(_Tab(), fallback=fallback)
+    assert feed.start()
+    assert not feed.fresh
+    assert feed.get_live_price() == 1.5 and fallback.reads == 1
+
+    _message(feed, f"p|{time.time() * 1000}|1.2345")
+    assert feed.fresh
+    assert feed.get_live_price() == 1.2345 and fallback.reads == 1
+
+    feed.stop()
+    assert not feed.fresh
+
+
+def test_unsubscribe_stops_callbacks():
+    feed = DomPriceFeed(_Tab(), fallback=_Fallback())
+    feed.start()
+    seen, other = [], []
+
+    def listener(price, ts):
+        seen.append(price)
+
+    feed.subscribe(listener)
+    feed.subscribe(lambda price, ts: other.append(price))
+    _message(feed, f"p|{time.time() * 1000}|1.1")
+    feed.unsubscribe(listener)
+    feed.unsubscribe(listener)              # دوباره: بدون خطا
+    _message(feed, f"p|{time.time() * 1000}|1.2")
+    assert seen == [1.1] and other == [1.1, 1.2]
+    assert feed.binding in observer_script(feed.binding)
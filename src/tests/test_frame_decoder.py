@@ -0,0 +1,56 @@
+import base64
+import json
+
+from core.frame_decoder import OPCODE_BINARY, FrameDecoder
+
+
+def _b64(obj, prefix=b""):
+    raw = obj if isinstance(obj, bytes) else json.dumps(obj).encode()
+    return base64.b64encode(prefix + raw).decode()
+
+
+def test_binary_event_with_zero_attachments_is_returned_at_once():
+    d = FrameDecoder()
+    assert d.decode('450-["updateStream",[["EURUSD",1700000000,1.1]]]') == \
+        ("updateStream", [["EURUSD", 1700000000, 1.1]])
+    # فریم باینری بعدی پیوست آن رویداد نیست
+    assert d.decode(_b64({"price": 1.2}), OPCODE_BINARY) == (None, {"price": 1.2})
+    assert d.metrics()["attachments"] == 0 and d.decoded == 2
+
+
+def test_filtered_binary_event_with_zero_attachments_does_not_swallow_next_frame():
+    d = FrameDecoder(events={"updateStream"})
+    assert d.decode('450-["balance",{"v":1}]') is None
+    assert d.filtered == 1
+    assert d.decode(_b64([["EURUSD", 1700000000, 1.1]]), OPCODE_BINARY) == \
+        (None, [["EURUSD", 1700000000, 1.1]])
+
+
+def test_binary_event_placeholders_are_filled_from_attachments():
+    d = FrameDecoder()
+    head = '452-["updateStream",{"_placeholder":true,"num":0},{"_placeholder":true,"num":1}]'
+    assert d.decode(head) is None
+    assert d.decode(_b64([["EURUSD", 1700000000, 1.1]], b"\x04"), OPCODE_BINARY) is None
+    assert d.decode(_b64(b"\x00\x01raw"), OPCODE_BINARY) == \
+        ("updateStream", [[["EURUSD", 1700000000, 1.1]], b"\x00\x01raw"])
+    assert d.attachments == 2
+
+
+def test_filtered_binary_event_skips_its_attachments_without_parsing():
+    d = FrameDecoder(events={"updateStream"})
+    assert d.decode('451-["balance",{"_placeholder":true,"num":0}]') is None
+    assert d.decode(_b64(b"{not json"), OPCODE_BINARY) is None
+    assert d.errors == 0 and d.attachments == 1
+    assert d.decode('42["updateStream",{"price":1.3}]') == ("updateStream", {"price": 1.3})
+
+
+def test_control_frames_namespaces_and_errors():
+    d = FrameDecoder()
+    for frame in ("2", "3", "40", "41", "0{\"sid\":\"x\"}"):
+        assert d.decode(frame) is None
+    assert d.control == 5
+    assert d.decode('42/ns,17["ev",1,2]') == ("ev", [1, 2])
+    assert d.decode('42["ev",') is None and d.errors == 1
+    d.decode('451-["ev",{"_placeholder":true,"num":0}]')
+    d.reset()
+    assert d.decode(_b64({"price": 2}), OPCODE_BINARY) == (None, {"price": 2})
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from core.backtest import Backtester
+from core.candle import Candle
+from core.candle_builder import CandleBuilder
+from core.indicators import EMA, RSI, SMA, IndicatorSet, IndicatorSnapshot, default_indicators
+from core.strategy_five_sec import StrategyFiveSec
+
+
+def _candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, n))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.0002, n))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.0002, n))
+    return [Candle(*x, start_ts=5.0 * i, end_ts=5.0 * i + 5)
+            for i, x in enumerate(zip(open_.tolist(), high.tolist(), low.tolist(), close.tolist()))]
+
+
+def test_sma_ema_rsi_match_numpy_reference():
+    candles = _candles(300)
+    close = np.array([c.close for c in candles])
+    ind = IndicatorSet({"sma": SMA(20), "ema": EMA(10), "rsi": RSI(14)})
+    for c in candles:
+        ind.update(c)
+
+    assert ind["sma"] == pytest.approx(close[-20:].mean(), rel=1e-12)
+
+    ema = close[:10].mean()
+    for x in close[10:]:
+        ema += 2.0 / 11 * (x - ema)
+    assert ind["ema"] == pytest.approx(ema, rel=1e-12)
+
+    diff = np.diff(close)
+    gain, loss = np.clip(diff, 0, None), np.clip(-diff, 0, None)
+    g, l = gain[:14].mean(), loss[:14].mean()
+    for a, b in zip(gain[14:], loss[14:]):
+        g, l = (g * 13 + a) / 14, (l * 13 + b) / 14
+    assert ind["rsi"] == pytest.approx(100 - 100 / (1 + g / l), rel=1e-9)
+
+
+def test_snapshot_has_indicator_set_interface_and_is_frozen():
+    ind = default_indicators()
+    candles = _candles(40)
+    for c in candles[:30]:
+        ind.update(c)
+    snap = ind.snapshot()
+    assert isinstance(snap, IndicatorSnapshot)
+    assert len(snap) == len(ind) and "rsi" in snap and "missing" not in snap
+    assert snap.values() == ind.values()
+    for name in ("rsi", "sma", "ema_slow"):
+        assert snap.get(name).value == ind.get(name).value == snap[name]
+        assert snap.get(name).ready == ind.get(name).ready
+        assert snap.get(name).period == ind.get(name).period
+
+    before = snap.values()
+    for c in candles[30:]:
+        ind.update(c)
+    assert snap.values() == before != ind.values()
+    with pytest.raises(AttributeError):
+        snap.get("rsi").value = 1.0
+    with pytest.raises(TypeError):
+        snap.update(candles[0])
+
+
+class _RsiFilter(StrategyFiveSec):
+    """فقط وقتی RSI آماده و زیر ۷۰ است ترید می‌کند (همان کد در حالت زنده و بک‌تست)"""
+
+    def decide_trade(self, c1, c2, current_open, current_price):
+        rsi = self.indicators.get("rsi")
+        if not rsi.ready or self.indicators["rsi"] >= 70:
+            return None
+        return super().decide_trade(c1, c2, current_open, current_price)
+
+
+def test_backtest_binds_snapshots_like_live():
+    rng = np.random.default_rng(3)
+    ts = np.cumsum(rng.exponential(0.4, 20000))
+    px = 1.1 + np.cumsum(rng.normal(0, 0.0002, ts.size))
+
+    bt = Backtester({}, strategy=_RsiFilter({}), indicators=default_indicators)
+    candles = bt.build_candles(ts, px)
+    signals = bt.signals(candles)
+    assert signals
+
+    # مسیر زنده: IndicatorSet واقعی روی CandleBuilder، تصمیم هنگام بسته شدن هر کندل
+    live_strategy = _RsiFilter({})
+    indicators = default_indicators()
+    live_strategy.bind_indicators(indicators)
+    closed = []
+    live = []
+
+    def on_close(candle):
+        closed.append(candle)
+        i = len(closed)          # اندیس کندل سوم بعد از c2 = این کندل
+        if i >= 2 and i < len(candles) and not candles[i].synthetic:
+            c1, c2, c3 = closed[-2], closed[-1], candles[i]
+            if c2.end_ts == c3.start_ts and c1.end_ts == c2.start_ts:
+                cmd = live_strategy.decide_trade(c1, c2, c3.open, c3.open)
+                if cmd is not None:
+                    live.append((i, cmd))
+
+    builder = CandleBuilder(5, max_keep=2, on_close=on_close, indicators=indicators)
+    builder.add_prices(px, ts)
+    assert live == signals
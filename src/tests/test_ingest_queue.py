@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from core.ingest_queue import COALESCE, DROP_OLDEST, IngestQueue
+
+
+def _queue(**kw):
+    seen = []
+    return IngestQueue(lambda p, ts, sym: seen.append((p, ts, sym)), **kw), seen
+
+
+def test_full_queue_drops_oldest_ticks():
+    q, seen = _queue(maxsize=3, policy=DROP_OLDEST)
+    results = [q.push(float(i), float(i), "EURUSD") for i in range(5)]
+    assert results == [True, True, True, False, False]
+    assert q.depth == 3 and q.max_depth == 3 and q.dropped == 2
+    q._drain()
+    assert [p for p, _, _ in seen] == [2.0, 3.0, 4.0]
+    assert q.metrics()["processed"] == 3 and q.depth == 0
+
+
+def test_full_queue_coalesces_latest_price_per_symbol_in_time_order():
+    q, seen = _queue(maxsize=2, policy=COALESCE)
+    q.push(1.0, 1.0, "A")
+    q.push(2.0, 2.0, "B")
+    # صف پر است؛ از این‌جا تا تخلیه‌ی کامل فقط آخرین قیمت هر نماد می‌ماند
+    assert q.push(3.0, 3.0, "A") is True
+    assert q.push(4.0, 5.0, "B") is True
+    assert q.push(5.0, 4.0, "A") is False
+    assert q.depth == 4 and q.coalesced == 1 and q.dropped == 0
+    q._drain()
+    assert seen == [(1.0, 1.0, "A"), (2.0, 2.0, "B"), (5.0, 4.0, "A"), (4.0, 5.0, "B")]
+    # بعد از تخلیه صف دوباره عادی کار می‌کند
+    q.push(6.0, 6.0, "A")
+    assert len(q._q) == 1 and not q._latest
+
+
+def test_empty_queue_consumer_idles_and_stops_promptly():
+    q, seen = _queue(maxsize=8)
+    q.start()
+    try:
+        time.sleep(0.05)
+        assert seen == [] and q.depth == 0
+    finally:
+        t0 = time.perf_counter()
+        q.stop()
+    assert time.perf_counter() - t0 < 1.0
+    assert q.metrics()["processed"] == 0 and q.metrics()["wait"]["count"] == 0
+
+
+def test_stop_drains_remaining_ticks_and_survives_consumer_errors():
+    done = threading.Event()
+
+    def consumer(price, ts, symbol):
+        if price < 0:
+            raise ValueError("bad tick")
+        if price == 99:
+            done.set()
+
+    q = IngestQueue(consumer, maxsize=100)
+    for p in (1.0, -1.0, 2.0, 99):
+        q.push(p, p, None)
+    q.start()
+    q.stop()
+    assert done.is_set()
+    assert (q.processed, q.errors, q.depth) == (4, 1, 0)
+
+
+@pytest.mark.parametrize("kw", [{"maxsize": 0}, {"policy": "newest"}])
+def test_invalid_settings_are_rejected(kw):
+    with pytest.raises(ValueError):
+        IngestQueue(lambda *a: None, **kw)
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from core.log_writer import BackgroundLogWriter
+from core.trade_logger import TradeLogger
+
+
+def test_close_with_full_queue_drains_and_joins():
+    written = []
+    release = threading.Event()
+
+    def sink(batch):
+        release.wait()
+        time.sleep(0.01)
+        written.extend(batch)
+
+    w = BackgroundLogWriter(sink, max_queue=4, batch_size=2, flush_interval=0.01)
+    accepted = sum(w.put(i) for i in range(20))
+    assert w.dropped > 0
+    threading.Timer(0.2, release.set).start()
+    assert w.close(timeout=5.0)             # صف پر بود؛ منتظر جا و پایان ترد می‌ماند
+    assert not w._thread.is_alive()
+    assert len(written) == accepted == w.written
+    assert w.close()                        # فراخوانی دوباره بی‌خطر است
+
+
+def test_close_times_out_when_sink_is_stuck():
+    release = threading.Event()
+    started = threading.Event()
+
+    def sink(batch):
+        started.set()
+        release.wait()
+
+    w = BackgroundLogWriter(sink, max_queue=2, batch_size=1)
+    w.put(0)
+    started.wait(1.0)
+    for i in range(1, 5):
+        w.put(i)
+    assert w.queue_depth == 2
+    assert not w.close(timeout=0.2)
+    release.set()
+    assert w.close(timeout=5.0)
+
+
+def test_trade_logger_closes_journal_after_writer_thread(tmp_path):
+    logger = TradeLogger(path=str(tmp_path / "trades.jsonl"), max_queue=4, batch_size=1)
+    alive_at_close = []
+    store_close = logger.store.close
+
+    def close():
+        alive_at_close.append(logger.writer._thread.is_alive())
+        store_close()
+
+    logger.store.close = close
+    for _ in range(50):
+        logger.log_trade("buy", 1.0, "win")
+    assert logger.close()
+    assert alive_at_close == [False]
+    lines = (tmp_path / "trades.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == logger.writer.written
+
+
+def test_put_racing_close_is_written_or_counted_as_dropped():
+    written = []
+    w = BackgroundLogWriter(written.extend, max_queue=100000, batch_size=64, flush_interval=0.01)
+    accepted = [0] * 4
+    start = threading.Event()
+
+    def producer(i):
+        start.wait()
+        for n in range(5000):
+            accepted[i] += w.put((i, n))
+
+    threads = [threading.Thread(target=producer, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    start.set()
+    time.sleep(0.005)
+    assert w.close(timeout=5.0)
+    for t in threads:
+        t.join()
+    # هر put یا نوشته شده یا در dropped است؛ هیچ رکورد پذیرفته‌شده‌ای گم نمی‌شود
+    assert len(written) == w.written == sum(accepted)
+    assert w.written + w.dropped == 4 * 5000
+    assert not w.put("late") and w.dropped == 4 * 5000 - w.written + 1
+
+
+def test_failed_sink_batch_counts_records_as_dropped():
+    def sink(batch):
+        if "bad" in batch:
+            raise OSError("disk full")
+
+    w = BackgroundLogWriter(sink, batch_size=3, flush_interval=10.0)
+    for rec in ("a", "bad", "c", "d"):
+        w.put(rec)
+    assert w.flush()
+    m = w.metrics()
+    assert m["errors"] == 1 and m["dropped"] == 3 and m["written"] == 1
+    assert w.close()
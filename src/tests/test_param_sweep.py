@@ -0,0 +1,74 @@
+import csv
+import json
+
+import numpy as np
+
+from core.param_sweep import ParameterSweep, grid_space, params_key, random_space
+
+GRID = {"doji_body_ratio": [0.1, 0.3], "parallel_max_range": [0.0005, 0.002]}
+
+
+def _ticks():
+    rng = np.random.default_rng(3)
+    ts = np.cumsum(rng.exponential(0.5, 4000))
+    px = 1.1 + np.cumsum(rng.normal(0, 0.0002, ts.size))
+    return ts, px
+
+
+def _sweep(out_dir):
+    ts, px = _ticks()
+    return ParameterSweep(ts, px, out_dir=out_dir, workers=1)
+
+
+def _lines(out_dir):
+    return (out_dir / "results.jsonl").read_text(encoding="utf-8").splitlines()
+
+
+def test_spaces_are_deterministic():
+    combos = grid_space(GRID)
+    assert len(combos) == 4 and len({params_key(p) for p in combos}) == 4
+    space = {"doji_body_ratio": (0.05, 0.4), "max_steps": (1, 5), "reverse_trading": [True, False]}
+    assert random_space(space, 10, seed=4) == random_space(space, 10, seed=4)
+    assert all(isinstance(p["max_steps"], int) for p in random_space(space, 10, seed=4))
+
+
+def test_resume_runs_only_missing_combos(tmp_path):
+    combos = grid_space(GRID)
+    _sweep(tmp_path).run(combos[:2])
+    first = _lines(tmp_path)
+    assert len(first) == 2
+
+    ranked = _sweep(tmp_path).run(combos + combos[:1])      # تکراری هم فقط یک بار
+    lines = _lines(tmp_path)
+    assert lines[:2] == first and len(lines) == 4
+    assert {params_key(json.loads(x)["params"]) for x in lines} == {params_key(p) for p in combos}
+    pnl = [r["pnl"] for r in ranked]
+    assert pnl == sorted(pnl, reverse=True)
+    with open(tmp_path / "ranked.csv", newline="", encoding="utf-8") as fh:
+        assert len(list(csv.reader(fh))) == 5
+
+
+def test_nothing_left_does_not_start_workers(tmp_path, monkeypatch):
+    combos = grid_space(GRID)
+    _sweep(tmp_path).run(combos)
+
+    def no_pool(self, pending):
+        raise AssertionError(f"ترکیب‌های انجام‌شده دوباره اجرا شدند: {pending}")
+
+    monkeypatch.setattr(ParameterSweep, "_run_pool", no_pool)
+    assert len(_sweep(tmp_path).run(combos)) == 4
+
+
+def test_resume_after_torn_result_line_reruns_that_combo(tmp_path):
+    combos = grid_space(GRID)
+    _sweep(tmp_path).run(combos[:2])
+    first = _lines(tmp_path)
+    # کرش وسط نوشتن نتیجه‌ی دوم
+    (tmp_path / "results.jsonl").write_text(first[0] + "\n" + first[1][:25], encoding="utf-8")
+
+    sweep = _sweep(tmp_path)
+    assert sweep.done() == {params_key(combos[0])}
+    sweep.run(combos[:2])
+    records = list(sweep.journal.iter_records())
+    assert [params_key(r["params"]) for r in records] == [params_key(p) for p in combos[:2]]
+    assert records[1] == json.loads(first[1])
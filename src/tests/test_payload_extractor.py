@@ -0,0 +1,87 @@
+from core.payload_extractor import PayloadExtractor, compile_accessor
+
+
+def test_heartbeat_miss_keeps_learned_accessor():
+    ex = PayloadExtractor()
+    assert ex.extract("ev", {"price": 1.1}) == [(1.1, None, None)]
+    assert ex.extract("ev", {"heartbeat": 1}) is None
+    for _ in range(300):
+        assert ex.extract("ev", {"price": 1.2}) == [(1.2, None, None)]
+    assert ex.misses == 1
+    assert ex.learned == 1
+
+
+def test_event_without_price_is_negative_cached():
+    ex = PayloadExtractor()
+    for _ in range(10):
+        assert ex.extract("status", {"ok": True}) is None
+    assert ex.learned == 0
+    assert ex.no_price == 10
+
+
+def test_shape_change_relearns_on_same_frame():
+    ex = PayloadExtractor()
+    ex.extract(None, {"price": 1.0})
+    assert ex.extract(None, {"data": {"price": 2.0, "symbol": "X"}}) == [(2.0, "X", None)]
+    assert ex.learned == 2
+    assert ex.extract(None, {"data": {"price": 3.0, "symbol": "X"}}) == [(3.0, "X", None)]
+
+
+def test_update_stream_returns_every_row():
+    ex = PayloadExtractor()
+    frame = [["EURUSD_otc", 1700000000.5, 1.0845], ["GBPUSD_otc", 1700000000.6, 1.2650]]
+    expected = [(1.0845, "EURUSD_otc", 1700000000.5), (1.265, "GBPUSD_otc", 1700000000.6)]
+    assert ex.extract("updateStream", frame) == expected
+    assert ex.extract("updateStream", frame) == expected
+    assert ex.hits == 1
+
+
+def test_rows_nested_under_key():
+    ex = PayloadExtractor()
+    frame = {"data": [{"price": 1, "asset": "A", "time": 1700000000000},
+                      {"price": "2.5", "asset": "B", "time": 1700000001000}]}
+    assert ex.extract(None, frame) == [(1.0, "A", 1700000000.0), (2.5, "B", 1700000001.0)]
+
+
+def test_compile_accessor_rejects_non_scalar_keys():
+    try:
+        compile_accessor((("x",),), "price", None, None)
+    except TypeError:
+        return
+    raise AssertionError("کلید نامعتبر پذیرفته شد")
+
+
+def test_alternating_shapes_reuse_cached_accessors():
+    ex = PayloadExtractor()
+    a = {"price": 1.0, "symbol": "A"}
+    b = {"data": {"rate": 2.0, "t": 1700000000}}
+    for _ in range(50):
+        assert ex.extract("ev", a) == [(1.0, "A", None)]
+        assert ex.extract("ev", b) == [(2.0, None, 1700000000.0)]
+    assert ex.learned == 2
+    assert ex.shapes() == {"ev": "d['data']['rate']"}
+
+
+def test_mismatched_rows_do_not_rebuild_accessor_every_frame():
+    ex = PayloadExtractor()
+    # ردیف دوم شکل ردیف اول را ندارد (قیمت غیرعددی)
+    frame = [["EURUSD_otc", 1700000000.5, 1.0845], ["GBPUSD_otc", 1700000000.6, "n/a"]]
+    for _ in range(20):
+        assert ex.extract("updateStream", frame) is None
+    assert ex.learned == 1
+    good = [["EURUSD_otc", 1700000001.5, 1.0846]]
+    assert ex.extract("updateStream", good) == [(1.0846, "EURUSD_otc", 1700000001.5)]
+    assert ex.learned == 1
+
+
+def test_accessor_paths_of_every_depth():
+    row = {"price": 3, "asset": "S", "ts": 1700000000}
+    assert compile_accessor((), "price", None, None)({"price": 1}) == [(1, None, None)]
+    assert compile_accessor(("a",), "price", "asset", "ts")({"a": row}) == [(3, "S", 1700000000)]
+    deep = compile_accessor(("a", "b", "c"), "price", None, "ts")
+    assert deep({"a": {"b": {"c": row}}}) == [(3, None, 1700000000)]
+    nested = compile_accessor(("x", 0, "r"), "price", "asset", None)
+    assert nested({"x": [{"r": row}, {"r": {"price": 4, "asset": "T"}}]}) == [(3, "S", None),
+                                                                              (4, "T", None)]
+    assert nested.shape == "d['x'][*]['r']['price']"
+    assert compile_accessor((0,), 2, 0, 1)([["A", 1, 2.0]]) == [(2.0, "A", 1)]
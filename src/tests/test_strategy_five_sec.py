@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from core.candle import Candle
+from core.strategy_batch import BATCH_CHUNK
+from core.strategy_five_sec import StrategyFiveSec
+
+
+def _market(n, seed):
+    """کندل‌های تصادفی با دوجی، open == close، کندل بدون شدو و current_open خالی (NaN)"""
+    rng = np.random.default_rng(seed)
+    o = np.round(1 + rng.normal(0, 1e-3, n), 4)
+    c = np.round(o + rng.normal(0, 3e-4, n), 4)
+    h = np.maximum(o, c) + np.round(np.abs(rng.normal(0, 2e-4, n)), 4) * (rng.random(n) > 0.3)
+    l = np.minimum(o, c) - np.round(np.abs(rng.normal(0, 2e-4, n)), 4) * (rng.random(n) > 0.3)
+    flat = rng.random(n) < 0.05
+    c[flat] = o[flat]
+    h[flat] = np.maximum(h[flat], o[flat])
+    l[flat] = np.minimum(l[flat], o[flat])
+    current_open = np.r_[c[1:], np.nan]
+    current_open[rng.random(n) < 0.1] = np.nan
+    current_price = current_open + np.round(rng.normal(0, 1e-4, n), 4)
+    return o, h, l, c, current_open, current_price
+
+
+def _scalar(strategy, o, h, l, c, current_open, current_price, spans_gap=None):
+    if spans_gap is None:
+        spans_gap = np.zeros(o.size, dtype=bool)
+    candles = [Candle(*x, spans_gap=g) for *x, g in
+               zip(o.tolist(), h.tolist(), l.tolist(), c.tolist(), spans_gap.tolist())]
+    out = [-1]
+    for i in range(1, len(candles)):
+        po = current_open[i]
+        cmd = strategy.decide_trade(candles[i - 1], candles[i],
+                                    None if np.isnan(po) else float(po), float(current_price[i]))
+        out.append(-1 if cmd is None else cmd)
+    return np.array(out, dtype=np.int8)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, BATCH_CHUNK, BATCH_CHUNK + 1, 3 * BATCH_CHUNK + 17])
+def test_decide_batch_matches_decide_trade(n):
+    s = StrategyFiveSec({})
+    data = _market(n, seed=n)
+    batch = s.decide_batch(*data)
+    assert batch.dtype == np.int8
+    np.testing.assert_array_equal(batch, _scalar(s, *data))
+
+
+def test_decide_batch_custom_thresholds_and_scalar_third_candle():
+    s = StrategyFiveSec({"doji_body_ratio": 0.3, "parallel_max_range": 0.0002})
+    o, h, l, c, _, _ = _market(5000, seed=3)
+    # current_open/current_price به شکل عدد (برای همه‌ی کندل‌ها یکسان)
+    for po, pp in ((1.0, 1.001), (1.0, 0.999), (np.nan, 1.0)):
+        n = o.size
+        expected = _scalar(s, o, h, l, c, np.full(n, po), np.full(n, pp))
+        np.testing.assert_array_equal(s.decide_batch(o, h, l, c, po, pp), expected)
+
+
+@pytest.mark.parametrize("n", [2, 3, BATCH_CHUNK + 1, 2 * BATCH_CHUNK + 5])
+def test_decide_batch_masks_gap_candles(n):
+    s = StrategyFiveSec({})
+    data = _market(n, seed=n + 7)
+    gap = np.random.default_rng(n).random(n) < 0.05
+    gap[-1] = True
+    batch = s.decide_batch(*data, spans_gap=gap)
+    np.testing.assert_array_equal(batch, _scalar(s, *data, spans_gap=gap))
+    # c1 یا c2 هم‌پوش با قطعی هرگز سیگنال نمی‌دهد
+    assert (batch[1:][gap[1:] | gap[:-1]] == -1).all()
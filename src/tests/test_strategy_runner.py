@@ -0,0 +1,110 @@
+import threading
+import time
+
+from core.candle import Candle
+from core.indicators import SMA, IndicatorSet
+from core.strategy_base import Strategy
+from core.strategy_runner import StrategyRunner
+
+
+class _Buy(Strategy):
+    def decide_trade(self, c1, c2, current_open, current_price):
+        return 0
+
+
+class _RecordSMA(Strategy):
+    """سایه‌ای که مقدار اندیکاتور دیده‌شده و ترد اجرا را ثبت می‌کند"""
+
+    def __init__(self, gate=None, **kw):
+        super().__init__(**kw)
+        self.gate = gate
+        self.seen = []
+
+    def decide_trade(self, c1, c2, current_open, current_price):
+        if self.gate is not None:
+            self.gate.wait(5.0)
+        self.seen.append((self.indicators["sma"], threading.current_thread().name))
+        return 1
+
+
+def _candle(close):
+    return Candle(close, close + 1, close - 1, close)
+
+
+def _primary():
+    indicators = IndicatorSet({"sma": SMA(2)})
+    primary = _Buy()
+    primary.bind_indicators(indicators)
+    return primary, indicators
+
+
+def test_primary_signal_does_not_wait_for_slow_shadows():
+    gate = threading.Event()
+    primary, _ = _primary()
+    runner = StrategyRunner(primary, [_RecordSMA(gate)])
+    try:
+        t0 = time.perf_counter()
+        for i in range(20):
+            assert runner.on_candle(_candle(1.0), _candle(2.0), 2.0, 2.0 + i) == 0
+        assert time.perf_counter() - t0 < 0.1
+        assert runner.metrics()["queue_depth"] > 0
+        gate.set()
+        assert runner.flush()
+        assert runner.metrics()["evaluated"] == 20 and runner.metrics()["queue_depth"] == 0
+    finally:
+        gate.set()
+        runner.close()
+
+
+def test_shadows_see_indicator_snapshot_of_their_event():
+    gate = threading.Event()
+    primary, indicators = _primary()
+    shadow = _RecordSMA(gate)
+    runner = StrategyRunner(primary, [shadow])
+    try:
+        expected = []
+        for close in (1.0, 3.0, 5.0, 7.0):
+            indicators.update(_candle(close))
+            expected.append(indicators["sma"])
+            runner.shadow(_candle(close), _candle(close), close, close)
+        # اندیکاتور زنده جلوتر رفته است؛ سایه‌ها باید مقدار لحظه‌ی رویداد خودشان را ببینند
+        indicators.update(_candle(100.0))
+        gate.set()
+        assert runner.flush()
+        assert [v for v, _ in shadow.seen] == expected == [None, 2.0, 4.0, 6.0]
+        assert {name for _, name in shadow.seen} == {"shadow-strategies_0"}
+    finally:
+        gate.set()
+        runner.close()
+
+
+def test_shadow_books_settle_and_report_by_unique_name():
+    primary, _ = _primary()
+    runner = StrategyRunner(primary, [_RecordSMA(), _RecordSMA()], expiry_candles=1)
+    for i, price in enumerate((1.0, 0.5, 0.5, 2.0)):
+        runner.on_candle(_candle(1.0), _candle(1.0), 1.0, price, ts=float(i))
+    assert runner.flush()
+    report = runner.report()
+    assert sorted(report) == ["_RecordSMA", "_RecordSMA#2"]
+    # فروش در ۱.۰ → ۰.۵ برد، ۰.۵ → ۰.۵ مساوی، ۰.۵ → ۲.۰ باخت
+    r = report["_RecordSMA"]
+    assert (r["wins"], r["losses"], r["open_trades"]) == (1, 1, 1)
+    runner.close()
+    runner.shadow(_candle(1.0), _candle(1.0), 1.0, 1.0)      # بعد از close نادیده گرفته می‌شود
+    assert runner.metrics()["evaluated"] == 4
+
+
+def test_full_shadow_queue_drops_events():
+    gate = threading.Event()
+    primary, _ = _primary()
+    runner = StrategyRunner(primary, [_RecordSMA(gate)], max_queue=3)
+    try:
+        for _ in range(10):
+            runner.shadow(_candle(1.0), _candle(1.0), 1.0, 1.0)
+        m = runner.metrics()
+        assert m["dropped"] == 7 and m["max_depth"] == 3
+        gate.set()
+        assert runner.flush() and runner.metrics()["evaluated"] == 3
+    finally:
+        gate.set()
+        runner.close()
@@ -0,0 +1,71 @@
+from core.symbol_registry import SymbolRegistry
+
+
+class _AlwaysBuy:
+    def decide_trade(self, c1, c2, current_open, current_price):
+        return 0
+
+
+def _by_close(c1, c2):
+    return c2.close
+
+
+def _registry(**kw):
+    picks = []
+    reg = SymbolRegistry(strategy=_AlwaysBuy(), on_best=lambda *p: picks.append(p),
+                         score=_by_close, **kw)
+    return reg, picks
+
+
+def _feed(reg, prices, times):
+    for t in times:
+        for sym, p in prices.items():
+            reg.add_tick(sym, p, t)
+
+
+def test_add_tick_routes_by_interned_id_and_caches_last_symbol():
+    reg = SymbolRegistry()
+    reg.add_tick("EURUSD", 1.1, 0.0)
+    reg.add_tick("EURUSD", 1.2, 1.0)
+    reg.add_tick("GBPUSD", 1.3, 1.0)
+    reg.add_tick("".join(["EUR", "USD"]), 1.15, 2.0)   # رشته‌ی تازه با همان نام
+    assert reg.symbols == ["EURUSD", "GBPUSD"] and len(reg) == 2
+    assert reg.symbol_id("EURUSD") == 0 and reg.symbol_id("GBPUSD") == 1
+    assert reg.last_prices == [1.15, 1.3]
+    assert reg.builder("EURUSD").current_candle.high == 1.2
+    assert reg.builder("GBPUSD").current_candle.open == 1.3
+
+
+def test_best_symbol_picked_once_per_candle_close_after_all_active_symbols():
+    reg, picks = _registry()
+    prices = {"A": 1.0, "B": 3.0, "C": 2.0}
+    _feed(reg, prices, [t * 1.0 for t in range(10)])
+    assert picks == []                           # هنوز دو کندل بسته‌شده نیست
+    # مرز ۱۰: A و C بسته‌اند ولی B هنوز تیکی بعد از مرز نفرستاده → انتظار
+    reg.add_tick("A", 1.0, 10.0)
+    reg.add_tick("C", 2.0, 10.1)
+    assert picks == []
+    reg.add_tick("B", 3.0, 10.2)
+    assert picks == [("B", 0, 3.0)]
+    # تیک‌های بعدی همان کندل انتخاب دوباره‌ای ندارند
+    _feed(reg, prices, [11.0, 12.0])
+    assert reg.picks == 1
+
+
+def test_slow_symbol_does_not_block_selection_and_stale_symbol_is_skipped():
+    reg, picks = _registry(select_delay=0.5)
+    _feed(reg, {"A": 1.0, "B": 3.0, "C": 2.0}, [t * 1.0 for t in range(11)])
+    assert picks == [("B", 0, 3.0)]
+    # B دیگر تیک نمی‌فرستد؛ مرز ۱۵ بعد از select_delay بدون B انتخاب می‌شود
+    _feed(reg, {"A": 1.0, "C": 2.0}, [12.0, 13.0, 14.0, 15.0, 15.2])
+    assert len(picks) == 1
+    reg.add_tick("A", 1.0, 15.5)
+    assert picks[-1] == ("C", 0, 2.0)
+
+
+def test_best_symbol_since_filters_symbols_without_fresh_candle():
+    reg = SymbolRegistry()
+    _feed(reg, {"A": 1.0, "B": 2.0}, [t * 1.0 for t in range(11)])
+    _feed(reg, {"A": 1.0}, [12.0, 15.0])
+    assert reg.best_symbol(_AlwaysBuy(), _by_close)[0] == "B"
+    assert reg.best_symbol(_AlwaysBuy(), _by_close, since=15.0)[0] == "A"
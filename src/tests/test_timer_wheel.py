@@ -0,0 +1,42 @@
+import threading
+import time
+
+from core.blocking_poller import BlockingPoller
+from core.timer_wheel import TimerWheel
+
+
+def test_call_later_and_cancel():
+    wheel = TimerWheel(tick=0.002).start()
+    try:
+        fired = threading.Event()
+        cancelled = []
+        wheel.call_later(0.02, fired.set)
+        t = wheel.call_later(0.02, cancelled.append, 1)
+        t.cancel()
+        assert fired.wait(1.0)
+        time.sleep(0.05)
+        assert cancelled == []
+        assert wheel.pending == 0
+    finally:
+        wheel.stop()
+
+
+def test_slow_poller_does_not_block_wheel_timers():
+    wheel = TimerWheel(tick=0.002).start()
+    results = []
+    ticks = []
+    poller = BlockingPoller(wheel, 0.05, lambda: time.sleep(0.3) or 1.0, results.append)
+    try:
+        timer = wheel.call_every(0.02, lambda: ticks.append(time.perf_counter()))
+        poller.start()
+        time.sleep(0.7)
+        timer.cancel()
+    finally:
+        poller.cancel()
+        wheel.stop()
+    # نتیجه‌ی خواندن روی چرخ تحویل شده، ولی زمان‌سنج‌های چرخ منتظر خواندن نمانده‌اند
+    assert results and all(v == 1.0 for v in results)
+    assert poller.overruns > 0
+    gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+    assert len(ticks) >= 25
+    assert max(gaps) < 0.1
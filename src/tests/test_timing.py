@@ -0,0 +1,98 @@
+import threading
+import time
+
+import core.timing as timing
+from core.timing import (MAX_SPIN, MIN_SPIN, PrecisionScheduler, calibrate_sleep, next_boundary,
+                         wait_until)
+from core.trader import Trader
+
+
+class _Chrome:
+    def __init__(self):
+        self.clicks = []
+        self.done = threading.Event()
+
+    def click_button(self, direction):
+        self.clicks.append((direction, time.time(), threading.current_thread().name))
+        self.done.set()
+
+
+def _no_measure(*args, **kwargs):
+    raise AssertionError("کالیبراسیون داخل انتظار")
+
+
+def test_wait_until_never_calibrates_lazily(monkeypatch):
+    monkeypatch.setattr(timing, "_spin_slice", None)
+    monkeypatch.setattr(timing, "calibrate_sleep", _no_measure)
+    assert timing.spin_slice() == MAX_SPIN
+    target = time.time() + 0.01
+    wait_until(target)
+    assert time.time() >= target
+
+
+def test_calibrate_once_at_startup(monkeypatch):
+    monkeypatch.setattr(timing, "_spin_slice", None)
+    calls = []
+
+    def measure():
+        calls.append(1)
+        return 0.001
+
+    monkeypatch.setattr(timing, "calibrate_sleep", measure)
+    sched = PrecisionScheduler()
+    try:
+        assert sched.spin == 0.001 and timing.spin_slice() == 0.001
+        PrecisionScheduler(spin=0.002).stop()
+        assert timing.calibrate() == 0.001 and calls == [1]
+        assert timing.calibrate(force=True) == 0.001 and calls == [1, 1]
+    finally:
+        sched.stop()
+    assert MIN_SPIN <= calibrate_sleep(samples=3) <= MAX_SPIN
+
+
+def _last(seen, done):
+    seen.append("c")
+    done.set()
+
+
+def test_scheduler_runs_in_deadline_order_and_skips_cancelled():
+    sched = PrecisionScheduler(spin=0.001)
+    try:
+        seen = []
+        done = threading.Event()
+        now = time.time()
+        sched.call_at(now + 0.06, _last, seen, done)
+        sched.call_at(now + 0.02, seen.append, "a")
+        sched.call_at(now + 0.04, seen.append, "x").cancel()
+        sched.call_later(0.03, seen.append, "b")
+        assert done.wait(2.0)
+        assert seen == ["a", "b", "c"]
+        m = sched.metrics()
+        assert m["pending"] == 0 and m["errors"] == 0 and m["lateness"]["count"] == 3
+    finally:
+        sched.stop()
+
+
+def test_next_boundary_with_offset():
+    assert next_boundary(5, 0.002, now=12.0) == 15.002
+    assert next_boundary(5, 0.002, now=15.001) == 15.002
+    assert next_boundary(5, 0.002, now=15.002) == 20.002
+
+
+def test_trader_places_trade_on_scheduler_thread_at_deadline():
+    chrome = _Chrome()
+    sched = PrecisionScheduler(spin=0.001, name="trade-scheduler")
+    try:
+        trader = Trader(chrome, {"max_trades": 5}, scheduler=sched)
+        deadline = time.time() + 0.03
+        trader.place_trade_at(1, deadline)
+        assert trader.trade_counter == 0            # فراخواننده منتظر نمانده است
+        assert chrome.done.wait(2.0)
+        direction, at, thread = chrome.clicks[0]
+        assert direction == 1 and at >= deadline and thread == "trade-scheduler"
+        assert trader.trade_counter == 1
+        call = trader.place_trade_at_boundary(0, 5, now=time.time())
+        assert abs(call.deadline % 5 - 0.002) < 1e-6
+        call.cancel()
+    finally:
+        sched.stop()
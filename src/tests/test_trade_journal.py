@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+import core.trade_journal as trade_journal
+from core.trade_journal import FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER, TradeJournal
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    calls = []
+    monkeypatch.setattr(trade_journal.os, "fsync", calls.append)
+    return calls
+
+
+def _rec(i):
+    return {"time": f"2024-01-02T10:00:{i:02d}", "direction": "buy", "amount": 1, "result": "win"}
+
+
+def test_fsync_always_syncs_every_batch(tmp_path, fsyncs):
+    j = TradeJournal(tmp_path / "t.jsonl", fsync=FSYNC_ALWAYS)
+    j.append(_rec(0))
+    j.append_many([_rec(1), _rec(2)])
+    j.append_many([])                       # دسته‌ی خالی چیزی نمی‌نویسد
+    assert len(fsyncs) == 2
+    j.close()
+    assert len(fsyncs) == 3                 # fsync نهایی هنگام بستن
+
+
+def test_fsync_interval_syncs_at_most_once_per_interval(tmp_path, fsyncs):
+    j = TradeJournal(tmp_path / "t.jsonl", fsync=FSYNC_INTERVAL, fsync_interval=60.0)
+    for i in range(5):
+        j.append(_rec(i))
+    assert fsyncs == []
+    j._last_fsync -= 60.0                   # گذشت یک بازه
+    j.append(_rec(5))
+    j.append(_rec(6))
+    assert len(fsyncs) == 1
+    j.close()
+    assert len(fsyncs) == 2
+
+
+def test_fsync_never_only_flushes(tmp_path, fsyncs):
+    path = tmp_path / "t.jsonl"
+    j = TradeJournal(path, fsync=FSYNC_NEVER)
+    j.append(_rec(0))
+    # flush به سیستم‌عامل: بدون fsync هم خواندن هم‌زمان رکورد را می‌بیند
+    assert list(TradeJournal(path).iter_records()) == [_rec(0)]
+    j.close()
+    assert fsyncs == []
+
+
+def test_invalid_fsync_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        TradeJournal(tmp_path / "t.jsonl", fsync="sometimes")
+
+
+def test_torn_last_line_is_skipped_and_next_append_survives(tmp_path):
+    path = tmp_path / "t.jsonl"
+    j = TradeJournal(path, fsync=FSYNC_NEVER)
+    j.append_many([_rec(0), _rec(1)])
+    j.close()
+    # کرش وسط نوشتن: نیمه‌ی یک رکورد بدون \n
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(_rec(2))[:17])
+    assert list(TradeJournal(path).iter_records()) == [_rec(0), _rec(1)]
+
+    j = TradeJournal(path, fsync=FSYNC_NEVER)
+    j.append(_rec(3))
+    j.close()
+    assert list(j.iter_records()) == [_rec(0), _rec(1), _rec(3)]
+    assert [r["time"][-2:] for r in j.iter_trades(start="2024-01-02T10:00:01")] == ["01", "03"]
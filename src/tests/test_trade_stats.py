@@ -0,0 +1,74 @@
+import random
+from datetime import datetime
+
+from core.trade_journal import TradeJournal
+from core.trade_stats import TradeStats, trade_pnl
+
+PAYOUT = 0.75       # سود دودویی دقیق تا مجموع افزایشی و مجموع کامل بیت‌به‌بیت برابر باشند
+
+
+def _trades(n, seed=7):
+    rnd = random.Random(seed)
+    ts = 1_700_000_000.0
+    out = []
+    for _ in range(n):
+        ts += rnd.choice((1.0, 5.0, 30.0, 400.0))
+        rec = {"direction": rnd.choice(("buy", "sell")), "amount": rnd.choice((1, 2, 4)),
+               "result": rnd.choice(("win", "win", "loss", "loss", "draw"))}
+        if rnd.random() < 0.1:
+            rec["pnl"] = rnd.choice((-1.5, 0.25, 3.0))       # pnl صریح بر payout مقدم است
+        out.append((ts, rec))
+    return out
+
+
+def _window(items):
+    wins = sum(r["result"] == "win" for _, r in items)
+    losses = sum(r["result"] == "loss" for _, r in items)
+    total = len(items)
+    return {"total": total, "wins": wins, "losses": losses,
+            "winrate": round(wins / total * 100, 2) if total else 0.0,
+            "pnl": round(sum(trade_pnl(r, PAYOUT) for _, r in items), 2)}
+
+
+def _brute(seen, now, n, seconds):
+    """محاسبه‌ی کامل از روی همه‌ی معاملات (همان کاری که stats قدیمی هر بار انجام می‌داد)"""
+    out = _window(seen)
+    streak = worst = 0
+    for _, r in seen:
+        if r["result"] == "loss":
+            streak += 1
+            worst = max(worst, streak)
+        elif r["result"] == "win":
+            streak = 0
+    out.update(loss_streak=streak, max_loss_streak=worst,
+               last_n=_window(seen[-n:] if n else []),
+               last_t=_window([(t, r) for t, r in seen if t >= now - seconds]))
+    return out
+
+
+def test_incremental_stats_match_full_recomputation():
+    stats = TradeStats(window_trades=20, window_seconds=600.0, payout=PAYOUT)
+    seen = []
+    trades = _trades(600)
+    for i, (ts, rec) in enumerate(trades):
+        stats.update(rec, ts)
+        seen.append((ts, rec))
+        # poll در لحظه‌ی معامله و کمی قبل از معامله‌ی بعدی (زمان poll کاهشی نیست)
+        nxt = trades[i + 1][0] if i + 1 < len(trades) else ts + 5000.0
+        for now in (ts, ts + (nxt - ts) * 0.9):
+            assert stats.snapshot(now) == _brute(seen, now, 20, 600.0)
+
+
+def test_rebuild_from_journal_matches_live_updates(tmp_path):
+    journal = TradeJournal(tmp_path / "t.jsonl")
+    live = TradeStats(window_trades=10, window_seconds=120.0, payout=PAYOUT)
+    for ts, rec in _trades(300, seed=3):
+        rec = dict(rec, time=datetime.fromtimestamp(ts).isoformat(timespec="seconds"))
+        live.update(rec, ts)
+        journal.append(rec)
+    journal.append({"time": "2024-01-02T10:00:00", "event": "place_trade", "payload": {}})
+    journal.close()
+    rebuilt = TradeStats(window_trades=10, window_seconds=120.0, payout=PAYOUT)
+    rebuilt.rebuild(journal.iter_records())
+    now = ts + 60.0
+    assert rebuilt.snapshot(now) == live.snapshot(now)
@@ -0,0 +1,91 @@
+import json
+import sqlite3
+from datetime import date, datetime
+
+from core.trade_logger import TradeLogger
+from core.trade_store import SQLiteTradeStore
+
+RECORDS = [
+    {"time": "2024-01-02T10:00:00", "session": "s1", "direction": "buy", "amount": 1,
+     "result": "win", "pnl": 0.8},
+    {"time": "2024-01-02T10:00:05", "session": "s1", "event": "place_trade", "payload": {"x": 1}},
+    {"time": "2024-01-02T23:59:59", "session": "s2", "direction": "sell", "amount": 2,
+     "result": "loss", "pnl": -2},
+    {"time": "2024-01-03T00:00:00", "session": "s2", "direction": "buy", "amount": 4,
+     "result": "win", "pnl": 3.2},
+]
+
+
+def _store(path):
+    store = SQLiteTradeStore(path)
+    store.append_many(RECORDS)
+    return store
+
+
+def test_store_uses_wal_and_reads_under_special_characters(tmp_path):
+    # فاصله، ?، # و % در مسیر باید در URI فقط‌خواندنی escape شوند
+    path = tmp_path / "my logs ?#%20" / "trades.db"
+    store = _store(path)
+    try:
+        conn = sqlite3.connect(str(path))
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+        assert list(store.iter_records()) == RECORDS
+    finally:
+        store.close()
+
+
+def test_store_queries_by_time_direction_result_session_and_event(tmp_path):
+    store = _store(tmp_path / "trades.db")
+    try:
+        assert [r["amount"] for r in store.iter_trades()] == [1, 2, 4]
+        assert [r["amount"] for r in store.iter_trades(direction="buy")] == [1, 4]
+        assert [r["amount"] for r in store.iter_trades(result="loss")] == [2]
+        assert [r["amount"] for r in store.iter_trades(session="s2")] == [2, 4]
+        # بازه‌ی نیم‌باز [start, end) با datetime یا date
+        assert [r["amount"] for r in store.iter_trades(start=datetime(2024, 1, 2, 12),
+                                                       end=date(2024, 1, 3))] == [2]
+        assert [r["event"] for r in store.iter_events(name="place_trade")] == ["place_trade"]
+        assert list(store.iter_events(session="s2")) == []
+        assert len(store.read_day(date(2024, 1, 2))) == 3
+        # نقطه‌ی بازرسی WAL داده را تغییر نمی‌دهد
+        store.sync()
+        assert len(store.read_day(date(2024, 1, 3))) == 1
+    finally:
+        store.close()
+
+
+def test_logger_migrates_legacy_json_to_jsonl_once(tmp_path):
+    legacy = tmp_path / "trades.json"
+    legacy.write_text(json.dumps(RECORDS), encoding="utf-8")
+    logger = TradeLogger(str(legacy), background=False, session="s3")
+    try:
+        assert logger.path == tmp_path / "trades.jsonl"
+        assert not legacy.exists() and (tmp_path / "trades.json.migrated").exists()
+        assert logger.records(date(2024, 1, 2)) == RECORDS[:3]
+        # آمار از رکوردهای منتقل‌شده بازسازی می‌شود
+        assert logger.stats()["total"] == 3
+        logger.log_trade("sell", 1.0, result="loss")
+    finally:
+        logger.close()
+    lines = (tmp_path / "trades.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines[:4]] == RECORDS and len(lines) == 5
+
+    # اجرای دوباره: فایل قدیمی دیگر وجود ندارد و مهاجرت تکرار نمی‌شود
+    again = TradeLogger(str(tmp_path / "trades.jsonl"), background=False)
+    try:
+        assert again.stats()["total"] == 4
+    finally:
+        again.close()
+
+
+def test_logger_migrates_legacy_json_into_sqlite(tmp_path):
+    (tmp_path / "trades.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+    logger = TradeLogger(str(tmp_path / "trades.json"), backend="sqlite", session="s3")
+    try:
+        assert logger.path == tmp_path / "trades.db"
+        logger.log_trade("buy", 1.0, result="win")
+        assert [r["amount"] for r in logger.iter_trades(result="win")][:2] == [1, 4]
+        assert len(list(logger.iter_trades(session="s3"))) == 1
+    finally:
+        logger.close()